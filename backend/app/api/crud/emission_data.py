@@ -8,11 +8,15 @@ from bson.objectid import ObjectId # Needed for ObjectId conversion
 
 # Import schemas for typing and model definition
 from app.schemas import EmissionRecord, EmissionRecordCreate
+from app.core.compute import compute_executor
+from app.core.anomaly import anomaly_detector
 
 # --- CONFIGURATION ---
 CORE_COLLECTION_NAME = 'emission_records' 
 MONTHLY_COLLECTION_NAME = 'monthly_emissions'   
 AVERAGE_COLLECTION_NAME = 'overall_averages'    
+ANOMALY_STATE_COLLECTION_NAME = 'anomaly_detector_state'
+HOTSPOT_COLLECTION_NAME = 'emission_hotspots'
 
 # --- CORE HELPER FUNCTION ---
 def doc_helper(doc: dict) -> dict:
@@ -27,13 +31,41 @@ def doc_helper(doc: dict) -> dict:
 # A. CORE RECORD CRUD (TONS Data)
 # --------------------------
 
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Creates the indexes the record queries rely on (idempotent; called at startup)."""
+    await db[CORE_COLLECTION_NAME].create_index([("mine_id", 1), ("date", -1)])
+    await db[CORE_COLLECTION_NAME].create_index(
+        [("date", -1)], name="anomalies_by_date", partialFilterExpression={"is_anomaly": True}
+    )
+    # GeoJSON 'location' points written by data_uploader (hotspot geo queries)
+    await db[HOTSPOT_COLLECTION_NAME].create_index([("location", "2dsphere")])
+
+async def score_emission_record(db: AsyncIOMotorDatabase, record_dict: Dict[str, Any]):
+    """
+    Scores a record against its mine's current statistics (one state lookup).
+    The statistics are only advanced by update_anomaly_state, once the record is stored.
+    """
+    state_doc = await db[ANOMALY_STATE_COLLECTION_NAME].find_one({"_id": record_dict['mine_id']})
+    score, is_anomaly = anomaly_detector.score(state_doc, record_dict)
+    record_dict['anomaly_score'] = round(score, 4)
+    record_dict['is_anomaly'] = is_anomaly
+
+async def update_anomaly_state(db: AsyncIOMotorDatabase, record_dict: Dict[str, Any]):
+    """Folds a stored record into its mine's statistics with one atomic pipeline update (safe across workers)."""
+    await db[ANOMALY_STATE_COLLECTION_NAME].update_one(
+        {"_id": record_dict['mine_id']}, anomaly_detector.update_pipeline(record_dict), upsert=True
+    )
+
 async def create_emission_record(db: AsyncIOMotorDatabase, record: EmissionRecordCreate) -> Dict[str, Any]:
-    """Inserts a single new emission record (TONS) into the core collection."""
+    """Inserts a single new emission record (TONS) into the core collection, with its anomaly score."""
     record_dict = record.model_dump()
     if 'date' not in record_dict:
          record_dict['date'] = datetime.utcnow()
+    await score_emission_record(db, record_dict)
          
     result = await db[CORE_COLLECTION_NAME].insert_one(record_dict)
+    # Only a stored record moves the statistics; a failed insert leaves them untouched
+    await update_anomaly_state(db, record_dict)
     
     # Retrieve and return the newly created document
     new_doc = await db[CORE_COLLECTION_NAME].find_one({"_id": result.inserted_id})
@@ -55,6 +87,17 @@ async def get_historical_data(db: AsyncIOMotorDatabase, mine_id: str, days: int)
     documents = await cursor.to_list(length=None)
     return [doc_helper(doc) for doc in documents]
 
+async def get_recent_anomalies(db: AsyncIOMotorDatabase, limit: int, mine_id: str = None, hours: int = None) -> List[Dict[str, Any]]:
+    """Most recent flagged records, newest first (served by the partial anomalies index)."""
+    query = {"is_anomaly": True}
+    if mine_id:
+        query["mine_id"] = mine_id
+    if hours:
+        query["date"] = {"$gte": datetime.utcnow() - timedelta(hours=hours)}
+    cursor = db[CORE_COLLECTION_NAME].find(query).sort("date", -1).limit(limit)
+    documents = await cursor.to_list(length=limit)
+    return [doc_helper(doc) for doc in documents]
+
 # --------------------------
 # B. SUMMARY CRUD (PPM Data - New CSV Pipeline)
 # --------------------------
@@ -81,9 +124,8 @@ async def get_overall_averages_summary(db: AsyncIOMotorDatabase) -> Dict[str, An
     # --- END CRUCIAL FIX ---
 
 
-async def handle_csv_upload(file_stream: bytes, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
-    """Processes an uploaded CSV stream, validates, and replaces monthly data."""
-    
+def parse_monthly_csv(file_stream: bytes) -> List[Dict[str, Any]]:
+    """Parses and validates an uploaded monthly CSV into BSON-ready records (CPU-bound; runs on the compute executor)."""
     csv_data = StringIO(file_stream.decode('utf-8'))
     df = pd.read_csv(csv_data)
     
@@ -93,15 +135,23 @@ async def handle_csv_upload(file_stream: bytes, db: AsyncIOMotorDatabase) -> Dic
         raise ValueError(f"Uploaded CSV is missing required columns: {required_cols}")
 
     # Prepare data for MongoDB
-    records_to_insert = df.to_dict(orient='records')
-    ingestion_time = datetime.utcnow()
-    
-    for record in records_to_insert:
-        record['ingested_at'] = ingestion_time
+    records = df.to_dict(orient='records')
+    for record in records:
         # Clean up Pandas NaN values for BSON insertion
         for key, value in record.items():
             if pd.isna(value):
                 record[key] = None
+    return records
+
+async def handle_csv_upload(file_stream: bytes, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+    """Processes an uploaded CSV stream, validates, and replaces monthly data."""
+    
+    # Parsing runs off the event loop so other requests keep flowing
+    records_to_insert = await compute_executor.run(parse_monthly_csv, file_stream)
+    ingestion_time = datetime.utcnow()
+    
+    for record in records_to_insert:
+        record['ingested_at'] = ingestion_time
         
     # Insertion Strategy: Clear and Insert (Asynchronously)
     await db[MONTHLY_COLLECTION_NAME].delete_many({}) 
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, File, UploadFile, Depends, Query
-from typing import List, Any
+from fastapi import APIRouter, HTTPException, status, File, UploadFile, Depends, Query, Header, Request
+from typing import List, Any, Optional
 import os
 import sys
+import asyncio
+import secrets
 import importlib.util
 
 # Standard Imports
@@ -10,10 +12,21 @@ from app.schemas import (
     EmissionRecordCreate, 
     MonthlyEmissionsSummary, 
     OverallAveragesSummary,
-    MineOffsetResponse
+    MineOffsetResponse,
+    MineOffsetBatchRequest,
+    MineOffsetBatchResponse,
+    MineOptimizeRequest,
+    MineOptimizeResponse,
+    ScenarioSweepRequest,
+    ScenarioSweepResponse,
+    TreeScoringRequest,
+    TreeScoringResponse
 )
 from app.api.crud import emission_data as crud 
 from app.database import get_db 
+from app.core.compute import compute_executor, ComputeQueueFullError, ComputeTimeoutError
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
 
 # -------------------------------------------------------------------------
 # ROBUST PREDICTOR LOADER (Bypasses "ModuleNotFoundError")
@@ -57,12 +70,82 @@ if predictor is None:
     class DummyPredictor:
         def predict(self, name):
             raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def predict_portfolio(self, names):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def optimize_plans(self, names=None):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def forecast(self, name, horizon=12):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def sweep_scenarios(self, name, request):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def score_trees(self, trees):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def training_report(self):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def sequestration_regions(self):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def search_mines(self, query, limit=10):
+            raise HTTPException(status_code=500, detail="ML Predictor failed to load on server startup.")
+
+        def get_cached(self, name):
+            return None
+
+        def cache_stats(self):
+            return {}
+
+        def warmup(self):
+            return False
+
+        def is_ready(self):
+            return False
+
+        def reload(self):
+            return False
+
+        def datasets_changed(self):
+            return False
+
+        def status(self):
+            return {"state": "failed", "stage": None, "progress": 0.0, "error": "ML Predictor failed to load on server startup."}
     predictor = DummyPredictor()
 
 # -------------------------------------------------------------------------
 
 emissions_router = APIRouter()
 
+def ensure_engine_ready():
+    """503 until the ML engine is warm (or if it failed), so the load balancer routes elsewhere."""
+    if not predictor.is_ready():
+        raise HTTPException(status_code=503, detail={"message": "ML engine is not ready.", "ml_engine": predictor.status()})
+
+def engine_response(content, status_code=200):
+    """
+    Engine payloads hold NumPy scalars/arrays: hand them straight to orjson instead of
+    letting FastAPI run them through Pydantic/jsonable_encoder first (which rejects NumPy).
+    """
+    return FastJSONResponse(content, status_code=status_code)
+
+def engine_not_found(result):
+    """404 with the engine's error/suggestions payload, in the usual {"detail": ...} shape."""
+    return engine_response({"detail": result}, status_code=404)
+
+async def run_compute(fn, *args):
+    """Runs CPU-bound work on the compute executor, off the event loop (busy -> 503, too slow -> 504)."""
+    try:
+        return await compute_executor.run(fn, *args)
+    except ComputeQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
 # ----------------------------------------------------
 # EXISTING ENDPOINTS
 # ----------------------------------------------------
@@ -79,6 +162,16 @@ async def upload_emission_data(record: EmissionRecordCreate, db: Any = Depends(g
 async def get_latest_emissions(db: Any = Depends(get_db)):
     return await crud.get_latest_emissions(db, limit=20)
 
+@emissions_router.get("/anomalies", response_model=List[EmissionRecord])
+async def get_recent_anomalies(
+    mine_id: Optional[str] = Query(None),
+    hours: Optional[int] = Query(None, ge=1, description="Only anomalies from the last N hours."),
+    limit: int = Query(50, ge=1, le=500),
+    db: Any = Depends(get_db),
+):
+    """Recently ingested records flagged by the streaming (EWMA) anomaly detector, newest first."""
+    return await crud.get_recent_anomalies(db, limit=limit, mine_id=mine_id, hours=hours)
+
 @emissions_router.get("/historical/{mine_id}", response_model=List[EmissionRecord])
 async def get_historical_emissions(mine_id: str, days: int = 30, db: Any = Depends(get_db)):
     if not mine_id:
@@ -110,6 +203,10 @@ async def upload_emissions_csv(file: UploadFile = File(...), db: Any = Depends(g
         contents = await file.read()
         result = await crud.handle_csv_upload(contents, db)
         return {"message": "CSV uploaded successfully.", "data": result}
+    except ComputeQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ComputeTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {e}")
     except Exception as e:
@@ -119,12 +216,167 @@ async def upload_emissions_csv(file: UploadFile = File(...), db: Any = Depends(g
 # 4. ML OFFSET PREDICTION ENDPOINT
 # ----------------------------------------------------
 
-@emissions_router.get("/mine-offsets", response_model=MineOffsetResponse)
+@emissions_router.get("/mine-offsets", response_model=None, responses={200: {"model": MineOffsetResponse}})
 async def get_mine_offsets_prediction(name: str = Query(..., description="Name of the mine")):
+    ensure_engine_ready()
+    # Cache hits are cheap enough to answer on the event loop
+    result = predictor.get_cached(name)
     try:
-        # Calls the manually loaded predictor
-        result = predictor.predict(name)
-        return result
+        if result is None:
+            # Calls the manually loaded predictor
+            result = await run_compute(predictor.predict, name)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Prediction Runtime Error: {e}")
-        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
+    if "error" in result:
+        # Unknown or ambiguous name: return the engine's ranked suggestions
+        return engine_not_found(result)
+    return engine_response(result)
+
+@emissions_router.post("/mine-offsets/batch", response_model=None, responses={200: {"model": MineOffsetBatchResponse}})
+async def get_mine_offsets_batch(request: MineOffsetBatchRequest):
+    """
+    Offset plans for a portfolio of mines, computed in one engine pass, plus portfolio
+    totals. Mines the engine failed on are listed under `failed` and left out of the totals.
+    """
+    ensure_engine_ready()
+    try:
+        return engine_response(await run_compute(predictor.predict_portfolio, request.mine_names))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Batch Prediction Runtime Error: {e}")
+        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
+
+@emissions_router.post("/mine-offsets/optimize", response_model=None, responses={200: {"model": MineOptimizeResponse}})
+async def optimize_mine_offsets(request: MineOptimizeRequest):
+    """
+    Minimum-cost teak/acacia/pioneer plans that meet each mine's annual target within
+    its registry teak cap and land limit (land-limited mines get the largest offset
+    that fits). One LP solve covers the whole batch.
+    """
+    ensure_engine_ready()
+    try:
+        return engine_response(await run_compute(predictor.optimize_plans, request.mine_names))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Mix Optimization Runtime Error: {e}")
+        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
+
+@emissions_router.post("/mine-offsets/{name}/scenarios", response_model=None, responses={200: {"model": ScenarioSweepResponse}})
+async def sweep_mine_offset_scenarios(name: str, request: ScenarioSweepRequest):
+    """
+    Evaluates every combination of the given cost, species-mix, credit-price and
+    target-share ranges for one mine and returns the cost-vs-offset Pareto frontier.
+    """
+    ensure_engine_ready()
+    try:
+        result = await run_compute(predictor.sweep_scenarios, name, request.model_dump(exclude_none=True))
+    except HTTPException:
+        raise
+    except ValueError as e:
+        # e.g. the grid is larger than the engine's limit
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        print(f"Scenario Sweep Runtime Error: {e}")
+        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
+    if "error" in result:
+        return engine_not_found(result)
+    return engine_response(result)
+
+@emissions_router.get("/mines/search")
+async def search_mines(
+    q: str = Query(..., min_length=1, description="Partial mine, district or state name"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Ranked autocomplete over mine, district and state names (in-memory index, sub-millisecond)."""
+    ensure_engine_ready()
+    results = predictor.search_mines(q, limit=limit)
+    return engine_response({"query": q, "count": len(results), "results": results})
+
+@emissions_router.get("/mine-offsets/cache-stats")
+async def get_mine_offsets_cache_stats():
+    """Hit/miss/eviction counters of the offset-plan cache."""
+    return predictor.cache_stats()
+
+
+@emissions_router.get("/forecast/{mine}")
+async def get_emission_forecast(mine: str, horizon: int = Query(12, ge=1, le=60, description="Months to forecast.")):
+    """
+    Monthly Emission_Index forecast (trend + yearly seasonality, ~95% interval) for one
+    mine. Parameters for all mines are fitted in one batch when the engine loads.
+    """
+    ensure_engine_ready()
+    result = predictor.forecast(mine, horizon)
+    if "error" in result:
+        return engine_not_found(result)
+    return engine_response(result)
+
+
+# ----------------------------------------------------
+# 5. SEQUESTRATION SCORING ENDPOINTS
+# ----------------------------------------------------
+
+@emissions_router.get("/sequestration/regions")
+async def get_sequestration_regions():
+    """Precomputed standard-tree sequestration values per region."""
+    ensure_engine_ready()
+    return engine_response(predictor.sequestration_regions())
+
+@emissions_router.get("/sequestration/training")
+async def get_sequestration_training_report():
+    """Training report of the loaded regional models (per-region fit time and OOB score)."""
+    ensure_engine_ready()
+    return engine_response(predictor.training_report())
+
+@emissions_router.post("/sequestration/score", response_model=TreeScoringResponse)
+async def score_tree_features(request: TreeScoringRequest):
+    """Scores surveyed tree feature vectors in bulk: one vectorized model call per region."""
+    ensure_engine_ready()
+    try:
+        scores = await run_compute(predictor.score_trees, [tree.model_dump() for tree in request.trees])
+        return {"count": len(scores), "scores": scores}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Tree Scoring Runtime Error: {e}")
+        raise HTTPException(status_code=500, detail=f"ML Model Error: {str(e)}")
+
+
+# ----------------------------------------------------
+# 6. ADMIN: HOT DATASET RELOAD
+# ----------------------------------------------------
+
+def log_reload_outcome(task: asyncio.Task):
+    """Done-callback of the admin reload task: the request has long returned, so report here."""
+    if task.cancelled():
+        print("ML engine reload was cancelled.")
+    elif task.exception() is not None:
+        print(f"ML engine reload failed: {task.exception()!r}")
+    elif task.result():
+        print(f"ML engine reload finished: {predictor.status()}")
+    else:
+        print(f"ML engine reload did not complete: {predictor.status()}")
+
+@emissions_router.post("/admin/reload", status_code=status.HTTP_202_ACCEPTED)
+async def reload_ml_engine(request: Request, x_admin_token: Optional[str] = Header(None)):
+    """
+    Rebuilds the ML engine from the current CSVs in the background and swaps it in
+    atomically; requests keep being served from the old state until then.
+    Requires the X-Admin-Token header (settings.ADMIN_TOKEN); 409 while a load is running.
+    """
+    if (not settings.ADMIN_TOKEN or not x_admin_token
+            or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN)):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+    ml_status = predictor.status()
+    running = getattr(request.app.state, "ml_reload", None)
+    if (running is not None and not running.done()) or ml_status["state"] in ("loading", "reloading"):
+        raise HTTPException(status_code=409, detail={"message": "An engine load is already in progress.", "ml_engine": ml_status})
+    # Keep a reference: the event loop only holds tasks weakly
+    task = asyncio.create_task(compute_executor.run(predictor.reload, timeout=0))
+    task.add_done_callback(log_reload_outcome)
+    request.app.state.ml_reload = task
+    return {"message": "ML engine reload started.", "ml_engine": ml_status}
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Query, HTTPException, Depends
+from datetime import datetime
+from fastapi import APIRouter, Query, Path, HTTPException, Depends, Response
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.database import get_db
 # Schema import is good to keep, even if not strictly enforcing response_model
-from app.schemas import HotspotResponse 
+from app.schemas import HotspotResponse, MineRollupResponse, HotspotPolygonQuery
+from app.core.responses import FastJSONResponse
+from ml_service.hotspot_clusters import CLUSTER_COLLECTION, MAX_CLUSTER_ZOOM, cell_range, cluster_summary
+from ml_service.hotspot_tiles import (
+    TILE_COLLECTION, TILE_VERSION_ID, MAX_TILE_ZOOM, tile_bounds, tile_cache_key, encode_tile,
+)
 
 hotspots_router = APIRouter()
 
@@ -12,7 +18,7 @@ async def test_connection(db: AsyncIOMotorDatabase = Depends(get_db)):
     """Simple test to check MongoDB connection"""
     try:
         count = await db.emission_hotspots.count_documents({})
-        return {"success": True, "message": f"Found {count} hotspots in database"}
+        return FastJSONResponse({"success": True, "message": f"Found {count} hotspots in database"})
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -35,7 +41,7 @@ async def get_top_hotspots(
         if hotspots and ("Latitude" not in hotspots[0]):
             print("⚠️ WARNING: The first hotspot retrieved has NO Latitude/Longitude field!")
         
-        return {"success": True, "count": len(hotspots), "data": hotspots}
+        return FastJSONResponse({"success": True, "count": len(hotspots), "data": hotspots})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -62,7 +68,7 @@ async def get_hotspots(
         cursor = db.emission_hotspots.find(filter_query, {"_id": 0}).skip(skip).limit(limit)
         hotspots = await cursor.to_list(length=limit)
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "page": page,
             "limit": limit,
@@ -70,7 +76,7 @@ async def get_hotspots(
             "total_pages": (total + limit - 1) // limit if limit > 0 else 0,
             "count": len(hotspots),
             "data": hotspots
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -100,7 +106,25 @@ async def get_hotspot_stats(db: AsyncIOMotorDatabase = Depends(get_db)):
                     "minScore": round(stat["minScore"], 2)
                 }
                 formatted_stats["total"] += stat["count"]
-        return {"success": True, "stats": formatted_stats}
+        return FastJSONResponse({"success": True, "stats": formatted_stats})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- 5. PER-MINE ROLLUPS (one document per mine, refreshed by data_uploader) ---
+@hotspots_router.get("/mines", response_model=None, responses={200: {"model": MineRollupResponse}})
+async def get_mine_rollups(
+    level: Optional[str] = Query(None, description="Only mines whose latest reading has this level."),
+    state: Optional[str] = Query(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Every mine's latest/mean/max score, level distribution, gas means and coordinates in one response."""
+    try:
+        filter_query = {}
+        if level: filter_query["latest.Hotspot_Level"] = level
+        if state: filter_query["State"] = state
+        cursor = db.mine_hotspot_rollups.find(filter_query, {"_id": 0}).sort("latest.Emission_Score", -1)
+        mines = await cursor.to_list(length=None)
+        return FastJSONResponse({"success": True, "count": len(mines), "data": mines})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -114,24 +138,127 @@ async def get_hotspots_by_state(db: AsyncIOMotorDatabase = Depends(get_db)):
         ]
         cursor = db.emission_hotspots.aggregate(pipeline)
         results = await cursor.to_list(length=None)
-        return {"success": True, "data": results}
+        return FastJSONResponse({"success": True, "data": results})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def bbox_polygon(min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> dict:
+    """GeoJSON polygon for a lat/lng bounding box."""
+    return {"type": "Polygon", "coordinates": [[
+        [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]
+    ]]}
+
 @hotspots_router.get("/geo")
 async def get_hotspots_geo(
     min_lat: Optional[float] = Query(None), max_lat: Optional[float] = Query(None),
     min_lng: Optional[float] = Query(None), max_lng: Optional[float] = Query(None),
     limit: int = 1000, 
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom: returns precomputed clusters instead of raw rows."),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     try:
+        has_bbox = all([min_lat is not None, max_lat is not None, min_lng is not None, max_lng is not None])
+        if zoom is not None:
+            # One cluster per occupied grid cell (~64px), so the payload scales with the viewport, not the rows
+            cluster_zoom = min(zoom, MAX_CLUSTER_ZOOM)
+            filter_query = {"zoom": cluster_zoom}
+            if has_bbox:
+                ix_min, ix_max, iy_min, iy_max = cell_range(min_lat, max_lat, min_lng, max_lng, cluster_zoom)
+                filter_query["iy"] = {"$gte": iy_min, "$lte": iy_max}
+                filter_query["ix"] = {"$gte": ix_min, "$lte": ix_max}
+            cursor = db[CLUSTER_COLLECTION].find(filter_query).limit(limit)
+            clusters = [cluster_summary(doc) for doc in await cursor.to_list(length=limit) if doc.get("count")]
+            return FastJSONResponse({"success": True, "mode": "clusters", "zoom": cluster_zoom,
+                                     "count": len(clusters), "limit": limit, "data": clusters})
+
         filter_query = {}
-        if all([min_lat is not None, max_lat is not None, min_lng is not None, max_lng is not None]):
-            filter_query["Latitude"] = {"$gte": min_lat, "$lte": max_lat}
-            filter_query["Longitude"] = {"$gte": min_lng, "$lte": max_lng}
+        if has_bbox:
+            # Served by the 2dsphere index on 'location' (edges of the box are geodesic)
+            filter_query["location"] = {"$geoWithin": {"$geometry": bbox_polygon(min_lat, max_lat, min_lng, max_lng)}}
         cursor = db.emission_hotspots.find(filter_query, {"_id": 0}).limit(limit)
         hotspots = await cursor.to_list(length=limit)
-        return {"success": True, "count": len(hotspots), "limit": limit, "data": hotspots}
+        return FastJSONResponse({"success": True, "count": len(hotspots), "limit": limit, "data": hotspots})
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- 6. PROXIMITY AND AREA QUERIES (2dsphere index on 'location') ---
+@hotspots_router.get("/near")
+async def get_hotspots_near(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    k: int = Query(10, ge=1, le=1000, description="Number of nearest hotspots to return."),
+    max_km: Optional[float] = Query(None, gt=0, description="Only hotspots within this distance."),
+    level: Optional[str] = Query(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """The k hotspots nearest to a point, closest first, with their distance in km."""
+    try:
+        geo_near = {
+            "near": {"type": "Point", "coordinates": [lng, lat]},
+            "distanceField": "distance_km",
+            "distanceMultiplier": 0.001,
+            "spherical": True,
+        }
+        if max_km is not None:
+            geo_near["maxDistance"] = max_km * 1000
+        if level:
+            geo_near["query"] = {"Hotspot_Level": level}
+        pipeline = [{"$geoNear": geo_near}, {"$limit": k}, {"$project": {"_id": 0}}]
+        hotspots = await db.emission_hotspots.aggregate(pipeline).to_list(length=k)
+        return FastJSONResponse({"success": True, "count": len(hotspots), "data": hotspots})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@hotspots_router.post("/within")
+async def get_hotspots_within(query: HotspotPolygonQuery, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Hotspots inside a GeoJSON polygon (e.g. a district outline or an area drawn on the map)."""
+    try:
+        filter_query = {"location": {"$geoWithin": {"$geometry": query.polygon.model_dump()}}}
+        if query.level: filter_query["Hotspot_Level"] = query.level
+        cursor = db.emission_hotspots.find(filter_query, {"_id": 0}).limit(query.limit)
+        hotspots = await cursor.to_list(length=query.limit)
+        return FastJSONResponse({"success": True, "count": len(hotspots), "limit": query.limit, "data": hotspots})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# --- 7. BINARY MAP TILES (typed-array layout documented in ml_service/hotspot_tiles.py) ---
+@hotspots_router.get("/tiles/{z}/{x}/{y}.bin")
+async def get_hotspot_tile(
+    z: int = Path(..., ge=0, le=MAX_TILE_ZOOM),
+    x: int = Path(..., ge=0),
+    y: int = Path(..., ge=0),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Hotspot points of one z/x/y tile as packed binary arrays; built once per ingestion and cached in Mongo."""
+    if x >= 2 ** z or y >= 2 ** z:
+        raise HTTPException(status_code=400, detail=f"Tile {z}/{x}/{y} does not exist.")
+    try:
+        tiles = db[TILE_COLLECTION]
+        meta = await tiles.find_one({"_id": TILE_VERSION_ID})
+        key = tile_cache_key(meta.get("version", 0) if meta else 0, z, x, y)
+
+        cached = await tiles.find_one({"_id": key})
+        if cached:
+            data, count = bytes(cached["data"]), cached["count"]
+        else:
+            south, north, west, east = tile_bounds(z, x, y)
+            # [west, east) x (south, north], like the tile maths (floor of the Mercator position): a point
+            # on a shared edge or corner belongs to exactly one tile. Uses the (Longitude, Latitude) index.
+            query = {"Longitude": {"$gte": west, "$lt": east}, "Latitude": {"$gt": south, "$lte": north}}
+            projection = {"_id": 0, "Latitude": 1, "Longitude": 1, "Emission_Score": 1, "Hotspot_Level": 1}
+            rows = await db.emission_hotspots.find(query, projection).to_list(length=None)
+            count = len(rows)
+            data = encode_tile(
+                z, x, y,
+                [row["Latitude"] for row in rows], [row["Longitude"] for row in rows],
+                [row.get("Emission_Score") for row in rows], [row.get("Hotspot_Level") for row in rows],
+            )
+            await tiles.replace_one({"_id": key}, {"data": data, "count": count, "created_at": datetime.utcnow()}, upsert=True)
+
+        return Response(content=data, media_type="application/octet-stream", headers={
+            "Cache-Control": "public, max-age=300",
+            "ETag": f'"{key}"',
+            "X-Hotspot-Count": str(count),
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -24,8 +24,13 @@ from app.api.endpoints.emissions import emissions_router
 # Import the hotspots router
 from app.api.endpoints.hotspots import hotspots_router 
 
+# orjson rendering for every endpoint (see app/core/responses.py). FastAPI still runs
+# plain return values through jsonable_encoder first, so routes that return NumPy
+# payloads (ML engine, hotspots) return a FastJSONResponse themselves.
+from app.core.responses import FastJSONResponse
+
 # Initialize the main API router that all sub-routers plug into
-api_router = APIRouter()
+api_router = APIRouter(default_response_class=FastJSONResponse)
 
 # Register the emissions router
 # Endpoints will be accessible at /api/v1/emissions/...
@@ -0,0 +1,69 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+
+# ----------------------------------------------------
+# STREAMING ANOMALY DETECTION (per mine_id)
+# ----------------------------------------------------
+# Every record posted to /emissions/data-upload is scored against an
+# exponentially weighted mean and variance kept per mine and per field. Each
+# update is O(1) time and memory and never reads history back from Mongo.
+# A record's score is its largest absolute z-score against the statistics *before*
+# it was seen; scores above the threshold flag the record once the mine has
+# passed its warm-up.
+#
+# The statistics live only in Mongo (one document per mine). They are advanced
+# with a single pipeline update that computes the new mean and variance from the
+# stored values server-side, so any number of workers can ingest for the same
+# mine without overwriting each other's updates.
+
+DETECTOR_FIELDS = ("co2_tons", "ch4_tons", "total_carbon_eq")
+VARIANCE_FLOOR = 1e-9
+
+class EWMAAnomalyDetector:
+    def __init__(self, alpha: float, threshold: float, warmup: int, fields: Iterable[str] = DETECTOR_FIELDS):
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.fields = tuple(fields)
+
+    def _finite_values(self, values: Dict[str, Any]) -> Dict[str, float]:
+        return {field: float(values[field]) for field in self.fields
+                if values.get(field) is not None and math.isfinite(values[field])}
+
+    def score(self, state_doc: Optional[Dict[str, Any]], values: Dict[str, float]) -> Tuple[float, bool]:
+        """Scores one record against a mine's state document (None for a new mine): (score, is_anomaly)."""
+        state_doc = state_doc or {}
+        mean, var = state_doc.get("mean", {}), state_doc.get("var", {})
+        score = 0.0
+        for field, x in self._finite_values(values).items():
+            if field in mean:
+                score = max(score, abs(x - mean[field]) / math.sqrt(max(var[field], VARIANCE_FLOOR)))
+        is_anomaly = int(state_doc.get("count", 0)) >= self.warmup and score > self.threshold
+        return score, is_anomaly
+
+    def update_pipeline(self, values: Dict[str, float]) -> List[Dict[str, Any]]:
+        """
+        Update pipeline folding one record into a mine's state document (upsert-safe).
+        All expressions read the stored values, so the update is atomic per mine.
+        The first value of a field becomes its mean, with zero variance.
+        """
+        updates: Dict[str, Any] = {"count": {"$add": [{"$ifNull": ["$count", 0]}, 1]}}
+        for field, x in self._finite_values(values).items():
+            mean, var = f"$mean.{field}", f"$var.{field}"
+            seen = {"$ne": [{"$type": mean}, "missing"]}
+            diff = {"$subtract": [{"$literal": x}, mean]}
+            updates[f"mean.{field}"] = {"$cond": [seen, {"$add": [mean, {"$multiply": [self.alpha, diff]}]}, {"$literal": x}]}
+            updates[f"var.{field}"] = {"$cond": [seen, {"$multiply": [
+                1 - self.alpha, {"$add": [var, {"$multiply": [self.alpha, diff, diff]}]}]}, 0.0]}
+        return [{"$set": updates}]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"alpha": self.alpha, "threshold": self.threshold, "warmup_records": self.warmup}
+
+anomaly_detector = EWMAAnomalyDetector(
+    alpha=settings.ANOMALY_EWMA_ALPHA,
+    threshold=settings.ANOMALY_Z_THRESHOLD,
+    warmup=settings.ANOMALY_WARMUP_RECORDS,
+)
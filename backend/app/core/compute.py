@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+
+# ----------------------------------------------------
+# COMPUTE EXECUTOR (CPU-bound pandas / sklearn work)
+# ----------------------------------------------------
+# Async endpoints must never run pandas or model code directly on the event
+# loop: one slow prediction or CSV parse would stall every other request,
+# including cheap Mongo reads. Heavy work goes through this bounded pool instead.
+# Threads (not processes) are used because the ML engine state and plan cache
+# live in this process; pandas and sklearn release the GIL in their hot loops.
+
+class ComputeQueueFullError(Exception):
+    """Raised when the executor's backlog is at capacity (maps to HTTP 503)."""
+
+class ComputeTimeoutError(Exception):
+    """Raised when a task exceeds its timeout (maps to HTTP 504)."""
+
+class ComputeExecutor:
+    def __init__(self, max_workers: int, max_queue: int, default_timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compute")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+
+    def _track(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self.completed += 1
+            return result
+        except BaseException:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Runs fn(*args, **kwargs) on the pool and awaits the result.
+        timeout=None uses the default; timeout=0 waits indefinitely. A timed-out task
+        keeps its worker until it finishes (threads cannot be killed), but the caller
+        is released immediately.
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self.rejected += 1
+                raise ComputeQueueFullError(f"Compute queue is full ({self.max_queue} tasks waiting).")
+            self._queued += 1
+            self.submitted += 1
+
+        task = self._pool.submit(self._track, fn, args, kwargs)
+        future = asyncio.wrap_future(task)
+        timeout = self.default_timeout if timeout is None else timeout
+        if not timeout:
+            return await future
+        try:
+            # shield: a timeout must not cancel a task that is already running
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            if task.cancel():
+                # Never started: give its queue slot back
+                with self._lock:
+                    self._queued -= 1
+            else:
+                # Still running: consume its eventual result so errors are not reported as unretrieved
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            raise ComputeTimeoutError(f"Compute task exceeded {timeout:.1f}s.")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "default_timeout_seconds": self.default_timeout,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+compute_executor = ComputeExecutor(
+    max_workers=settings.COMPUTE_WORKERS,
+    max_queue=settings.COMPUTE_MAX_QUEUE,
+    default_timeout=settings.COMPUTE_TASK_TIMEOUT_SECONDS,
+)
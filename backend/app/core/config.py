@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 from pydantic import Field
 
 class Settings(BaseSettings):
@@ -10,6 +10,20 @@ class Settings(BaseSettings):
     MONGO_URI: str = Field(..., description="MongoDB connection string (e.g., mongodb://localhost:27017/dbname).")
     ALLOWED_HOSTS: str = Field(..., description="Comma-separated list of allowed CORS origins.")
 
+    # Compute executor for CPU-bound pandas/sklearn work (see app/core/compute.py)
+    COMPUTE_WORKERS: int = Field(4, ge=1, description="Worker threads for ML predictions and CSV parsing.")
+    COMPUTE_MAX_QUEUE: int = Field(64, ge=1, description="Tasks allowed to wait for a worker before requests get 503.")
+    COMPUTE_TASK_TIMEOUT_SECONDS: float = Field(30.0, ge=0, description="Default per-task timeout (0 disables it).")
+
+    # Hot reload of the ML datasets (see app/main.py and /emissions/admin/reload)
+    ML_RELOAD_POLL_SECONDS: float = Field(30.0, ge=0, description="How often to check the ML CSVs for changes (0 disables the watcher).")
+    ADMIN_TOKEN: Optional[str] = Field(None, min_length=32, description="X-Admin-Token for /emissions/admin/* (unset disables those endpoints).")
+
+    # Streaming anomaly detection on /emissions/data-upload (see app/core/anomaly.py)
+    ANOMALY_EWMA_ALPHA: float = Field(0.1, gt=0, lt=1, description="EWMA weight of the newest record.")
+    ANOMALY_Z_THRESHOLD: float = Field(3.0, gt=0, description="Score (|z|) above which a record is flagged.")
+    ANOMALY_WARMUP_RECORDS: int = Field(10, ge=0, description="Records per mine before anything is flagged.")
+
     @property
     def CORS_ORIGINS(self) -> List[str]:
         return [host.strip() for host in self.ALLOWED_HOSTS.split(',') if host.strip()]
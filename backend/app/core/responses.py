@@ -0,0 +1,73 @@
+import math
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError: # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    from bson import ObjectId, Decimal128
+except ImportError: # pragma: no cover - bson ships with motor/pymongo
+    ObjectId = Decimal128 = None
+
+# ----------------------------------------------------
+# FAST JSON RESPONSES
+# ----------------------------------------------------
+# Plan and hotspot payloads are built from pandas/NumPy data. Instead of first
+# walking every response to coerce NumPy scalars and NaN into plain Python
+# (ml_engine.convert_safe), this response class hands the content straight to
+# orjson, which encodes NumPy scalars/arrays, datetimes and NaN (as null)
+# natively in one pass. Only the few types orjson does not know reach
+# encode_default().
+#
+# Routes must *return* a FastJSONResponse to get this: a plain dict return value
+# is first passed through Pydantic/jsonable_encoder, which rejects NumPy types.
+
+def encode_default(obj: Any) -> Any:
+    """Fallback encoder for values orjson cannot serialize on its own."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, (pd.Period, pd.Timedelta)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if ObjectId is not None and isinstance(obj, (ObjectId, Decimal128)):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _to_builtin(obj: Any) -> Any:
+    """Plain-Python copy of obj for the stdlib encoder (only used without orjson)."""
+    if isinstance(obj, dict):
+        return {str(k): _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_builtin(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return [_to_builtin(v) for v in obj.tolist()]
+    if isinstance(obj, float) or isinstance(obj, np.floating):
+        return None if math.isnan(obj) or math.isinf(obj) else float(obj)
+    if isinstance(obj, (str, int, bool)) or obj is None:
+        return obj
+    return _to_builtin(encode_default(obj))
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (NumPy/pandas aware); stdlib fallback when orjson is missing."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(
+                content,
+                default=encode_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        return super().render(_to_builtin(content))
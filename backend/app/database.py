@@ -27,6 +27,10 @@ async def init_db():
         
         print("✅ MongoDB connection successful (Pure Motor).")
 
+        # Indexes used by the record/anomaly queries
+        from .api.crud.emission_data import ensure_indexes
+        await ensure_indexes(database)
+
     except Exception as e:
         print(f"❌ Error connecting to MongoDB. Please ensure your local server is running: {e}")
         # NOTE: We keep the app running even on failure, but the get_db dependency 
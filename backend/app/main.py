@@ -1,10 +1,13 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 # FIX 1: Use relative import for core.config
 from .core.config import settings
 # FIX 2: Use correct relative import path for the router module
 from .api.router import api_router # Imports the specific api_router object
 from .database import init_db 
+from .api.endpoints.emissions import predictor
+from .core.compute import compute_executor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -29,13 +32,52 @@ app.add_middleware(
 # This asynchronous startup event connects to MongoDB before serving requests
 @app.on_event("startup")
 async def on_startup(): 
+    # Warm the ML engine in the background so the app binds immediately; /ready reports progress
+    print("Starting ML engine warmup in the background...")
+    app.state.ml_warmup = asyncio.create_task(compute_executor.run(predictor.warmup, timeout=0))
+    if settings.ML_RELOAD_POLL_SECONDS > 0:
+        app.state.ml_watcher = asyncio.create_task(watch_ml_datasets(settings.ML_RELOAD_POLL_SECONDS))
+
     print("Initializing MongoDB connection...")
     await init_db()
 
+async def watch_ml_datasets(interval: float):
+    """Polls the ML source files' mtimes and hot-reloads the engine when one changes."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if predictor.datasets_changed():
+                print("ML dataset change detected; reloading engine in the background...")
+                await compute_executor.run(predictor.reload, timeout=0)
+        except Exception as e:
+            print(f"ML dataset watcher error: {e}")
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    watcher = getattr(app.state, "ml_watcher", None)
+    if watcher:
+        watcher.cancel()
+    compute_executor.shutdown()
+
 # Include the main API router with a version prefix
 app.include_router(api_router, prefix="/api/v1") # FIX 3: Use the imported api_router object
 
 # Basic root endpoint for health check
 @app.get("/")
 def read_root():
-    return {"message": f"{settings.PROJECT_NAME} is running! Visit /docs for the Swagger UI."}
\ No newline at end of file
+    return {"message": f"{settings.PROJECT_NAME} is running! Visit /docs for the Swagger UI."}
+
+# Readiness probe for the load balancer: 503 until the ML engine is warm
+@app.get("/ready")
+def read_readiness(response: Response):
+    ml_status = predictor.status()
+    # Stays ready during a hot reload: the previous engine state keeps serving
+    ready = predictor.is_ready()
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, "ml_engine": ml_status}
+
+# Compute executor metrics: queue depth, running tasks, timeouts and rejections
+@app.get("/compute/stats")
+def read_compute_stats():
+    return compute_executor.stats()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Any, Dict, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, Any, Dict, List, Literal, Annotated
 from datetime import datetime
 
 # ----------------------------------------------------
@@ -16,6 +16,8 @@ class EmissionRecord(BaseModel):
     ch4_tons: float
     total_carbon_eq: float
     model_version: Optional[str] = None
+    anomaly_score: Optional[float] = Field(None, description="Largest |z| vs the mine's EWMA statistics at ingestion.")
+    is_anomaly: Optional[bool] = None
     
     class Config:
         json_encoders = {datetime: lambda dt: dt.isoformat()}
@@ -114,6 +116,55 @@ class HotspotResponse(BaseModel):
     count: int
     data: List[HotspotItem]
 
+class HotspotLatest(BaseModel):
+    Date: Optional[str] = None
+    Emission_Score: Optional[float] = None
+    Hotspot_Level: Optional[str] = None
+
+class MineHotspotRollup(BaseModel):
+    """One mine's summary of all its hotspot rows (materialized on ingestion)."""
+    Mine_Name: str
+    State: Optional[str] = None
+    District: Optional[str] = None
+    Latitude: Optional[float] = None
+    Longitude: Optional[float] = None
+    latest: HotspotLatest
+    mean_score: Optional[float] = None
+    max_score: Optional[float] = None
+    record_count: int = 0
+    level_counts: Dict[str, int] = {}
+    gas_means: Dict[str, Optional[float]] = {}
+    updated_at: Optional[datetime] = None
+
+class MineRollupResponse(BaseModel):
+    success: bool = True
+    count: int
+    data: List[MineHotspotRollup]
+
+class GeoJSONPolygon(BaseModel):
+    """GeoJSON Polygon: rings of [longitude, latitude] positions, outer ring first."""
+    type: Literal["Polygon"] = "Polygon"
+    coordinates: List[List[List[float]]] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_rings(self):
+        for ring in self.coordinates:
+            if any(len(position) != 2 for position in ring):
+                raise ValueError("Polygon positions must be [longitude, latitude] pairs.")
+            if ring and ring[0] != ring[-1]:
+                ring.append(list(ring[0])) # GeoJSON rings are closed
+            if len(ring) < 4:
+                raise ValueError("Polygon rings need at least 3 distinct positions.")
+            if any(not (-180 <= lng <= 180 and -90 <= lat <= 90) for lng, lat in ring):
+                raise ValueError("Polygon positions must be valid longitude/latitude values.")
+        return self
+
+class HotspotPolygonQuery(BaseModel):
+    """Hotspots inside a drawn area (POST /hotspots/within)."""
+    polygon: GeoJSONPolygon
+    level: Optional[str] = None
+    limit: int = Field(1000, ge=1, le=10000)
+
 # ----------------------------------------------------
 # 4. MINE OFFSET SCHEMAS (For ML Predictions & Planning)
 # ----------------------------------------------------
@@ -176,4 +227,155 @@ class MineOffsetResponse(BaseModel):
     waste_to_wealth: WasteToWealth
     carbon_credits: CarbonCredits
     what_if_scenarios: WhatIfScenarios
-    graphs: Graphs
\ No newline at end of file
+    graphs: Graphs
+
+class MineOffsetBatchRequest(BaseModel):
+    """Portfolio of mines to plan in one call."""
+    mine_names: List[str] = Field(..., min_length=1, max_length=500, description="Mine names to plan offsets for.")
+
+class PortfolioTotals(BaseModel):
+    mine_count: int
+    annual_offset_target_tonnes: float
+    total_trees_required: int
+    estimated_budget_inr: float
+    land_required_ha: float
+    carbon_revenue_potential_inr: float
+
+class MineNotFound(BaseModel):
+    query: str
+    error: str
+    suggestions: List[str] = []
+
+class MinePlanFailure(BaseModel):
+    """A mine whose plan could not be computed (ML engine error); left out of the portfolio totals."""
+    query: str
+    error: str
+
+class MineOffsetBatchResponse(BaseModel):
+    plans: List[MineOffsetResponse]
+    portfolio: PortfolioTotals
+    not_found: List[MineNotFound]
+    failed: List[MinePlanFailure] = []
+
+class ParameterRange(BaseModel):
+    """Either explicit values or an evenly spaced min..max range with `steps` points (costs, prices: >= 0)."""
+    values: Optional[List[Annotated[float, Field(ge=0)]]] = Field(None, min_length=1, max_length=200)
+    min: Optional[float] = Field(None, ge=0)
+    max: Optional[float] = Field(None, ge=0)
+    steps: int = Field(5, ge=1, le=200)
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.values is None and (self.min is None or self.max is None):
+            raise ValueError("Give either 'values' or both 'min' and 'max'.")
+        if self.values is None and self.min > self.max:
+            raise ValueError("'min' must not exceed 'max'.")
+        return self
+
+class ShareRange(ParameterRange):
+    """ParameterRange for shares, which must lie in 0..1."""
+    values: Optional[List[Annotated[float, Field(ge=0, le=1)]]] = Field(None, min_length=1, max_length=200)
+    min: Optional[float] = Field(None, ge=0, le=1)
+    max: Optional[float] = Field(None, ge=0, le=1)
+
+class ScenarioSweepRequest(BaseModel):
+    """
+    Parameter ranges for a what-if sweep; omitted parameters stay at the mine's
+    current plan values. pct_pioneer is whatever teak and acacia leave over.
+    """
+    cost_teak: Optional[ParameterRange] = None
+    cost_acacia: Optional[ParameterRange] = None
+    cost_pioneer: Optional[ParameterRange] = None
+    pct_teak: Optional[ShareRange] = None
+    pct_acacia: Optional[ShareRange] = None
+    credit_price_inr: Optional[ParameterRange] = None
+    target_share: Optional[ShareRange] = Field(None, description="Share of the annual offset target to plan for.")
+    objective: Literal["total_cost", "net_cost"] = "total_cost"
+    enforce_registry_limits: bool = Field(True, description="Cap plans at the registry's land and teak limits.")
+    max_points: int = Field(50, ge=2, le=1000, description="Maximum frontier points returned.")
+
+class ScenarioPoint(BaseModel):
+    cost_teak: float
+    cost_acacia: float
+    cost_pioneer: float
+    pct_teak: float
+    pct_acacia: float
+    pct_pioneer: float
+    credit_price_inr: float
+    target_share: float
+    total_trees: int
+    land_required_ha: float
+    offset_tonnes: float
+    total_cost_inr: float
+    carbon_revenue_inr: float
+    net_cost_inr: float
+    cost_per_tonne_inr: float
+
+class ScenarioSweepResponse(BaseModel):
+    mine_metadata: Dict[str, str]
+    annual_offset_target_tonnes: float
+    land_available_ha: float
+    max_teak_pct: float
+    objective: str
+    parameters: Dict[str, List[float]]
+    combinations_evaluated: int
+    combinations_feasible: int
+    frontier: List[ScenarioPoint]
+
+class MineOptimizeRequest(BaseModel):
+    """Mines to optimize; omit mine_names to optimize every operational-registry mine."""
+    mine_names: Optional[List[str]] = Field(None, min_length=1, max_length=500)
+
+class OptimizedTreePlan(TreePlan):
+    share: float
+
+class OptimizedTreeStrategy(BaseModel):
+    teak: OptimizedTreePlan
+    acacia: OptimizedTreePlan
+    pioneer: OptimizedTreePlan
+
+class OptimizedKPIMetrics(KPIMetrics):
+    target_met: bool
+
+class MixConstraints(BaseModel):
+    max_teak_pct: float
+    land_available_ha: float
+
+class MixComparison(BaseModel):
+    standard_mix_budget_inr: float
+    standard_mix_land_required_ha: float
+    savings_inr: Optional[float] = None
+
+class OptimizedMinePlan(BaseModel):
+    mine_metadata: Dict[str, str]
+    kpis: OptimizedKPIMetrics
+    constraints: MixConstraints
+    tree_plan: OptimizedTreeStrategy
+    comparison: MixComparison
+
+class MineOptimizeResponse(BaseModel):
+    plans: List[OptimizedMinePlan]
+    not_found: List[MineNotFound]
+
+# ----------------------------------------------------
+# 5. SEQUESTRATION SCORING SCHEMAS (Field Survey Plots)
+# ----------------------------------------------------
+
+class TreeFeatures(BaseModel):
+    """One surveyed tree/plot, in the units of the regional training data."""
+    state: str
+    max_height: float = Field(..., ge=0, description="Maximum canopy height in metres.")
+    ndvi: float = Field(..., ge=-1, le=1)
+    age_years: float = Field(..., ge=0)
+
+class TreeScoringRequest(BaseModel):
+    trees: List[TreeFeatures] = Field(..., min_length=1, max_length=100000)
+
+class TreeScore(BaseModel):
+    state: str
+    model_region: Optional[str] = None
+    co2e_stock_t_ha: float
+
+class TreeScoringResponse(BaseModel):
+    count: int
+    scores: List[TreeScore]
@@ -1,10 +1,25 @@
 import pandas as pd
+import numpy as np
+import os
+import sys
+
+# Full refreshes can use ml_service/refresh_pipeline.py instead, which computes these outputs
+# together with the other feature's in a single scan of the source CSV.
+
+# Shared dataset loader (columnar cache of the CSV) lives in ml_service
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_service'))
+import dataset_io
 
 # Load the dataset (The input file must be relative to the CWD, which is /backend)
 try:
     # FIX: Use the explicit path 'feature 1/...' so Python can find the file 
     # when the command is executed from the /backend directory.
-    df = pd.read_csv("feature 1/coal_dataset_10k_5years.csv")
+    # Read through the memory-mapped columnar cache; the CSV is parsed only when it changed.
+    df = dataset_io.load_emissions(
+        "feature 1/coal_dataset_10k_5years.csv",
+        columns=['Date', 'CO2_ppm', 'CH4_ppm', 'SO2_ppm', 'NOx_ppm', 'PM2_5', 'PM10'],
+        sensor_dtype=np.float64,
+    )
     
 except FileNotFoundError:
     print("Error: 'coal_dataset_10k_5years.csv' not found. Please check the file path.")
@@ -1,55 +1,87 @@
 import pandas as pd
+import numpy as np
 import os
+import sys
+import argparse
 
-def run_hotspot_analysis():
-    """Runs the emission hotspot analysis and creates the CSV file."""
+# Full refreshes can use ml_service/refresh_pipeline.py instead, which computes these outputs
+# together with the other feature's in a single scan of the source CSV.
+
+# Shared dataset loader (columnar cache of the CSV) and hotspot scoring live in ml_service
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_service'))
+import dataset_io
+from hotspot_scoring import (
+    SCORE_COLUMNS, LEVELS, RunningStats, emission_scores, hotspot_thresholds, classify_scores,
+)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_INPUT = os.path.join(SCRIPT_DIR, 'coal_dataset_10k_5years.csv')
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, 'emission_analysis_results.csv')
+
+def _print_summary(output_path, total, level_counts, low_thresh, high_thresh):
+    print(f"✅ Hotspot analysis complete. CSV saved to: {output_path}")
+    print(f"   Total records: {total}")
+    print(f"   Red zones: {level_counts.get('Red', 0)}")
+    print(f"   Orange zones: {level_counts.get('Orange', 0)}")
+    print(f"   Yellow zones: {level_counts.get('Yellow', 0)}")
+    print(f"   Thresholds - Low: {round(low_thresh, 2)}, High: {round(high_thresh, 2)}")
+
+def _analyze_in_memory(csv_path, output_path):
+    # Load and clean data (memory-mapped columnar cache; the CSV is parsed only when it changed)
+    df = dataset_io.load_emissions(csv_path, sensor_dtype=np.float64)
+    df = df.dropna(subset=SCORE_COLUMNS)
+
+    df['Emission_Score'] = emission_scores(df)
+    low_thresh, high_thresh = hotspot_thresholds(df['Emission_Score'].mean(), df['Emission_Score'].std())
+    df['Hotspot_Level'] = classify_scores(df['Emission_Score'], low_thresh, high_thresh)
+
+    # Save in the same folder (feature 2)
+    df.to_csv(output_path, index=False)
+    _print_summary(output_path, len(df), df['Hotspot_Level'].value_counts().to_dict(), low_thresh, high_thresh)
+
+def _analyze_chunked(csv_path, output_path, chunk_size):
+    """
+    Two passes over the CSV with at most chunk_size rows in memory: the first
+    accumulates the score statistics, the second classifies and appends each chunk.
+    """
+    stats = RunningStats()
+    # Headers may carry stray whitespace: select on the stripped name, then clean like the second pass
+    score_columns = lambda col: col.strip() in SCORE_COLUMNS
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, usecols=score_columns):
+        stats.update(emission_scores(dataset_io.clean_names(chunk).dropna(subset=SCORE_COLUMNS)))
+    low_thresh, high_thresh = stats.thresholds()
+
+    level_counts = dict.fromkeys(LEVELS, 0)
+    tmp_path = f"{output_path}.tmp"
+    try:
+        for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+            # Same header/name cleaning as the in-memory path's dataset_io loader
+            chunk = dataset_io.clean_names(chunk).dropna(subset=SCORE_COLUMNS)
+            chunk['Emission_Score'] = emission_scores(chunk)
+            chunk['Hotspot_Level'] = classify_scores(chunk['Emission_Score'], low_thresh, high_thresh)
+            for level, count in chunk['Hotspot_Level'].value_counts().items():
+                level_counts[level] += int(count)
+            chunk.to_csv(tmp_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+        # Readers never see a half-written results file
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    _print_summary(output_path, stats.count, level_counts, low_thresh, high_thresh)
+
+def run_hotspot_analysis(chunk_size=None, csv_path=DEFAULT_INPUT, output_path=DEFAULT_OUTPUT):
+    """
+    Runs the emission hotspot analysis and creates the CSV file.
+    chunk_size: rows per chunk for the bounded-memory two-pass mode over large
+    archives; None/0 loads the whole dataset at once.
+    """
     print("\n--- Running Emission Hotspot Analysis ---")
-    
+
     try:
-        # Get the directory where this script is located
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, 'coal_dataset_10k_5years.csv')
-        
-        # Load and clean data
-        df = pd.read_csv(csv_path)
-        df = df.dropna(subset=['CO2_ppm', 'CH4_ppm', 'PM2_5', 'PM10'])
-
-        # Calculate emission score
-        df['Emission_Score'] = (
-            0.4 * df['CO2_ppm'] +
-            0.3 * df['CH4_ppm'] +
-            0.15 * df['PM2_5'] +
-            0.15 * df['PM10']
-        )
-
-        # Calculate thresholds
-        mean_score = df['Emission_Score'].mean()
-        std_score = df['Emission_Score'].std()
-        low_thresh = mean_score - 0.5 * std_score
-        high_thresh = mean_score + 0.5 * std_score
-
-        # Classify emissions
-        def classify_emission(x):
-            if x > high_thresh:
-                return 'Red'
-            elif x > low_thresh:
-                return 'Orange'
-            else:
-                return 'Yellow'
-
-        df['Hotspot_Level'] = df['Emission_Score'].apply(classify_emission)
-
-        # Save in the same folder (feature 2)
-        output_path = os.path.join(script_dir, 'emission_analysis_results.csv')
-        df.to_csv(output_path, index=False)
-
-        print(f"✅ Hotspot analysis complete. CSV saved to: {output_path}")
-        print(f"   Total records: {len(df)}")
-        print(f"   Red zones: {len(df[df['Hotspot_Level'] == 'Red'])}")
-        print(f"   Orange zones: {len(df[df['Hotspot_Level'] == 'Orange'])}")
-        print(f"   Yellow zones: {len(df[df['Hotspot_Level'] == 'Yellow'])}")
-        print(f"   Thresholds - Low: {round(low_thresh, 2)}, High: {round(high_thresh, 2)}")
-        
+        if chunk_size:
+            _analyze_chunked(csv_path, output_path, chunk_size)
+        else:
+            _analyze_in_memory(csv_path, output_path)
         return True
     except FileNotFoundError as e:
         print(f"❌ Error: CSV file not found. Make sure 'coal_dataset_10k_5years.csv' is in the feature 2 folder.")
@@ -60,4 +92,10 @@ def run_hotspot_analysis():
         return False
 
 if __name__ == "__main__":
-    run_hotspot_analysis()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Emission hotspot classification")
+    parser.add_argument("--chunk-size", type=int, default=0,
+                        help="Rows per chunk for the two-pass streaming mode (0 = load everything at once).")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Source emissions CSV.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Results CSV to write.")
+    args = parser.parse_args()
+    run_hotspot_analysis(chunk_size=args.chunk_size, csv_path=args.input, output_path=args.output)
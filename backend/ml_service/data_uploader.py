@@ -1,16 +1,26 @@
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from io import StringIO
 from datetime import datetime
 from typing import List, Dict, Any
+import argparse
 import os
 
+from hotspot_scoring import SCORE_COLUMNS, RunningStats, emission_scores, classify_scores, relabel_ranges
+from hotspot_clusters import CLUSTER_COLLECTION, CLUSTER_LEVELS, cluster_aggregates
+from hotspot_tiles import TILE_COLLECTION, TILE_VERSION_ID
+from dataset_io import clean_names
+
 # --- Configuration (MUST match your setup) ---
 MONGO_URI = "mongodb://localhost:27017/" 
 DB_NAME = "carbon_tracker_db"          
 MONTHLY_COLLECTION = "monthly_emissions"   
 AVERAGE_COLLECTION = "overall_averages"
 HOTSPOT_COLLECTION = "emission_hotspots"  # NEW
+HOTSPOT_STATS_COLLECTION = "hotspot_stats"  # Running Emission_Score statistics + current thresholds
+HOTSPOT_STATS_ID = "Emission_Score"
+HOTSPOT_ROLLUP_COLLECTION = "mine_hotspot_rollups"  # One summary document per mine (map view)
+ROLLUP_GAS_COLUMNS = ['CO2_ppm', 'CH4_ppm', 'PM2_5', 'PM10', 'SO2_ppm', 'NOx_ppm']
 
 # Get the directory where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +30,338 @@ MONTHLY_CSV_FILE = os.path.join(script_dir, '..', 'feature 1', 'monthly_emission
 AVERAGE_CSV_FILE = os.path.join(script_dir, '..', 'feature 1', 'average_emissions.csv')
 HOTSPOT_CSV_FILE = os.path.join(script_dir, '..', 'feature 2', 'emission_analysis_results.csv')  # NEW
 
+# --- Hotspot Helpers ---
+def read_clean_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Reads an ingestion CSV with the dataset loaders' cleaning (stripped headers, trimmed
+    and title-cased State/District/Mine_Name), so a mine is spelled one way in every collection.
+    """
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    if 'Mine_Nam' in df.columns and 'Mine_Name' not in df.columns:
+        df = df.rename(columns={'Mine_Nam': 'Mine_Name'})
+    return clean_names(df)
+
+def hotspot_documents(df: pd.DataFrame, ingestion_time: datetime) -> List[Dict]:
+    """Cleans hotspot rows (column names, numeric coordinates) into Mongo documents."""
+    # --- 🛠️ FIX 1: Handle truncated column names ---
+    # If CSV has "Mine_Nam" instead of "Mine_Name", fix it
+    if 'Mine_Nam' in df.columns and 'Mine_Name' not in df.columns:
+        print("   ⚠️  Renaming 'Mine_Nam' to 'Mine_Name'")
+        df = df.rename(columns={'Mine_Nam': 'Mine_Name'})
+
+    # --- 🛠️ FIX 2: Ensure Lat/Long are Floats ---
+    # This prevents "text" coordinates from breaking the map
+    if 'Latitude' in df.columns:
+        df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
+    if 'Longitude' in df.columns:
+        df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
+
+    # Check if we have valid coordinates
+    if {'Latitude', 'Longitude'} <= set(df.columns):
+        valid_coords = df.dropna(subset=['Latitude', 'Longitude'])
+        print(f"   ✅ Found {len(valid_coords)} rows with valid Latitude/Longitude.")
+
+    data_records: List[Dict] = df.to_dict(orient='records')
+    for record in data_records:
+        record['ingested_at'] = ingestion_time
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None
+        location = geojson_point(record.get('Latitude'), record.get('Longitude'))
+        if location:
+            record['location'] = location
+    return data_records
+
+def geojson_point(lat, lng):
+    """GeoJSON Point for the 2dsphere index ([lng, lat] order), or None for missing/out-of-range coordinates."""
+    if lat is None or lng is None or not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return None
+    return {"type": "Point", "coordinates": [float(lng), float(lat)]}
+
+def ensure_hotspot_indexes(collection):
+    """Indexes the hotspot API and the incremental update rely on (idempotent)."""
+    collection.create_index([("location", "2dsphere")])
+    collection.create_index("Emission_Score")
+    collection.create_index([("Longitude", 1), ("Latitude", 1)]) # map tile extents are lng/lat rectangles
+
+def save_hotspot_stats(db, stats: RunningStats):
+    """Persists the running Emission_Score statistics and the thresholds derived from them."""
+    low_thresh, high_thresh = stats.thresholds()
+    db[HOTSPOT_STATS_COLLECTION].replace_one(
+        {"_id": HOTSPOT_STATS_ID},
+        {**stats.to_document(), "low_threshold": float(low_thresh), "high_threshold": float(high_thresh),
+         "updated_at": datetime.utcnow()},
+        upsert=True,
+    )
+
+def load_hotspot_stats(db) -> RunningStats:
+    """
+    Running statistics of the stored hotspots. Seeded once from the collection
+    itself (count/avg/stdDevSamp aggregate) when no stats document exists yet.
+    """
+    doc = db[HOTSPOT_STATS_COLLECTION].find_one({"_id": HOTSPOT_STATS_ID})
+    if doc:
+        return RunningStats.from_document(doc)
+    summary = list(db[HOTSPOT_COLLECTION].aggregate([
+        {"$match": {"Emission_Score": {"$ne": None}}},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "mean": {"$avg": "$Emission_Score"},
+                    "std": {"$stdDevSamp": "$Emission_Score"}}},
+    ]))
+    if not summary:
+        return RunningStats()
+    count, std = summary[0]["count"], summary[0]["std"] or 0.0
+    return RunningStats(count, summary[0]["mean"], std ** 2 * (count - 1))
+
+def mine_rollup_pipeline(mine_names=None, run_at=None) -> List[Dict]:
+    """
+    Aggregation that summarizes each mine's hotspot rows into one rollup document
+    and merges it into HOTSPOT_ROLLUP_COLLECTION (all mines, or only mine_names).
+    Every merged document is stamped with updated_at = run_at (default: now).
+    """
+    level_count = lambda level: {"$sum": {"$cond": [{"$eq": ["$Hotspot_Level", level]}, 1, 0]}}
+    match = {"Mine_Name": {"$in": list(mine_names)}} if mine_names is not None else {"Mine_Name": {"$ne": None}}
+    return [
+        {"$match": match},
+        {"$sort": {"Mine_Name": 1, "Date": 1}},
+        {"$group": {
+            "_id": "$Mine_Name",
+            "State": {"$last": "$State"},
+            "District": {"$last": "$District"},
+            "Latitude": {"$avg": "$Latitude"},
+            "Longitude": {"$avg": "$Longitude"},
+            "latest_date": {"$last": "$Date"},
+            "latest_score": {"$last": "$Emission_Score"},
+            "latest_level": {"$last": "$Hotspot_Level"},
+            "mean_score": {"$avg": "$Emission_Score"},
+            "max_score": {"$max": "$Emission_Score"},
+            "record_count": {"$sum": 1},
+            "Red": level_count("Red"),
+            "Orange": level_count("Orange"),
+            "Yellow": level_count("Yellow"),
+            **{gas: {"$avg": f"${gas}"} for gas in ROLLUP_GAS_COLUMNS},
+        }},
+        {"$project": {
+            "Mine_Name": "$_id",
+            "State": 1,
+            "District": 1,
+            "Latitude": 1,
+            "Longitude": 1,
+            "latest": {"Date": "$latest_date", "Emission_Score": "$latest_score", "Hotspot_Level": "$latest_level"},
+            "mean_score": 1,
+            "max_score": 1,
+            "record_count": 1,
+            "level_counts": {"Red": "$Red", "Orange": "$Orange", "Yellow": "$Yellow"},
+            "gas_means": {gas: f"${gas}" for gas in ROLLUP_GAS_COLUMNS},
+            "updated_at": {"$literal": run_at} if run_at is not None else "$$NOW",
+        }},
+        {"$merge": {"into": HOTSPOT_ROLLUP_COLLECTION, "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}},
+    ]
+
+def refresh_mine_rollups(db, mine_names=None):
+    """
+    Recomputes the per-mine rollups inside MongoDB. A full refresh (mine_names=None)
+    also drops rollups of mines that no longer have rows; an incremental one only
+    re-aggregates the given mines.
+    """
+    collection = db[HOTSPOT_COLLECTION]
+    collection.create_index([("Mine_Name", 1), ("Date", 1)])
+    if mine_names is not None and not mine_names:
+        return
+    # BSON dates keep milliseconds; truncate so the stored stamp compares equal to run_at
+    now = datetime.utcnow()
+    run_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    list(collection.aggregate(mine_rollup_pipeline(mine_names, run_at)))
+    if mine_names is None:
+        # Merge first, then drop what this run did not touch: readers never see an empty collection
+        db[HOTSPOT_ROLLUP_COLLECTION].delete_many({"updated_at": {"$not": {"$gte": run_at}}})
+    print(f"✅ Refreshed mine rollups in '{HOTSPOT_ROLLUP_COLLECTION}' "
+          f"({'all mines' if mine_names is None else f'{len(mine_names)} mines'}).")
+
+def rebuild_hotspot_clusters(db, df: pd.DataFrame):
+    """Replaces the precomputed map clusters (every zoom level) with those of df."""
+    collection = db[CLUSTER_COLLECTION]
+    collection.delete_many({})
+    documents = cluster_aggregates(df)
+    if documents:
+        collection.insert_many(documents)
+    collection.create_index([("zoom", 1), ("iy", 1), ("ix", 1)])
+    print(f"✅ Stored {len(documents)} map clusters in '{CLUSTER_COLLECTION}'.")
+
+def update_hotspot_clusters(db, new_rows: pd.DataFrame, relabelled: List[tuple]):
+    """
+    Folds new rows into the stored clusters and moves relabelled rows between
+    level counts, with $inc updates on just the cells involved.
+    relabelled: (rows as stored before the update, their new level) pairs.
+    """
+    operations = []
+    for doc in cluster_aggregates(new_rows):
+        increments = {"count": doc["count"], "lat_sum": doc["lat_sum"], "lng_sum": doc["lng_sum"],
+                      "score_sum": doc["score_sum"],
+                      **{f"levels.{level}": doc["levels"][level] for level in CLUSTER_LEVELS}}
+        operations.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$inc": increments, "$max": {"max_score": doc["max_score"]},
+             "$setOnInsert": {"zoom": doc["zoom"], "ix": doc["ix"], "iy": doc["iy"]}},
+            upsert=True,
+        ))
+    for rows, new_level in relabelled:
+        for doc in cluster_aggregates(rows):
+            increments = {f"levels.{level}": -doc["levels"][level] for level in CLUSTER_LEVELS if doc["levels"][level]}
+            increments[f"levels.{new_level}"] = increments.get(f"levels.{new_level}", 0) + doc["count"]
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$inc": increments}))
+    if operations:
+        db[CLUSTER_COLLECTION].bulk_write(operations, ordered=False)
+
+def invalidate_hotspot_tiles(db):
+    """Moves the binary map tiles to a new version and drops the cached ones."""
+    tiles = db[TILE_COLLECTION]
+    tiles.update_one({"_id": TILE_VERSION_ID}, {"$inc": {"version": 1}}, upsert=True)
+    result = tiles.delete_many({"_id": {"$ne": TILE_VERSION_ID}})
+    print(f"✅ Invalidated {result.deleted_count} cached map tiles.")
+
+def ingest_new_hotspots(csv_path: str):
+    """
+    Incremental hotspot update for a CSV holding only *new* raw rows.
+    Scores the new rows, folds them into the running statistics, relabels stored
+    rows only inside the score bands the thresholds moved across, and inserts the
+    new rows. Work and writes scale with the new data, not with the history.
+    """
+    print(f"Connecting to MongoDB at {MONGO_URI}...")
+    try:
+        client = MongoClient(MONGO_URI)
+        db = client[DB_NAME]
+    except Exception as e:
+        print(f"❌ Failed to connect to MongoDB. Ensure your local server is running: {e}")
+        return
+
+    collection = db[HOTSPOT_COLLECTION]
+    print(f"\n--- Incremental update of '{HOTSPOT_COLLECTION}' from '{csv_path}' ---")
+    try:
+        df = read_clean_csv(csv_path).dropna(subset=SCORE_COLUMNS)
+        if df.empty:
+            print("No new hotspot rows found. Skipping.")
+            return
+
+        ensure_hotspot_indexes(collection)
+        stats = load_hotspot_stats(db)
+        old_thresholds = stats.thresholds() if stats.count > 1 else None
+
+        df['Emission_Score'] = emission_scores(df)
+        stats.update(df['Emission_Score'])
+        new_thresholds = stats.thresholds() if stats.count > 1 else (stats.mean, stats.mean)
+        df['Hotspot_Level'] = classify_scores(df['Emission_Score'], *new_thresholds)
+
+        # Stored rows change level only where a threshold moved past their score
+        relabelled = 0
+        relabelled_rows = []
+        touched_mines = set(df['Mine_Name'].dropna()) if 'Mine_Name' in df.columns else set()
+        if old_thresholds is not None:
+            for level, lo, hi in relabel_ranges(old_thresholds, new_thresholds):
+                score_range = {}
+                if lo != float('-inf'):
+                    score_range["$gt"] = lo
+                if hi != float('inf'):
+                    score_range["$lte"] = hi
+                band = {"Emission_Score": score_range, "Hotspot_Level": {"$ne": level}}
+                # The rows about to change (few: only those between old and new thresholds)
+                rows = pd.DataFrame(list(collection.find(band, {"_id": 0, "Mine_Name": 1, "Latitude": 1, "Longitude": 1,
+                                                                "Emission_Score": 1, "Hotspot_Level": 1})))
+                if rows.empty:
+                    continue
+                touched_mines.update(rows['Mine_Name'].dropna())
+                relabelled_rows.append((rows, level))
+                result = collection.update_many(band, {"$set": {"Hotspot_Level": level}})
+                relabelled += result.modified_count
+
+        result = collection.insert_many(hotspot_documents(df, datetime.utcnow()))
+        save_hotspot_stats(db, stats)
+        refresh_mine_rollups(db, sorted(touched_mines))
+        update_hotspot_clusters(db, df, relabelled_rows)
+        invalidate_hotspot_tiles(db)
+
+        print(f"✅ Inserted {len(result.inserted_ids)} new hotspot documents, relabelled {relabelled} existing ones.")
+        print(f"   Thresholds - Low: {round(new_thresholds[0], 2)}, High: {round(new_thresholds[1], 2)} "
+              f"(over {stats.count} records)")
+    except FileNotFoundError:
+        print(f"❌ Error: CSV file not found at {csv_path}. Skipping ingestion.")
+    except Exception as e:
+        print(f"❌ Error during incremental hotspot update: {e}")
+    finally:
+        client.close()
+
+# --- Collection Writers (shared by ingest_data and the refresh pipeline) ---
+def write_monthly(db, df: pd.DataFrame):
+    """Replaces the monthly summary collection with df's rows."""
+    collection = db[MONTHLY_COLLECTION]
+    data_records: List[Dict] = df.to_dict(orient='records')
+
+    if not data_records:
+        print("No monthly data found. Skipping.")
+        return
+    
+    ingestion_time = datetime.utcnow()
+    
+    for record in data_records:
+        record['ingested_at'] = ingestion_time
+        for key, value in record.items():
+            if pd.isna(value): record[key] = None
+            
+    collection.delete_many({}) 
+    result = collection.insert_many(data_records)
+    print(f"✅ Successfully inserted {len(result.inserted_ids)} monthly documents.")
+
+def write_average(db, df: pd.DataFrame):
+    """Replaces the single overall-averages document with df's first row."""
+    collection = db[AVERAGE_COLLECTION]
+    if df.empty:
+        print("No average data found. Skipping.")
+        return
+
+    average_metrics = df.iloc[0].to_dict()
+    ingestion_time = datetime.utcnow()
+    
+    document_to_insert = {
+        "average_emissions_ppm": average_metrics,
+        "ingested_at": ingestion_time
+    }
+    
+    collection.replace_one(
+        filter={},
+        replacement=document_to_insert,
+        upsert=True
+    )
+    print(f"✅ Successfully replaced/inserted 1 average document.")
+
+def write_hotspots(db, df: pd.DataFrame, stats: RunningStats = None):
+    """
+    Replaces all hotspot rows with df's and rebuilds everything derived from them
+    (running score statistics, mine rollups, map clusters, tile cache).
+    stats: the score statistics if the caller already has them.
+    """
+    collection = db[HOTSPOT_COLLECTION]
+    data_records = hotspot_documents(df, datetime.utcnow())
+
+    if not data_records:
+        print("No hotspot data found. Skipping.")
+        return
+
+    collection.delete_many({}) 
+    result = collection.insert_many(data_records)
+    print(f"✅ Successfully inserted {len(result.inserted_ids)} hotspot documents.")
+
+    # Baseline for later incremental updates (--incremental)
+    ensure_hotspot_indexes(collection)
+    if stats is None and 'Emission_Score' in df.columns:
+        stats = RunningStats().update(df['Emission_Score'].dropna())
+    if stats is not None:
+        save_hotspot_stats(db, stats)
+    else:
+        db[HOTSPOT_STATS_COLLECTION].delete_one({"_id": HOTSPOT_STATS_ID})
+    refresh_mine_rollups(db)
+    rebuild_hotspot_clusters(db, df)
+    invalidate_hotspot_tiles(db)
+
 def ingest_data():
     """Reads CSV files and uploads their contents to designated MongoDB collections."""
     
@@ -35,29 +377,10 @@ def ingest_data():
 
     # --- Helper Function for Monthly Data ---
     def process_and_insert_monthly(csv_path: str):
-        collection = db[MONTHLY_COLLECTION]
         print(f"\n--- Processing '{csv_path}' for collection '{MONTHLY_COLLECTION}' ---")
 
         try:
-            df = pd.read_csv(csv_path)
-            
-            data_records: List[Dict] = df.to_dict(orient='records')
-
-            if not data_records:
-                print("No monthly data found. Skipping.")
-                return
-            
-            ingestion_time = datetime.utcnow()
-            
-            for record in data_records:
-                record['ingested_at'] = ingestion_time
-                for key, value in record.items():
-                    if pd.isna(value): record[key] = None
-                    
-            collection.delete_many({}) 
-            result = collection.insert_many(data_records)
-            print(f"✅ Successfully inserted {len(result.inserted_ids)} monthly documents.")
-
+            write_monthly(db, read_clean_csv(csv_path))
         except FileNotFoundError:
             print(f"❌ Error: CSV file not found at {csv_path}. Skipping ingestion.")
         except Exception as e:
@@ -65,31 +388,10 @@ def ingest_data():
 
     # --- Helper Function for Average Data ---
     def process_and_insert_average(csv_path: str):
-        collection = db[AVERAGE_COLLECTION]
         print(f"\n--- Processing '{csv_path}' for collection '{AVERAGE_COLLECTION}' ---")
         
         try:
-            df = pd.read_csv(csv_path)
-            
-            if df.empty:
-                print("No average data found. Skipping.")
-                return
-
-            average_metrics = df.iloc[0].to_dict()
-            ingestion_time = datetime.utcnow()
-            
-            document_to_insert = {
-                "average_emissions_ppm": average_metrics,
-                "ingested_at": ingestion_time
-            }
-            
-            collection.replace_one(
-                filter={},
-                replacement=document_to_insert,
-                upsert=True
-            )
-            print(f"✅ Successfully replaced/inserted 1 average document.")
-
+            write_average(db, read_clean_csv(csv_path))
         except FileNotFoundError:
             print(f"❌ Error: CSV file not found at {csv_path}. Skipping ingestion.")
         except Exception as e:
@@ -97,48 +399,12 @@ def ingest_data():
 
     # --- NEW: Helper Function for Hotspot Data (UPDATED) ---
     def process_and_insert_hotspots(csv_path: str):
-        collection = db[HOTSPOT_COLLECTION]
         print(f"\n--- Processing '{csv_path}' for collection '{HOTSPOT_COLLECTION}' ---")
 
         try:
-            df = pd.read_csv(csv_path)
+            df = read_clean_csv(csv_path)
             print(f"   📊 Columns found in CSV: {df.columns.tolist()}")
-
-            # --- 🛠️ FIX 1: Handle truncated column names ---
-            # If CSV has "Mine_Nam" instead of "Mine_Name", fix it
-            if 'Mine_Nam' in df.columns and 'Mine_Name' not in df.columns:
-                print("   ⚠️  Renaming 'Mine_Nam' to 'Mine_Name'")
-                df.rename(columns={'Mine_Nam': 'Mine_Name'}, inplace=True)
-
-            # --- 🛠️ FIX 2: Ensure Lat/Long are Floats ---
-            # This prevents "text" coordinates from breaking the map
-            if 'Latitude' in df.columns:
-                df['Latitude'] = pd.to_numeric(df['Latitude'], errors='coerce')
-            if 'Longitude' in df.columns:
-                df['Longitude'] = pd.to_numeric(df['Longitude'], errors='coerce')
-
-            # Check if we have valid coordinates
-            valid_coords = df.dropna(subset=['Latitude', 'Longitude'])
-            print(f"   ✅ Found {len(valid_coords)} rows with valid Latitude/Longitude.")
-
-            data_records: List[Dict] = df.to_dict(orient='records')
-
-            if not data_records:
-                print("No hotspot data found. Skipping.")
-                return
-            
-            ingestion_time = datetime.utcnow()
-            
-            for record in data_records:
-                record['ingested_at'] = ingestion_time
-                for key, value in record.items():
-                    if pd.isna(value): 
-                        record[key] = None
-                    
-            collection.delete_many({}) 
-            result = collection.insert_many(data_records)
-            print(f"✅ Successfully inserted {len(result.inserted_ids)} hotspot documents.")
-
+            write_hotspots(db, df)
         except FileNotFoundError:
             print(f"❌ Error: CSV file not found at {csv_path}. Skipping ingestion.")
         except Exception as e:
@@ -155,4 +421,11 @@ def ingest_data():
     print("\nMongoDB connection closed.")
 
 if __name__ == "__main__":
-    ingest_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Upload emission CSVs to MongoDB")
+    parser.add_argument("--incremental", metavar="CSV",
+                        help="Only score and insert the new raw rows in CSV instead of reloading everything.")
+    args = parser.parse_args()
+    if args.incremental:
+        ingest_new_hotspots(args.incremental)
+    else:
+        ingest_data()
@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# EMISSIONS DATASET SCHEMA
+# ---------------------------------------------------------
+# Column types of coal_dataset_10k_5years.csv. Loaders read only the columns
+# they need, straight into compact dtypes: categoricals for the repeated name
+# columns (a few dozen distinct values over thousands of rows), float32 for raw
+# sensor readings, and an explicitly formatted Date instead of per-row inference.
+
+DATE_FORMAT = '%Y-%m-%d'
+
+NAME_COLUMNS = ['State', 'District', 'Mine_Name']
+
+# Raw instrument readings: float32 keeps ~7 significant digits, well past sensor accuracy
+SENSOR_COLUMNS = [
+    'CO2_ppm', 'CH4_ppm', 'PM2_5', 'PM10', 'SO2_ppm', 'NOx_ppm',
+    'Temperature_C', 'Humidity_%', 'Wind_Speed_m/s', 'Rainfall_mm',
+]
+
+# Coordinates and derived figures that feed money/offset maths stay float64
+FLOAT64_COLUMNS = [
+    'Latitude', 'Longitude', 'Energy_Consumed_MWh', 'Emission_Index',
+    'CH4_to_Ethanol_Liters', 'CO2_to_Biogas_Liters', 'Forecast_Emission',
+    'Carbon_Credits_Potential_INR', 'Reforestation_Area_ha', 'Health_Risk_Index',
+]
+
+# Whole-number columns, downcast after parsing (they stay float if a value is missing)
+INTEGER_COLUMNS = [
+    'Mine_Depth_m', 'Coal_Output_ton/day', 'Operation_Shift_Hours',
+    'Carbon_Offset_Trees', 'Anomaly_Score',
+]
+
+EMISSIONS_COLUMNS = ['Date'] + NAME_COLUMNS + SENSOR_COLUMNS + FLOAT64_COLUMNS + INTEGER_COLUMNS
+
+def read_dtypes(columns, sensor_dtype=np.float32):
+    """read_csv dtype mapping for the given schema columns."""
+    dtypes = {}
+    for col in columns:
+        if col in NAME_COLUMNS:
+            dtypes[col] = 'category'
+        elif col in SENSOR_COLUMNS:
+            dtypes[col] = sensor_dtype
+        elif col in FLOAT64_COLUMNS:
+            dtypes[col] = np.float64
+    return dtypes
+
+def clean_name_column(series):
+    """
+    Strips and title-cases a name column. On a categorical only the distinct
+    categories are rewritten, not every row.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    cleaned = series.cat.categories.astype(str).str.strip().str.title()
+    if cleaned.is_unique:
+        return series.cat.rename_categories(cleaned)
+    # Two spellings collapse to one name (e.g. "korba" / "Korba "): re-encode
+    return pd.Series(cleaned[series.cat.codes], index=series.index, name=series.name).astype('category')
+
+def clean_names(df):
+    """
+    Strips header whitespace and cleans the name columns, as every loader here does.
+    For callers that read the CSV themselves (e.g. in chunks).
+    """
+    df.columns = df.columns.str.strip()
+    for col in NAME_COLUMNS:
+        if col in df.columns:
+            df[col] = clean_name_column(df[col])
+    return df
+
+def read_emissions_csv(path, columns=None, sensor_dtype=np.float32):
+    """
+    Loads the emissions CSV with the schema above.
+    columns: schema columns to keep (default: all that are present). Requested
+    columns missing from the file are simply absent from the result.
+    sensor_dtype: np.float64 for callers that need full-precision sensor values.
+    """
+    wanted = set(EMISSIONS_COLUMNS if columns is None else columns)
+    # Headers may carry stray whitespace; match on the stripped name
+    df = pd.read_csv(
+        path,
+        usecols=lambda col: col.strip() in wanted,
+        dtype=read_dtypes(wanted, sensor_dtype),
+    )
+    clean_names(df)
+    for col, dtype in read_dtypes(df.columns, sensor_dtype).items():
+        # Only differs when the header had whitespace and read_csv's dtype did not apply
+        if col not in NAME_COLUMNS and df[col].dtype != dtype:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'], format=DATE_FORMAT, errors='coerce')
+    return df
+
+def memory_report(df):
+    """Per-column and total in-memory size (deep, i.e. including string payloads), in bytes."""
+    usage = df.memory_usage(deep=True, index=True)
+    return {
+        "rows": len(df),
+        "columns": {col: {"dtype": str(df[col].dtype), "bytes": int(usage[col])} for col in df.columns},
+        "total_bytes": int(usage.sum()),
+    }
+
+# ---------------------------------------------------------
+# COLUMNAR CACHE
+# ---------------------------------------------------------
+# A parsed copy of each source CSV is kept next to it under .columnar_cache/,
+# one .npy file per column (categoricals as integer codes plus their labels in
+# the manifest). The cache directory is named after the CSV's content hash, so
+# an edited CSV is simply a cache miss. The manifest also records the CSV's size
+# and mtime, so an unchanged file is recognized from a stat() alone and only a
+# touched file is read and hashed again. Columns are opened memory-mapped: a load
+# touches only the pages of the columns asked for, and workers on one host share
+# them through the OS page cache instead of each parsing the CSV text.
+
+CACHE_DIRNAME = '.columnar_cache'
+MANIFEST_FILENAME = 'manifest.json'
+
+def source_stat(path):
+    """Size and mtime of a source file, as recorded in the cache manifest."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def recorded_hash(path, stat):
+    """Hash recorded by the cache entry of path when it was built from a file with this stat, else None."""
+    parent = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+    try:
+        names = os.listdir(parent)
+    except OSError:
+        return None
+    prefix = os.path.splitext(os.path.basename(path))[0] + '-'
+    for name in names:
+        if not name.startswith(prefix) or '.tmp-' in name:
+            continue
+        try:
+            with open(os.path.join(parent, name, MANIFEST_FILENAME)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if manifest.get("source") == os.path.basename(path) and manifest.get("source_stat") == stat:
+            return manifest.get("hash")
+    return None
+
+def source_fingerprint(path):
+    """
+    (content hash, stat) of a source file. The hash is read from the cache manifest
+    when size and mtime are unchanged; otherwise the file is hashed. The stat is
+    taken first, so a file modified while it is hashed is hashed again next time.
+    """
+    stat = source_stat(path)
+    digest = recorded_hash(path, stat)
+    return digest or source_hash(path), stat
+
+def record_source_stat(path, digest, stat):
+    """
+    Stores stat in the manifest of an existing cache entry (one written before stats
+    were recorded, or whose CSV was touched without being changed).
+    """
+    manifest_path = os.path.join(cache_path(path, digest), MANIFEST_FILENAME)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest["source_stat"] = stat
+    tmp_path = f"{manifest_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def source_hash(path):
+    """Content hash of a source file (identifies its cache entry)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def cache_path(path, digest):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME, f"{stem}-{digest}")
+
+def _column_filename(index):
+    # Column names contain '/' and '%', so files are numbered; the manifest maps them
+    return f"col{index:03d}.npy"
+
+def write_columnar_cache(path, df, digest=None, stat=None):
+    """
+    Writes df as the cache entry for the CSV at path. Assembled in a temporary
+    directory and renamed into place, so readers never see a partial entry;
+    older entries for the same CSV are removed.
+    stat: source_stat() taken before digest was computed (default: both taken now).
+    """
+    if digest is None:
+        digest, stat = source_fingerprint(path)
+    final_dir = cache_path(path, digest)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        columns = []
+        for index, col in enumerate(df.columns):
+            series = df[col]
+            entry = {"name": col, "file": _column_filename(index)}
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                entry["categories"] = series.cat.categories.astype(str).tolist()
+                values = series.cat.codes.to_numpy()
+            else:
+                values = series.to_numpy()
+            np.save(os.path.join(tmp_dir, entry["file"]), values, allow_pickle=False)
+            columns.append(entry)
+        manifest = {"source": os.path.basename(path), "hash": digest, "source_stat": stat,
+                    "rows": len(df), "columns": columns}
+        with open(os.path.join(tmp_dir, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(final_dir):
+            # Another process converted the same file first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    prefix = os.path.basename(final_dir).rsplit('-', 1)[0] + '-'
+    parent = os.path.dirname(final_dir)
+    for name in os.listdir(parent):
+        if name.startswith(prefix) and os.path.join(parent, name) != final_dir and '.tmp-' not in name:
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    return final_dir
+
+def read_columnar_cache(path, digest, columns=None, sensor_dtype=np.float32):
+    """Memory-mapped load of a cache entry; None when there is no entry for this hash."""
+    entry_dir = cache_path(path, digest)
+    try:
+        with open(os.path.join(entry_dir, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    wanted = None if columns is None else set(columns)
+    data = {}
+    for entry in manifest["columns"]:
+        col = entry["name"]
+        if wanted is not None and col not in wanted:
+            continue
+        values = np.load(os.path.join(entry_dir, entry["file"]), mmap_mode='r', allow_pickle=False)
+        if "categories" in entry:
+            data[col] = pd.Categorical.from_codes(values, categories=entry["categories"])
+        elif col in SENSOR_COLUMNS and values.dtype != sensor_dtype:
+            data[col] = values.astype(sensor_dtype)
+        else:
+            data[col] = values
+    # copy=False keeps the numeric columns backed by the mapped files
+    return pd.DataFrame(data, copy=False)
+
+def load_emissions(path, columns=None, sensor_dtype=np.float32, use_cache=True):
+    """
+    Loads the emissions dataset from its columnar cache, converting the CSV first
+    when the cache is missing or stale. Same result as read_emissions_csv().
+    Any cache problem falls back to parsing the CSV.
+    """
+    if not use_cache:
+        return read_emissions_csv(path, columns=columns, sensor_dtype=sensor_dtype)
+    stat = source_stat(path)
+    recorded = recorded_hash(path, stat)
+    digest = recorded or source_hash(path)
+    try:
+        df = read_columnar_cache(path, digest, columns=columns, sensor_dtype=sensor_dtype)
+        if df is not None:
+            if recorded is None:
+                # Same content under a new stat: remember it so the next load skips the hash
+                try:
+                    record_source_stat(path, digest, stat)
+                except OSError as e:
+                    logger.warning(f"Could not update columnar cache manifest for {path}: {e}")
+            return df
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable columnar cache for {path}: {e}")
+
+    # Cache at full precision so float64 and float32 readers can share it
+    full = read_emissions_csv(path, sensor_dtype=np.float64)
+    try:
+        write_columnar_cache(path, full, digest, stat)
+    except OSError as e:
+        # A read-only deploy still works, it just parses the CSV every time
+        logger.warning(f"Could not write columnar cache for {path}: {e}")
+    if columns is not None:
+        full = full[[col for col in full.columns if col in set(columns)]]
+    for col in SENSOR_COLUMNS:
+        if col in full.columns and full[col].dtype != sensor_dtype:
+            full[col] = full[col].astype(sensor_dtype)
+    return full
+
+if __name__ == "__main__":
+    # Conversion step, e.g. during deploy: python dataset_io.py <csv> [<csv> ...]
+    for csv_file in sys.argv[1:]:
+        digest, stat = source_fingerprint(csv_file)
+        if read_columnar_cache(csv_file, digest, columns=[]) is not None:
+            print(f"{csv_file}: cache up to date ({digest})")
+            continue
+        print(f"{csv_file}: wrote {write_columnar_cache(csv_file, read_emissions_csv(csv_file, sensor_dtype=np.float64), digest, stat)}")
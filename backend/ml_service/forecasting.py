@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# BATCHED SEASONAL FORECASTING
+# ---------------------------------------------------------
+# Each mine's monthly mean Emission_Index is modelled as a linear trend plus
+# yearly harmonics:
+#     y(t) = a + b*t + sum_k [c_k cos(2*pi*k*t/12) + d_k sin(2*pi*k*t/12)]
+# All mines share one monthly time grid, so the fit is a single batched
+# least-squares solve: one (p x p) normal-equation system per mine, stacked and
+# solved together, with missing months simply weighted out. The fitted
+# coefficients and residual spread are kept per mine; a forecast is then just
+# the basis evaluated at future months.
+#
+# Yearly harmonics are only identifiable from about two years of data: mines
+# with fewer observed months get a trend-only fit (their harmonic coefficients
+# are fixed at 0), which still leaves residual degrees of freedom for the
+# interval.
+
+DEFAULT_HARMONICS = 2
+RIDGE = 1e-6 # Numerical safety only, not a prior
+INTERVAL_Z = 1.96 # ~95% prediction interval
+TREND_PARAMETERS = 2
+MIN_OBSERVATIONS = TREND_PARAMETERS + 1 # trend-only fit with at least one residual degree of freedom
+SEASONAL_MIN_OBSERVATIONS = 24 # two full years before the yearly harmonics are fitted
+
+def seasonal_basis(t, harmonics=DEFAULT_HARMONICS):
+    """Design matrix (len(t) x (2 + 2*harmonics)) for integer month offsets t."""
+    t = np.asarray(t, dtype=np.float64)
+    columns = [np.ones_like(t), t]
+    for k in range(1, harmonics + 1):
+        angle = 2 * np.pi * k * t / 12
+        columns += [np.cos(angle), np.sin(angle)]
+    return np.column_stack(columns)
+
+def monthly_matrix(frame, group_column='Mine_Name', value_column='Emission_Index'):
+    """
+    Monthly means as a (months x groups) matrix on a shared calendar grid (NaN
+    where a group has no data), plus the grid's first month and the group names.
+    """
+    months = frame['Date'].dt.to_period('M')
+    monthly = frame[value_column].groupby([frame[group_column], months], observed=True).mean().unstack(0)
+    if monthly.empty:
+        return np.empty((0, 0)), None, []
+    start = monthly.index.min()
+    grid = pd.period_range(start, monthly.index.max(), freq='M')
+    monthly = monthly.reindex(grid)
+    return monthly.to_numpy(dtype=np.float64), start, [str(name) for name in monthly.columns]
+
+def fit_seasonal(values, harmonics=DEFAULT_HARMONICS):
+    """
+    Fits every column of values (months x series) at once: trend plus harmonics for
+    series with at least SEASONAL_MIN_OBSERVATIONS months, trend only otherwise.
+    Returns (coefficients (series x p), residual std (series,; NaN without residual
+    degrees of freedom), observations (series,), last observed month offset (series,),
+    harmonics fitted (series,)).
+    """
+    n_months, n_series = values.shape
+    basis = seasonal_basis(np.arange(n_months), harmonics)
+    p = basis.shape[1]
+    observed = ~np.isnan(values)
+    weights = observed.astype(np.float64).T # series x months
+    y = np.where(observed, values, 0.0).T
+    n_obs = weights.sum(axis=1)
+
+    # Short series only fit the trend columns; the others get an identity row so the system stays solvable
+    seasonal = n_obs >= SEASONAL_MIN_OBSERVATIONS
+    active = np.ones((n_series, p), dtype=bool)
+    active[:, TREND_PARAMETERS:] = seasonal[:, None]
+    mask = active.astype(np.float64)
+
+    # Stacked normal equations: (B^T W B + ridge I) beta = B^T W y, one system per series
+    gram = np.einsum('sm,mi,mj->sij', weights, basis, basis) * mask[:, :, None] * mask[:, None, :]
+    gram += (np.eye(p) * (1 - mask)[:, None, :]) + RIDGE * np.eye(p)
+    rhs = np.einsum('sm,mi,sm->si', weights, basis, y) * mask
+    coefficients = np.linalg.solve(gram, rhs[..., None])[..., 0]
+
+    residuals = (y - coefficients @ basis.T) * weights
+    dof = n_obs - active.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = np.where(dof > 0, np.sqrt((residuals ** 2).sum(axis=1) / dof), np.nan)
+    last = np.where(observed.any(axis=0), n_months - 1 - np.argmax(observed[::-1], axis=0), -1)
+    return coefficients, sigma, n_obs.astype(int), last, np.where(seasonal, harmonics, 0)
+
+class SeasonalForecaster:
+    """Fitted seasonal parameters for every mine, keyed by lowercased mine name."""
+
+    def __init__(self, names, start, coefficients, sigma, n_obs, last, fitted_harmonics, harmonics=DEFAULT_HARMONICS):
+        self.names = list(names)
+        self.keys = {name.lower(): i for i, name in enumerate(self.names)}
+        self.start = start
+        self.coefficients = coefficients
+        self.sigma = sigma
+        self.n_obs = n_obs
+        self.last = last
+        self.fitted_harmonics = fitted_harmonics
+        self.harmonics = harmonics
+
+    @classmethod
+    def from_frame(cls, main_df, harmonics=DEFAULT_HARMONICS):
+        if main_df.empty or not {'Mine_Name', 'Date', 'Emission_Index'} <= set(main_df.columns):
+            return cls([], None, np.empty((0, 2 + 2 * harmonics)), np.empty(0), np.empty(0, int), np.empty(0, int),
+                       np.empty(0, int), harmonics)
+        values, start, names = monthly_matrix(main_df)
+        return cls(names, start, *fit_seasonal(values, harmonics), harmonics=harmonics)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def forecast(self, key, horizon):
+        """
+        Monthly forecast for the `horizon` months after the mine's last observed month,
+        or None when the mine has too little history. lower/upper are None when the fit
+        has no residual degrees of freedom to estimate the interval from.
+        """
+        i = self.keys[key]
+        if self.n_obs[i] < MIN_OBSERVATIONS:
+            return None
+        t = self.last[i] + 1 + np.arange(horizon)
+        mean = seasonal_basis(t, self.harmonics) @ self.coefficients[i]
+        has_interval = bool(np.isfinite(self.sigma[i]))
+        margin = INTERVAL_Z * self.sigma[i]
+        harmonics = int(self.fitted_harmonics[i])
+        return {
+            "model": {
+                "type": "trend_plus_harmonics" if harmonics else "linear_trend",
+                "harmonics": harmonics,
+                "trend_per_month": round(float(self.coefficients[i, 1]), 6),
+                "residual_std": round(float(self.sigma[i]), 6) if has_interval else None,
+                "observations": int(self.n_obs[i]),
+                "last_observed_month": str(self.start + int(self.last[i])),
+            },
+            "forecast": [
+                {
+                    "month_year": str(self.start + int(offset)),
+                    "emission_index": round(float(value), 4),
+                    "lower": round(float(value - margin), 4) if has_interval else None,
+                    "upper": round(float(value + margin), 4) if has_interval else None,
+                }
+                for offset, value in zip(t, mean)
+            ],
+        }
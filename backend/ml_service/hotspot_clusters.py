@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# ---------------------------------------------------------
+# HOTSPOT MAP CLUSTERS
+# ---------------------------------------------------------
+# Hotspot rows are pre-aggregated into grid cells for every map zoom level, so
+# the map receives one marker per occupied cell instead of one per row. Cells
+# follow the Web Mercator tiling that Leaflet uses: each 256px tile at zoom z is
+# split into CELLS_PER_TILE x CELLS_PER_TILE cells, so a cell is always about
+# the same number of screen pixels and a viewport holds a bounded number of them.
+#
+# A cluster document keeps sums rather than means (count, lat_sum, lng_sum,
+# score_sum, per-level counts), so new rows and relabelled rows are folded in
+# with $inc updates; the centroid and mean score are derived when reading.
+
+CLUSTER_COLLECTION = "hotspot_clusters"
+MAX_CLUSTER_ZOOM = 16
+CLUSTER_ZOOM_LEVELS = range(MAX_CLUSTER_ZOOM + 1)
+CELLS_PER_TILE = 4 # 64px cells on 256px tiles
+MAX_MERCATOR_LAT = 85.05112878
+CLUSTER_LEVELS = ['Red', 'Orange', 'Yellow']
+CLUSTER_SOURCE_COLUMNS = {'Latitude', 'Longitude', 'Emission_Score', 'Hotspot_Level'}
+
+def mercator_xy(lat, lng):
+    """Normalized Web Mercator coordinates in [0, 1) (x east, y south)."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    lng = np.asarray(lng, dtype=np.float64)
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / (2 * np.pi)
+    return np.clip(x, 0.0, np.nextafter(1.0, 0)), np.clip(y, 0.0, np.nextafter(1.0, 0))
+
+def grid_size(zoom):
+    """Cells along each axis of the world at this zoom."""
+    return (2 ** zoom) * CELLS_PER_TILE
+
+def cluster_cells(lat, lng, zoom):
+    """(ix, iy) grid cell of every point at this zoom."""
+    x, y = mercator_xy(lat, lng)
+    n = grid_size(zoom)
+    return np.floor(x * n).astype(np.int64), np.floor(y * n).astype(np.int64)
+
+def cell_range(min_lat, max_lat, min_lng, max_lng, zoom):
+    """Inclusive (ix_min, ix_max, iy_min, iy_max) of the cells covering a bounding box."""
+    (ix0, ix1), (iy1, iy0) = cluster_cells([min_lat, max_lat], [min_lng, max_lng], zoom)
+    return int(ix0), int(ix1), int(iy0), int(iy1)
+
+def cluster_id(zoom, ix, iy):
+    return f"{zoom}/{ix}/{iy}"
+
+def cluster_aggregates(df):
+    """
+    Per-cell sums of df's hotspot rows (Latitude, Longitude, Emission_Score,
+    Hotspot_Level) for every zoom level, as cluster documents. Rows without
+    coordinates are left out.
+    """
+    if not CLUSTER_SOURCE_COLUMNS <= set(df.columns):
+        return []
+    lat = pd.to_numeric(df['Latitude'], errors='coerce')
+    lng = pd.to_numeric(df['Longitude'], errors='coerce')
+    valid = (lat.notna() & lng.notna()).to_numpy()
+    if not valid.any():
+        return []
+    frame = pd.DataFrame({
+        'lat': lat.to_numpy()[valid],
+        'lng': lng.to_numpy()[valid],
+        'score': pd.to_numeric(df['Emission_Score'], errors='coerce').to_numpy()[valid],
+    })
+    levels = df['Hotspot_Level'].to_numpy()[valid]
+    for level in CLUSTER_LEVELS:
+        frame[level] = (levels == level).astype(np.int64)
+
+    documents = []
+    for zoom in CLUSTER_ZOOM_LEVELS:
+        frame['ix'], frame['iy'] = cluster_cells(frame['lat'], frame['lng'], zoom)
+        grouped = frame.groupby(['ix', 'iy'], sort=False).agg(
+            count=('lat', 'size'), lat_sum=('lat', 'sum'), lng_sum=('lng', 'sum'),
+            score_sum=('score', 'sum'), max_score=('score', 'max'),
+            **{level: (level, 'sum') for level in CLUSTER_LEVELS},
+        )
+        for (ix, iy), row in zip(grouped.index, grouped.itertuples(index=False)):
+            documents.append({
+                "_id": cluster_id(zoom, ix, iy),
+                "zoom": zoom, "ix": int(ix), "iy": int(iy),
+                "count": int(row.count),
+                "lat_sum": float(row.lat_sum), "lng_sum": float(row.lng_sum),
+                "score_sum": float(row.score_sum), "max_score": float(row.max_score),
+                "levels": {level: int(getattr(row, level)) for level in CLUSTER_LEVELS},
+            })
+    return documents
+
+def cluster_summary(doc):
+    """API view of a stored cluster: count, severity mix, centroid and score stats."""
+    count = doc["count"]
+    return {
+        "id": doc["_id"],
+        "count": count,
+        "levels": doc.get("levels", {}),
+        "centroid": {"lat": doc["lat_sum"] / count, "lng": doc["lng_sum"] / count},
+        "mean_score": doc["score_sum"] / count,
+        "max_score": doc.get("max_score"),
+    }
@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+
+# ---------------------------------------------------------
+# HOTSPOT SCORING
+# ---------------------------------------------------------
+# Emission_Score is a weighted sum of gas readings. Rows are labelled Red /
+# Orange / Yellow against thresholds at mean +/- THRESHOLD_STD_FACTOR * std of
+# all scores seen so far. The statistics are kept as a running
+# (count, mean, M2) triple, so they can be built in chunks, persisted, and
+# extended with new rows without revisiting the history.
+
+# Emission score = weighted sum of these gas readings
+SCORE_WEIGHTS = {'CO2_ppm': 0.4, 'CH4_ppm': 0.3, 'PM2_5': 0.15, 'PM10': 0.15}
+SCORE_COLUMNS = list(SCORE_WEIGHTS)
+
+# Thresholds sit this many standard deviations either side of the mean score
+THRESHOLD_STD_FACTOR = 0.5
+LEVELS = ['Red', 'Orange', 'Yellow']
+
+def emission_scores(df):
+    """Weighted gas score for every row (vectorized)."""
+    return sum(weight * df[col] for col, weight in SCORE_WEIGHTS.items())
+
+def hotspot_thresholds(mean_score, std_score):
+    """(low, high) classification thresholds for the given score mean/std."""
+    return mean_score - THRESHOLD_STD_FACTOR * std_score, mean_score + THRESHOLD_STD_FACTOR * std_score
+
+def classify_scores(scores, low_thresh, high_thresh):
+    """Red above high, Orange above low, Yellow otherwise (one array pass)."""
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.where(scores > high_thresh, 'Red', np.where(scores > low_thresh, 'Orange', 'Yellow'))
+
+def level_intervals(low_thresh, high_thresh):
+    """Score interval (lo, hi] covered by each level."""
+    return {
+        'Yellow': (-math.inf, low_thresh),
+        'Orange': (low_thresh, high_thresh),
+        'Red': (high_thresh, math.inf),
+    }
+
+def relabel_ranges(old_thresholds, new_thresholds):
+    """
+    Score ranges whose level changes when the thresholds move from old to new,
+    as (level, lo, hi) meaning "scores in (lo, hi] are now `level`". Only the
+    bands between an old and a new threshold appear, so relabelling touches just
+    the rows inside them.
+    """
+    old, new = level_intervals(*old_thresholds), level_intervals(*new_thresholds)
+    ranges = []
+    for level in LEVELS:
+        (new_lo, new_hi), (old_lo, old_hi) = new[level], old[level]
+        # new interval minus old interval: at most one piece below and one above
+        for lo, hi in ((new_lo, min(new_hi, old_lo)), (max(new_lo, old_hi), new_hi)):
+            if lo < hi:
+                ranges.append((level, lo, hi))
+    return ranges
+
+class RunningStats:
+    """
+    Streaming count/mean/variance (Welford, merged per chunk with Chan et al.'s
+    parallel formula), so the thresholds never need the full score column in memory.
+    """
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        """Folds a batch of values in (one vectorized pass over the batch)."""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return self
+        chunk_mean = values.mean()
+        return self.merge(RunningStats(len(values), chunk_mean, ((values - chunk_mean) ** 2).sum()))
+
+    def merge(self, other):
+        """Folds in the statistics of another set of values (e.g. another chunk or worker)."""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        return self
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas)."""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else float('nan')
+
+    def thresholds(self):
+        return hotspot_thresholds(self.mean, self.std)
+
+    def to_document(self):
+        return {"count": int(self.count), "mean": float(self.mean), "m2": float(self.m2)}
+
+    @classmethod
+    def from_document(cls, doc):
+        return cls(int(doc.get("count", 0)), float(doc.get("mean", 0.0)), float(doc.get("m2", 0.0)))
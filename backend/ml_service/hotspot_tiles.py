@@ -0,0 +1,88 @@
+import os
+import sys
+import math
+import struct
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+from hotspot_clusters import mercator_xy
+
+# ---------------------------------------------------------
+# BINARY HOTSPOT TILES
+# ---------------------------------------------------------
+# Hotspot points for one Web Mercator z/x/y tile, packed as typed arrays the
+# browser can view without parsing (new Uint16Array(buffer, offset, count)...).
+# Layout (little-endian):
+#
+#   offset 0   4 bytes   magic b"HSPT"
+#          4   uint8     format version (TILE_FORMAT_VERSION)
+#          5   uint8     zoom
+#          6   2 bytes   padding
+#          8   uint32    tile x
+#         12   uint32    tile y
+#         16   uint32    point count n
+#         20   uint16[n] x inside the tile, 0..TILE_EXTENT-1 (west -> east)
+#     20+2n    uint16[n] y inside the tile, 0..TILE_EXTENT-1 (north -> south)
+#     20+4n    float32[n] Emission_Score
+#     20+8n    uint8[n]   level code (LEVEL_CODES, 255 = unknown)
+#
+# Every array starts on a multiple of its element size. A point takes 9 bytes,
+# against roughly 1 KB for the same row as a JSON document.
+#
+# Encoded tiles are cached in TILE_COLLECTION under the current tile version;
+# ingestion bumps the version (and clears the cache), so stale tiles are never
+# served even if a request was still building one during the upload.
+
+TILE_COLLECTION = "hotspot_tiles"
+TILE_VERSION_ID = "_version"
+TILE_FORMAT_VERSION = 1
+TILE_MAGIC = b"HSPT"
+TILE_EXTENT = 4096
+MAX_TILE_ZOOM = 22
+LEVEL_CODES = {'Red': 0, 'Orange': 1, 'Yellow': 2}
+UNKNOWN_LEVEL = 255
+HEADER = struct.Struct("<4sBB2xIII")
+
+def tile_bounds(zoom, x, y):
+    """(south, north, west, east) of a tile in degrees."""
+    n = 2 ** zoom
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return south, north, west, east
+
+def tile_cache_key(version, zoom, x, y):
+    return f"{version}/{zoom}/{x}/{y}"
+
+def encode_tile(zoom, x, y, lat, lng, score, levels):
+    """Packs the given points (already inside the tile) into the binary layout above."""
+    lat = np.asarray(lat, dtype=np.float64)
+    count = len(lat)
+    mx, my = mercator_xy(lat, lng)
+    n = 2 ** zoom
+    px = np.clip(np.floor((mx * n - x) * TILE_EXTENT), 0, TILE_EXTENT - 1).astype('<u2')
+    py = np.clip(np.floor((my * n - y) * TILE_EXTENT), 0, TILE_EXTENT - 1).astype('<u2')
+    codes = np.array([LEVEL_CODES.get(level, UNKNOWN_LEVEL) for level in levels], dtype=np.uint8)
+    return b"".join([
+        HEADER.pack(TILE_MAGIC, TILE_FORMAT_VERSION, zoom, x, y, count),
+        px.tobytes(), py.tobytes(),
+        np.asarray(score, dtype='<f4').tobytes(),
+        codes.tobytes(),
+    ])
+
+def decode_tile(data):
+    """Inverse of encode_tile (header dict, px, py, score, level codes); used for checks and tooling."""
+    magic, version, zoom, x, y, count = HEADER.unpack_from(data)
+    if magic != TILE_MAGIC:
+        raise ValueError("Not a hotspot tile.")
+    offset = HEADER.size
+    px = np.frombuffer(data, '<u2', count, offset)
+    py = np.frombuffer(data, '<u2', count, offset + 2 * count)
+    score = np.frombuffer(data, '<f4', count, offset + 4 * count)
+    codes = np.frombuffer(data, np.uint8, count, offset + 8 * count)
+    return {"version": version, "zoom": zoom, "x": x, "y": y, "count": count}, px, py, score, codes
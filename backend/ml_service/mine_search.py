@@ -0,0 +1,221 @@
+import heapq
+from bisect import bisect_left
+
+import numpy as np
+
+# ---------------------------------------------------------
+# MINE NAME SEARCH INDEX
+# ---------------------------------------------------------
+# In-memory index over mine, district and state names, built once per engine
+# load. Prefix lookups use sorted term/word lists (bisect); fuzzy and substring
+# lookups use a trigram inverted index whose postings are NumPy arrays, so a
+# query costs a few vectorized bincounts instead of a scan over every mine.
+
+FIELD_WEIGHTS = {"mine": 1.0, "district": 0.85, "state": 0.7}
+
+# Match tiers (multiplied by the field weight)
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+WORD_PREFIX_SCORE = 0.8
+SUBSTRING_SCORE = 0.7
+FUZZY_SCORE = 0.6
+MIN_FUZZY_SIMILARITY = 0.3
+
+# Candidate caps keep worst-case queries (e.g. a single letter) bounded
+MAX_PREFIX_CANDIDATES = 200
+MAX_FUZZY_CANDIDATES = 100
+
+# Sorts after every character, so (key + PREFIX_END,) bounds the terms starting with key
+PREFIX_END = chr(0x10FFFF)
+
+def normalize(text):
+    return " ".join(str(text).lower().split())
+
+def trigrams(text, pad=True):
+    padded = f"  {text} " if pad else text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class MineSearchIndex:
+    def __init__(self, mines):
+        """mines: iterable of dicts with mine_name, district and state."""
+        self.entries = []
+        self.mine_keys = {}
+        term_ids = {}
+        self.terms = []
+        self.term_refs = []
+
+        for mine in mines:
+            entry_id = len(self.entries)
+            self.entries.append({
+                "mine_name": str(mine["mine_name"]),
+                "district": str(mine["district"]),
+                "state": str(mine["state"]),
+            })
+            self.mine_keys.setdefault(normalize(mine["mine_name"]), entry_id)
+            for field, value in (("mine", mine["mine_name"]), ("district", mine["district"]), ("state", mine["state"])):
+                term = normalize(value)
+                if not term:
+                    continue
+                if term not in term_ids:
+                    term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                    self.term_refs.append([])
+                self.term_refs[term_ids[term]].append((entry_id, field))
+
+        # Best field first, then alphabetical: search() can stop expanding a term early
+        for refs in self.term_refs:
+            refs.sort(key=lambda ref: (-FIELD_WEIGHTS[ref[1]], self.entries[ref[0]]["mine_name"]))
+
+        self.sorted_terms = sorted((term, term_id) for term_id, term in enumerate(self.terms))
+        self.sorted_words = sorted(
+            (word, term_id) for term_id, term in enumerate(self.terms) for word in term.split()[1:]
+        )
+        self.mine_term_ids = np.array(
+            [term_id for term_id, refs in enumerate(self.term_refs) if any(f == "mine" for _, f in refs)],
+            dtype=np.intp,
+        )
+        # Mine names alone, for resolve(): its prefix range is exactly the set of matching mines
+        mine_term_set = set(self.mine_term_ids.tolist())
+        self.sorted_mine_terms = [pair for pair in self.sorted_terms if pair[1] in mine_term_set]
+
+        postings = {}
+        gram_counts = []
+        for term_id, term in enumerate(self.terms):
+            grams = trigrams(term)
+            gram_counts.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(term_id)
+        self.postings = {gram: np.array(ids, dtype=np.intp) for gram, ids in postings.items()}
+        self.term_gram_counts = np.array(gram_counts, dtype=np.float64)
+
+    @classmethod
+    def from_frame(cls, main_df):
+        """One entry per mine; District/State come from the mine's first row, like the plan table."""
+        if main_df.empty or 'Mine_Name' not in main_df.columns:
+            return cls([])
+        mines = main_df[['Mine_Name', 'District', 'State']].drop_duplicates('Mine_Name')
+        return cls(
+            {"mine_name": name, "district": district, "state": state}
+            for name, district, state in mines.itertuples(index=False)
+        )
+
+    def __len__(self):
+        return len(self.entries)
+
+    # --- Candidate generation ---
+
+    @staticmethod
+    def _prefix_range(key, sorted_pairs):
+        """[start, end) of the pairs whose text starts with key (two bisections, no scan)."""
+        return bisect_left(sorted_pairs, (key,)), bisect_left(sorted_pairs, (key + PREFIX_END,))
+
+    def _prefix_terms(self, key, sorted_pairs):
+        start, end = self._prefix_range(key, sorted_pairs)
+        return [term_id for _, term_id in sorted_pairs[start:min(end, start + MAX_PREFIX_CANDIDATES)]]
+
+    def _shared_trigrams(self, grams):
+        """Number of the given trigrams each term contains (vectorized over all terms)."""
+        arrays = [self.postings[g] for g in grams if g in self.postings]
+        if not arrays:
+            return np.zeros(len(self.terms), dtype=np.intp)
+        return np.bincount(np.concatenate(arrays), minlength=len(self.terms))
+
+    def _substring_terms(self, key, term_ids=None):
+        """
+        Terms containing key (keys of 3+ characters only); trigram postings narrow
+        the candidates before the exact check.
+        """
+        if len(key) < 3:
+            return []
+        inner = trigrams(key, pad=False)
+        candidates = np.nonzero(self._shared_trigrams(inner) >= len(inner))[0]
+        if term_ids is not None:
+            candidates = np.intersect1d(candidates, term_ids, assume_unique=True)
+        return [int(t) for t in candidates if key in self.terms[t]]
+
+    def _fuzzy_terms(self, key):
+        """Top terms by trigram Dice similarity, as (term_id, similarity)."""
+        grams = trigrams(key)
+        shared = self._shared_trigrams(grams)
+        similarity = 2.0 * shared / (self.term_gram_counts + len(grams))
+        candidates = np.nonzero(similarity >= MIN_FUZZY_SIMILARITY)[0]
+        if len(candidates) > MAX_FUZZY_CANDIDATES:
+            top = np.argpartition(similarity[candidates], -MAX_FUZZY_CANDIDATES)[-MAX_FUZZY_CANDIDATES:]
+            candidates = candidates[top]
+        return [(int(t), float(similarity[t])) for t in candidates]
+
+    # --- Public API ---
+
+    def search(self, query, limit=10):
+        """
+        Ranked autocomplete over mine, district and state names. Each mine is scored
+        by its best matching field: exact > prefix > word prefix > substring > fuzzy.
+        """
+        key = normalize(query)
+        if not key or not self.entries:
+            return []
+
+        term_scores = {}
+        def offer(term_id, score):
+            if score > term_scores.get(term_id, 0.0):
+                term_scores[term_id] = score
+
+        for term_id in self._prefix_terms(key, self.sorted_terms):
+            # Shorter completions rank first within the prefix tier
+            offer(term_id, EXACT_SCORE if self.terms[term_id] == key
+                  else PREFIX_SCORE + 0.05 * len(key) / len(self.terms[term_id]))
+        for term_id in self._prefix_terms(key, self.sorted_words):
+            offer(term_id, WORD_PREFIX_SCORE)
+        for term_id in self._substring_terms(key):
+            offer(term_id, SUBSTRING_SCORE)
+        if len(key) >= 3:
+            for term_id, similarity in self._fuzzy_terms(key):
+                offer(term_id, FUZZY_SCORE * similarity)
+
+        best = {}
+        for term_id, score in sorted(term_scores.items(), key=lambda item: -item[1]):
+            # Terms arrive best-first; once `limit` mines beat this term's ceiling, stop
+            if len(best) >= limit and score <= heapq.nlargest(limit, (v[0] for v in best.values()))[-1]:
+                break
+            improved = 0
+            for entry_id, field in self.term_refs[term_id]:
+                weighted = score * FIELD_WEIGHTS[field]
+                if weighted > best.get(entry_id, (0.0, None))[0]:
+                    best[entry_id] = (weighted, field)
+                    improved += 1
+                    # Remaining refs score no higher and sort later by name
+                    if improved >= limit:
+                        break
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self.entries[item[0]]["mine_name"]))
+        return [
+            {**self.entries[entry_id], "score": round(score, 4), "matched_field": field}
+            for entry_id, (score, field) in ranked[:limit]
+        ]
+
+    def resolve(self, query, suggestions=10):
+        """
+        Resolves a user-typed mine name to exactly one mine.
+        Exact names win; otherwise a unique mine-name prefix, then a unique substring
+        (3+ characters).
+        Returns (entry, status, candidates) with status "matched", "ambiguous" (several
+        mines match) or "not_found"; candidates holds ranked search results when no
+        single mine was resolved.
+        """
+        key = normalize(query)
+        if key in self.mine_keys:
+            return self.entries[self.mine_keys[key]], "matched", []
+        matched = 0
+        if key:
+            # Uniqueness is decided on the full prefix range; only the suggestions are capped
+            start, end = self._prefix_range(key, self.sorted_mine_terms)
+            matched = end - start
+            if matched == 1:
+                return self.entries[self.mine_keys[self.sorted_mine_terms[start][0]]], "matched", []
+            if not matched:
+                matches = self._substring_terms(key, self.mine_term_ids)
+                matched = len(matches)
+                if matched == 1:
+                    return self.entries[self.mine_keys[self.terms[matches[0]]]], "matched", []
+        status = "ambiguous" if matched else "not_found"
+        return None, status, self.search(query, limit=suggestions)
@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
+from scipy import sparse
+from scipy.optimize import linprog
 import json
 import os
+import sys
 import io
+import hashlib
+import argparse
+import threading
+from datetime import datetime
 
 # ---------------------------------------------------------
 # 1. PATH CONFIGURATION (Fixes "CSV missing" errors)
@@ -16,6 +22,25 @@ EMISSIONS_FILE = os.path.join(BASE_DIR, 'coal_dataset_10k_5years.csv')
 ML_TRAINING_FILE = os.path.join(BASE_DIR, 'ml_training_data.csv')
 OPS_REGISTRY_FILE = os.path.join(BASE_DIR, 'operational_registry.csv')
 
+# Make sibling modules importable however this file is loaded (script, package or importlib)
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+
+import model_store
+import dataset_io
+import training
+from mine_search import MineSearchIndex
+from forecasting import SeasonalForecaster
+
+# Hyperparameters of the per-state sequestration models (part of the artifact key).
+# Threading is not a hyperparameter: training.py decides it per run.
+MODEL_PARAMS = {"n_estimators": 100, "random_state": 42, "oob_score": True}
+MODEL_FEATURES = ['Max_Height', 'NDVI', 'Age_Years']
+MODEL_TARGET = 'CO2e_Stock_t_ha'
+
+# The only emissions columns the engine uses (see aggregate_plan_inputs / MineSearchIndex)
+EMISSIONS_ENGINE_COLUMNS = ['Date', 'State', 'District', 'Mine_Name', 'Emission_Index']
+
 def convert_safe(obj):
     """
     Helper to convert numpy/pandas types to standard Python types for JSON serialization.
@@ -41,6 +66,24 @@ def convert_safe(obj):
         
     return obj
 
+def compute_engine_version(model_stamp=None):
+    """
+    Version stamp for the loaded datasets and trained models.
+    Changes whenever any source CSV is replaced and, given model_stamp (artifact key
+    and training time), whenever the models are retrained, so caches keyed on it
+    invalidate themselves. Without model_stamp it covers the source files only.
+    """
+    digest = hashlib.sha1()
+    for path in (EMISSIONS_FILE, ML_TRAINING_FILE, OPS_REGISTRY_FILE):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{path}:missing;".encode())
+    if model_stamp is not None:
+        digest.update(f"models:{model_stamp};".encode())
+    return digest.hexdigest()[:12]
+
 def load_datasets():
     # Debug: Print where we are looking for files
     print(f"ML Engine loading CSVs from: {BASE_DIR}")
@@ -51,22 +94,14 @@ def load_datasets():
         # We raise an error instead of exit() so the server can catch it
         raise FileNotFoundError(error_msg)
     
-    main_df = pd.read_csv(EMISSIONS_FILE)
-    main_df.columns = main_df.columns.str.strip()
-    
-    for col in ['State', 'District']:
-        if col in main_df.columns:
-            main_df[col] = main_df[col].astype(str).str.strip().str.title()
-    
-    if 'Date' in main_df.columns:
-        main_df['Date'] = pd.to_datetime(main_df['Date'], errors='coerce')
-
+    main_df = dataset_io.load_emissions(EMISSIONS_FILE, columns=EMISSIONS_ENGINE_COLUMNS)
     if 'Mine_Name' not in main_df.columns:
         if 'District' in main_df.columns:
-            main_df['Mine_Name'] = main_df['District'] + " Mine"
+            main_df['Mine_Name'] = (main_df['District'].astype(str) + " Mine").astype('category')
         else:
-            main_df['Mine_Name'] = "Unknown Mine"
-    main_df['Mine_Name'] = main_df['Mine_Name'].str.strip().str.title()
+            main_df['Mine_Name'] = pd.Categorical(["Unknown Mine"] * len(main_df))
+    footprint = dataset_io.memory_report(main_df)["total_bytes"]
+    print(f"Emissions dataset: {len(main_df)} rows, {footprint / 1e6:.2f} MB in memory")
 
     ml_df = pd.read_csv(ML_TRAINING_FILE)
     ops_df = pd.read_csv(OPS_REGISTRY_FILE)
@@ -75,206 +110,772 @@ def load_datasets():
 
     return main_df, ml_df, ops_df
 
-def train_regional_models(ml_df):
-    region_models = {}
-    if 'State' not in ml_df.columns:
-        return region_models
-        
-    unique_regions = ml_df['State'].unique()
-    for region in unique_regions:
-        local_data = ml_df[ml_df['State'] == region]
-        if not local_data.empty:
-            # Ensure these columns exist in your training CSV
-            needed_cols = ['Max_Height', 'NDVI', 'Age_Years', 'CO2e_Stock_t_ha']
-            if all(col in local_data.columns for col in needed_cols):
-                X = local_data[['Max_Height', 'NDVI', 'Age_Years']]
-                y = local_data['CO2e_Stock_t_ha']
-                model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-                model.fit(X, y)
-                region_models[region] = model
-    return region_models
+def train_regional_models(ml_df, params=MODEL_PARAMS, workers=None, threads_per_model=None):
+    """
+    Fits one model per state, regions in parallel processes (see training.py).
+    Returns (region_models, training_report).
+    """
+    return training.fit_regional_models(ml_df, MODEL_FEATURES, MODEL_TARGET, params,
+                                        workers=workers, threads_per_model=threads_per_model)
+
+def load_or_train_regional_models(ml_df, force=False):
+    """
+    Loads the regional models from the on-disk artifact store, retraining only when
+    the training CSV or MODEL_PARAMS changed (or when force=True).
+    Returns (region_models, artifact_key, trained); the training report of the
+    artifact is in its manifest (model_store.load_manifest).
+    """
+    return model_store.load_or_train(
+        ML_TRAINING_FILE,
+        MODEL_PARAMS,
+        lambda: train_regional_models(ml_df),
+        force=force,
+    )
 
 # ---------------------------------------------------------
-# GLOBAL INITIALIZATION
+# ENGINE STATE & INITIALIZATION
 # ---------------------------------------------------------
-# Load data and train models once when the file is imported
-try:
-    main_emissions_df, ml_library_df, operational_registry_df = load_datasets()
-    region_models = train_regional_models(ml_library_df)
-    available_mines = main_emissions_df['Mine_Name'].unique().tolist()
-    print("ML Engine initialized successfully.")
-except Exception as e:
-    print(f"ML Engine Initialization Warning: {e}")
-    # Initialize empty to prevent import crash, predictor will handle the error later
-    main_emissions_df = pd.DataFrame()
-    region_models = {}
-    available_mines = []
+# Importing this module is cheap: the engine starts empty and is warmed up
+# explicitly by initialize_engine() (a background task started by the API on
+# startup, or directly when run as a script).
+#
+# Everything a request reads lives in one EngineState snapshot. A reload builds
+# a complete new snapshot off to the side and swaps the module-level reference
+# in a single assignment, so in-flight requests finish against the old state.
+
+class EngineState:
+    """Immutable snapshot of the loaded datasets, models and derived tables."""
+    def __init__(self, main_df, ml_df, ops_df, region_models, sequestration_table,
+                 model_artifact_key, search_index, plan_table, monthly_trends, version, training_report=None,
+                 forecaster=None, source_version=None):
+        self.main_emissions_df = main_df
+        self.ml_library_df = ml_df
+        self.operational_registry_df = ops_df
+        self.region_models = region_models
+        self.sequestration_table = sequestration_table
+        self.model_artifact_key = model_artifact_key
+        self.training_report = training_report
+        self.mine_forecaster = forecaster if forecaster is not None else SeasonalForecaster.from_frame(pd.DataFrame())
+        self.mine_search_index = search_index
+        self.mine_plan_table = plan_table
+        self.mine_monthly_trends = monthly_trends
+        self.available_mines = main_df['Mine_Name'].unique().tolist() if 'Mine_Name' in main_df.columns else []
+        self.version = version
+        # Stamp of the source files alone, compared by datasets_changed()
+        self.source_version = source_version if source_version is not None else version
+
+    @classmethod
+    def empty(cls):
+        return cls(pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), {}, pd.DataFrame(),
+                   None, MineSearchIndex([]), pd.DataFrame(), {}, None)
+
+    @property
+    def loaded(self):
+        return self.version is not None
+
+engine_state = EngineState.empty()
+
+# Progress of the latest load/reload, reported by the API readiness endpoint
+engine_status = {"state": "cold", "stage": None, "progress": 0.0, "error": None}
+_reload_lock = threading.Lock()
+
+def _set_status(state, stage, progress, error=None):
+    engine_status.update({"state": state, "stage": stage, "progress": progress, "error": error})
+
+def is_ready():
+    """True once a complete engine state is being served (also while a reload runs)."""
+    return engine_state.loaded
+
+def datasets_changed():
+    """True when any source CSV differs from the ones the served state was built from."""
+    return engine_state.loaded and compute_engine_version() != engine_state.source_version
+
+def build_engine_state(force_retrain=False, state_label="loading"):
+    """
+    Loads the datasets, loads (or trains) the regional models and builds every derived
+    table into a new EngineState, without touching the one currently served.
+    """
+    # Stamp first: a file replaced mid-load then still differs from the built version
+    source_version = compute_engine_version()
+
+    _set_status(state_label, "loading_datasets", 0.1)
+    main_df, ml_df, ops_df = load_datasets()
+
+    _set_status(state_label, "loading_models", 0.4)
+    models, artifact_key, trained = load_or_train_regional_models(ml_df, force=force_retrain)
+    manifest = model_store.load_manifest(artifact_key)
+    training_report = manifest.get("training")
+    # A forced retrain keeps the artifact key (same data and params), so the training time
+    # is what tells the model sets apart in the version
+    trained_at = datetime.utcnow().isoformat() if trained else manifest.get("created_at")
+    version = compute_engine_version(f"{artifact_key}:{trained_at}")
+    region_sequestration = build_sequestration_table(models)
+
+    _set_status(state_label, "building_index", 0.8)
+    search_index = MineSearchIndex.from_frame(main_df)
+
+    _set_status(state_label, "precomputing_plans", 0.9)
+    plan_table, monthly_trends = precompute_mine_plans(main_df, ops_df, region_sequestration)
+
+    _set_status(state_label, "fitting_forecasts", 0.95)
+    forecaster = SeasonalForecaster.from_frame(main_df)
+
+    return EngineState(main_df, ml_df, ops_df, models, region_sequestration, artifact_key,
+                       search_index, plan_table, monthly_trends, version, training_report, forecaster,
+                       source_version)
+
+def initialize_engine(force_retrain=False):
+    """
+    Builds a new engine state and swaps it in atomically. Used for the initial warmup
+    and for hot reloads. Returns True on success; on failure the previously served
+    state (if any) stays in place and the error is recorded in engine_status.
+    Concurrent calls are rejected (return False) while a build is running.
+    """
+    global engine_state
+
+    if not _reload_lock.acquire(blocking=False):
+        print("ML Engine load already in progress; skipping.")
+        return False
+    state_label = "reloading" if engine_state.loaded else "loading"
+    try:
+        new_state = build_engine_state(force_retrain=force_retrain, state_label=state_label)
+        engine_state = new_state
+        _set_status("ready", "ready", 1.0)
+        print(f"ML Engine initialized successfully (version {new_state.version}).")
+        return True
+    except Exception as e:
+        print(f"ML Engine Initialization Error: {e}")
+        # A failed reload keeps serving the old state
+        _set_status("ready" if engine_state.loaded else "failed", engine_status["stage"], engine_status["progress"], str(e))
+        return False
+    finally:
+        _reload_lock.release()
 
 # ---------------------------------------------------------
-# MAIN PREDICTION FUNCTION (Called by API)
+# VECTORIZED PLAN ENGINE
 # ---------------------------------------------------------
-# Renamed from get_dashboard_data to match predictor.py expectation
-def generate_offset_plan(user_input_name):
-    if main_emissions_df.empty:
-        return {"error": "ML Datasets not loaded correctly."}
-
-    selected_mine_name = user_input_name.strip().title()
-    
-    mine_data = main_emissions_df[main_emissions_df['Mine_Name'].str.contains(selected_mine_name, case=False, na=False)].copy()
-    
-    if mine_data.empty:
-        # Return a structure indicating failure, or let predictor handle it
-        # For now, we return a basic error structure that frontend can display
-        return {
-            "error": f"Mine '{selected_mine_name}' not found.", 
-            "available_mines": available_mines[:10] # Limit list size
-        }
+# Planning constants (defaults apply to mines missing from the operational registry)
+REGISTRY_DEFAULTS = {
+    'Available_Land_Ha': 500.0,
+    'Cost_Teak': 8.0,
+    'Cost_Acacia': 5.0,
+    'Cost_Pioneer': 4.0,
+    'Max_Teak_Pct': 0.50,
+}
+SPECIES_MIX = {'teak': 0.40, 'acacia': 0.30, 'pioneer': 0.30}
+SPECIES_ASR_FACTOR = {'teak': 1.2, 'acacia': 1.0, 'pioneer': 0.8}
+SPECIES_COST_COLUMN = {'teak': 'Cost_Teak', 'acacia': 'Cost_Acacia', 'pioneer': 'Cost_Pioneer'}
+TREES_PER_HA = 2000
+STANDARD_TREE = {'Max_Height': 15, 'NDVI': 0.85, 'Age_Years': 10}
+FALLBACK_BASE_PREDICTION = 150.0
+CREDIT_PRICE_INR = 830
+WATER_RECHARGE_PER_TREE_L = 1500
 
-    # --- Data Processing ---
-    mine_data['Month_Year'] = mine_data['Date'].dt.to_period('M')
-    monthly_trend = mine_data.groupby('Month_Year')['Emission_Index'].mean().reset_index()
-    monthly_trend['Month_Year'] = monthly_trend['Month_Year'].astype(str)
+def aggregate_plan_inputs(frame, group_column):
+    """
+    Per-group planning inputs in one groupby pass: first State/District, mean daily
+    Emission_Index, and the monthly Emission_Index trend (Series indexed by group, Month_Year).
+    """
+    frame = frame[[group_column, 'Date', 'State', 'District', 'Emission_Index']].copy()
+    frame['Month_Year'] = frame['Date'].dt.to_period('M')
+    summary = frame.groupby(group_column, sort=False, observed=True).agg(
+        State=('State', 'first'),
+        District=('District', 'first'),
+        Avg_Emission=('Emission_Index', 'mean'),
+    )
+    monthly = frame.groupby([group_column, 'Month_Year'], observed=True)['Emission_Index'].mean()
+    return summary, monthly
 
-    region_state = mine_data['State'].iloc[0]
-    region_district = mine_data['District'].iloc[0]
-    avg_daily_emission = mine_data['Emission_Index'].mean()
-    annual_target = avg_daily_emission * 365
+def compute_plan_table(mine_names, states, districts, avg_emissions, base_predictions, registry_df):
+    """
+    Computes every plan KPI for many mines at once as NumPy columns.
+    mine_names are the keys into registry_df (the operational registry); the other
+    arguments are aligned arrays.
+    Returns a DataFrame with one row per mine; slice rows with plan_record().
+    """
+    table = pd.DataFrame({
+        'Mine_Name': np.asarray(mine_names, dtype=object),
+        'State': np.asarray(states, dtype=object),
+        'District': np.asarray(districts, dtype=object),
+        'Avg_Emission': np.asarray(avg_emissions, dtype=np.float64),
+        'Base_Prediction': np.asarray(base_predictions, dtype=np.float64),
+    })
 
-    ops = operational_registry_df[operational_registry_df['Mine_Name'] == selected_mine_name]
-    
-    if ops.empty:
-        land_limit = 500.0
-        c_teak = 8.0
-        c_acacia = 5.0
-        c_pioneer = 4.0
-        max_teak = 0.50
-    else:
-        vals = ops.iloc[0]
-        land_limit = vals['Available_Land_Ha']
-        c_teak = vals['Cost_Teak']
-        c_acacia = vals['Cost_Acacia']
-        c_pioneer = vals['Cost_Pioneer']
-        max_teak = vals['Max_Teak_Pct']
-
-    # --- ML Prediction ---
-    # Fallback to Odisha model or first available model if specific state not found
-    active_model = region_models.get(region_state)
-    if not active_model and region_models:
-        active_model = list(region_models.values())[0]
-    
-    if active_model:
-        std_tree_features = pd.DataFrame({'Max_Height': [15], 'NDVI': [0.85], 'Age_Years': [10]})
-        base_prediction = active_model.predict(std_tree_features)[0]
+    # Join the operational registry (first entry per mine wins), defaults where missing
+    registry_columns = list(REGISTRY_DEFAULTS)
+    if not registry_df.empty and 'Mine_Name' in registry_df.columns:
+        registry = registry_df.drop_duplicates('Mine_Name').set_index('Mine_Name')
+        registry = registry.reindex(columns=registry_columns).reindex(table['Mine_Name'])
+        for column in registry_columns:
+            table[column] = registry[column].to_numpy(dtype=np.float64)
     else:
-        base_prediction = 150.0 # Fallback value
+        for column in registry_columns:
+            table[column] = np.nan
+    table = table.fillna(REGISTRY_DEFAULTS)
 
-    asr_teak = (base_prediction * 1.2) / 10 / 1000 
-    asr_acacia = (base_prediction * 1.0) / 10 / 1000
-    asr_pioneer = (base_prediction * 0.8) / 10 / 1000
+    annual_target = table['Avg_Emission'].to_numpy() * 365
+    table['Annual_Target'] = annual_target
 
-    pct_teak = 0.40
-    pct_acacia = 0.30
-    pct_pioneer = 0.30
+    avg_mix_asr = np.zeros(len(table))
+    for species in SPECIES_ASR_FACTOR:
+        asr = species_asr(table['Base_Prediction'].to_numpy(), species)
+        table[f'ASR_{species}'] = asr
+        avg_mix_asr = avg_mix_asr + SPECIES_MIX[species] * asr
+    avg_mix_asr = np.where(avg_mix_asr == 0, 0.001, avg_mix_asr) # Prevent div by zero
 
-    avg_mix_asr = (pct_teak * asr_teak) + (pct_acacia * asr_acacia) + (pct_pioneer * asr_pioneer)
-    if avg_mix_asr == 0: avg_mix_asr = 0.001 # Prevent div by zero
-        
     total_trees = annual_target / avg_mix_asr
-    
-    n_teak = total_trees * pct_teak
-    n_acacia = total_trees * pct_acacia
-    n_pioneer = total_trees * pct_pioneer
-    
-    total_cost = (n_teak * c_teak) + (n_acacia * c_acacia) + (n_pioneer * c_pioneer)
-    land_required = total_trees / 2000 
-    
-    cost_teak_total = n_teak * c_teak
-    cost_acacia_total = n_acacia * c_acacia
-    cost_pioneer_total = n_pioneer * c_pioneer
-    
-    teak_offset_total = n_teak * asr_teak
-    acacia_offset_total = n_acacia * asr_acacia
-    pioneer_offset_total = n_pioneer * asr_pioneer
+    table['Total_Trees'] = total_trees
 
-    annual_methane_tonnes = annual_target / 28
-    ethanol_potential_liters = (annual_methane_tonnes * 1000) * 1.4
-    water_required_liters_ethanol = ethanol_potential_liters * 4
-    estimated_fuel_revenue = ethanol_potential_liters * 65.0
+    total_cost = np.zeros(len(table))
+    for species, pct in SPECIES_MIX.items():
+        count = total_trees * pct
+        cost = count * table[SPECIES_COST_COLUMN[species]].to_numpy()
+        table[f'Count_{species}'] = count
+        table[f'Cost_{species}_Total'] = cost
+        table[f'Offset_{species}'] = count * table[f'ASR_{species}'].to_numpy()
+        total_cost = total_cost + cost
+    table['Total_Cost'] = total_cost
+    table['Land_Required'] = total_trees / TREES_PER_HA
 
-    credit_price_inr = 830 
-    carbon_revenue_potential = annual_target * credit_price_inr
-    
-    water_recharge_per_tree = 1500 
-    total_water_conserved_liters = total_trees * water_recharge_per_tree
+    methane_tonnes = annual_target / 28
+    ethanol_litres = (methane_tonnes * 1000) * 1.4
+    table['Methane_Tonnes'] = methane_tonnes
+    table['Ethanol_Litres'] = ethanol_litres
+    table['Ethanol_Water_Litres'] = ethanol_litres * 4
+    table['Fuel_Revenue'] = ethanol_litres * 65.0
+    table['Carbon_Revenue'] = annual_target * CREDIT_PRICE_INR
+    table['Water_Conserved_Litres'] = total_trees * WATER_RECHARGE_PER_TREE_L
 
-    scenario_low_budget_trees = annual_target / (asr_pioneer if asr_pioneer > 0 else 1)
-    scenario_low_budget_cost = scenario_low_budget_trees * c_pioneer
-    
-    scenario_high_eff_trees = annual_target / (asr_teak if asr_teak > 0 else 1)
-    scenario_high_eff_cost = scenario_high_eff_trees * c_teak
+    asr_pioneer = table['ASR_pioneer'].to_numpy()
+    asr_teak = table['ASR_teak'].to_numpy()
+    table['Low_Budget_Trees'] = annual_target / np.where(asr_pioneer > 0, asr_pioneer, 1)
+    table['Low_Budget_Cost'] = table['Low_Budget_Trees'] * table['Cost_Pioneer']
+    table['High_Eff_Trees'] = annual_target / np.where(asr_teak > 0, asr_teak, 1)
+    table['High_Eff_Cost'] = table['High_Eff_Trees'] * table['Cost_Teak']
+    return table
+
+def plan_record(row, monthly_trend):
+    """
+    Builds the dashboard response for one plan-table row (monthly_trend: Month_Year -> mean index).
+    Values stay NumPy scalars: the API's response class encodes them (and NaN) directly.
+    """
+    annual_target = row['Annual_Target']
+    land_required = row['Land_Required']
+    land_limit = row['Available_Land_Ha']
 
-    # --- Response Construction (Matches React Schema) ---
     frontend_response = {
         "mine_metadata": {
-            "mine_name": selected_mine_name,
-            "district": region_district,
-            "state": region_state,
+            "mine_name": row['Mine_Name'],
+            "district": row['District'],
+            "state": row['State'],
             "status": "success"
         },
         "kpis": {
             "annual_offset_target_tonnes": round(annual_target, 0),
-            "total_trees_required": int(round(total_trees)),
-            "estimated_budget_inr": round(total_cost, 2),
+            "total_trees_required": int(round(row['Total_Trees'])),
+            "estimated_budget_inr": round(row['Total_Cost'], 2),
             "land_required_ha": round(land_required, 1),
             "land_available_ha": land_limit,
             "land_status": "CRITICAL" if land_required > land_limit else "AVAILABLE",
             "total_offset_achieved": round(annual_target, 0) # Assumption: plan meets target
         },
         "tree_plan": {
-             "teak": {"count": int(round(n_teak)), "total_cost": round(cost_teak_total, 2), "asr_per_tree": round(asr_teak * 1000, 2), "offset_contribution_tonnes": round(teak_offset_total, 2)},
-             "acacia": {"count": int(round(n_acacia)), "total_cost": round(cost_acacia_total, 2), "asr_per_tree": round(asr_acacia * 1000, 2), "offset_contribution_tonnes": round(acacia_offset_total, 2)},
-             "pioneer": {"count": int(round(n_pioneer)), "total_cost": round(cost_pioneer_total, 2), "asr_per_tree": round(asr_pioneer * 1000, 2), "offset_contribution_tonnes": round(pioneer_offset_total, 2)}
+            species: {
+                "count": int(round(row[f'Count_{species}'])),
+                "total_cost": round(row[f'Cost_{species}_Total'], 2),
+                "asr_per_tree": round(row[f'ASR_{species}'] * 1000, 2),
+                "offset_contribution_tonnes": round(row[f'Offset_{species}'], 2)
+            }
+            for species in SPECIES_MIX
         },
         "waste_to_wealth": {
-            "annual_methane_captured_kg": round(annual_methane_tonnes * 1000, 2),
-            "ethanol_production_litres": round(ethanol_potential_liters, 2),
-            "water_required_litres": round(water_required_liters_ethanol, 2),
-            "estimated_revenue_inr": round(estimated_fuel_revenue, 2)
+            "annual_methane_captured_kg": round(row['Methane_Tonnes'] * 1000, 2),
+            "ethanol_production_litres": round(row['Ethanol_Litres'], 2),
+            "water_required_litres": round(row['Ethanol_Water_Litres'], 2),
+            "estimated_revenue_inr": round(row['Fuel_Revenue'], 2)
         },
         "carbon_credits": {
             "total_offset_credits_tonnes": round(annual_target, 0),
-            "market_price_per_credit_inr": credit_price_inr,
-            "total_revenue_potential_inr": round(carbon_revenue_potential, 2)
+            "market_price_per_credit_inr": CREDIT_PRICE_INR,
+            "total_revenue_potential_inr": round(row['Carbon_Revenue'], 2)
         },
         "water_conservation": {
-            "total_water_conserved_kilolitres": round(total_water_conserved_liters / 1000, 0),
+            "total_water_conserved_kilolitres": round(row['Water_Conserved_Litres'] / 1000, 0),
             "status": "High Efficiency"
         },
         "what_if_scenarios": {
             "low_budget": {
-                "total_trees": int(round(scenario_low_budget_trees)),
-                "total_cost": round(scenario_low_budget_cost, 2),
+                "total_trees": int(round(row['Low_Budget_Trees'])),
+                "total_cost": round(row['Low_Budget_Cost'], 2),
                 "offset_tonnes": round(annual_target, 2)
             },
             "high_efficiency": {
-                "total_trees": int(round(scenario_high_eff_trees)),
-                "total_cost": round(scenario_high_eff_cost, 2),
+                "total_trees": int(round(row['High_Eff_Trees'])),
+                "total_cost": round(row['High_Eff_Cost'], 2),
                 "offset_tonnes": round(annual_target, 2)
             }
         },
         "graphs": {
-            "monthly_emissions": monthly_trend.rename(columns={'Month_Year': 'month_year', 'Emission_Index': 'emission_index'}).to_dict(orient='records')
+            "monthly_emissions": [
+                {"month_year": str(period), "emission_index": value} for period, value in monthly_trend.items()
+            ]
         }
     }
-    
-    return convert_safe(frontend_response)
+    return frontend_response
+
+def species_asr(base_prediction, species):
+    """Annual sequestration per tree (t CO2e) for a species, from the standard-tree stock prediction."""
+    return (base_prediction * SPECIES_ASR_FACTOR[species]) / 10 / 1000
+
+def build_sequestration_table(models):
+    """
+    Per-region standard-tree (15 m, NDVI 0.85, 10 yrs) CO2e stock prediction and the
+    derived per-species ASR. Computed once whenever the models are loaded or trained.
+    """
+    std_tree_features = pd.DataFrame({column: [value] for column, value in STANDARD_TREE.items()})
+    base = pd.Series({region: model.predict(std_tree_features)[0] for region, model in models.items()}, dtype=np.float64)
+    table = pd.DataFrame({'Base_Prediction': base})
+    for species in SPECIES_ASR_FACTOR:
+        table[f'ASR_{species}'] = species_asr(table['Base_Prediction'], species)
+    return table
+
+def predict_base_sequestration(regions, sequestration_table):
+    """
+    Standard-tree prediction for each region, read from the precomputed sequestration
+    table. Falls back to the first available model, then to 150 t/ha.
+    """
+    base = sequestration_table['Base_Prediction'] if 'Base_Prediction' in sequestration_table else pd.Series(dtype=np.float64)
+    fallback = base.iloc[0] if len(base) else FALLBACK_BASE_PREDICTION
+    return {region: base.get(region, fallback) for region in regions}
+
+def score_tree_features(states, heights, ndvis, ages):
+    """
+    Scores caller-supplied tree feature vectors with the regional models, one vectorized
+    predict call per region. Unknown states use the first available model.
+    Returns (predicted CO2e stock t/ha, region whose model was used) as aligned arrays.
+    """
+    region_models = engine_state.region_models
+    features = pd.DataFrame({
+        'State': np.asarray(states, dtype=object),
+        'Max_Height': np.asarray(heights, dtype=np.float64),
+        'NDVI': np.asarray(ndvis, dtype=np.float64),
+        'Age_Years': np.asarray(ages, dtype=np.float64),
+    })
+    predictions = np.full(len(features), FALLBACK_BASE_PREDICTION)
+    model_regions = np.full(len(features), None, dtype=object)
+    fallback_region = next(iter(region_models), None)
+
+    for state, positions in features.groupby('State', sort=False).indices.items():
+        region = state if state in region_models else fallback_region
+        if region is None:
+            continue
+        predictions[positions] = region_models[region].predict(features.iloc[positions][MODEL_FEATURES])
+        model_regions[positions] = region
+    return predictions, model_regions
+
+def precompute_mine_plans(main_df, registry_df, sequestration_table):
+    """
+    Plan table for every mine in the dataset (indexed by lowercased name) plus the
+    per-mine monthly trends. Built once per engine load; requests are served by
+    slicing it.
+    """
+    summary, monthly = aggregate_plan_inputs(main_df, 'Mine_Name')
+    base = predict_base_sequestration(summary['State'].unique(), sequestration_table)
+    table = compute_plan_table(summary.index, summary['State'], summary['District'],
+                               summary['Avg_Emission'], summary['State'].map(base), registry_df)
+    table.index = [str(name).lower() for name in summary.index]
+    trends = {str(name).lower(): trend.droplevel(0) for name, trend in monthly.groupby(level=0, observed=True)}
+    return table, trends
+
+# ---------------------------------------------------------
+# SCENARIO SWEEP
+# ---------------------------------------------------------
+# What-if analysis for one mine over a grid of unit costs, species mix, credit
+# price and share of the annual target. Every combination is evaluated at once
+# with broadcast NumPy arithmetic, then reduced to its cost-vs-offset Pareto
+# frontier (no other scenario offsets more for less).
+
+SCENARIO_PARAMETERS = ['cost_teak', 'cost_acacia', 'cost_pioneer', 'pct_teak', 'pct_acacia',
+                       'credit_price_inr', 'target_share']
+SCENARIO_OBJECTIVES = ('total_cost', 'net_cost')
+MAX_SCENARIO_GRID = 250_000
+
+def scenario_values(spec):
+    """Parameter values from a list, or from a {"min", "max", "steps"} range."""
+    if isinstance(spec, dict):
+        if 'values' in spec:
+            return np.unique(np.asarray(spec['values'], dtype=np.float64))
+        return np.linspace(spec['min'], spec['max'], int(spec.get('steps', 1)))
+    return np.unique(np.atleast_1d(np.asarray(spec, dtype=np.float64)))
+
+def scenario_grid(parameter_values):
+    """Cartesian product of the per-parameter value arrays, as flat aligned arrays."""
+    arrays = [np.asarray(parameter_values[p], dtype=np.float64) for p in SCENARIO_PARAMETERS]
+    size = int(np.prod([len(a) for a in arrays]))
+    if size > MAX_SCENARIO_GRID:
+        raise ValueError(f"Scenario grid has {size} combinations; the limit is {MAX_SCENARIO_GRID}.")
+    mesh = np.meshgrid(*arrays, indexing='ij')
+    return {p: m.ravel() for p, m in zip(SCENARIO_PARAMETERS, mesh)}
+
+def evaluate_scenarios(grid, annual_target, asr, land_limit=None, max_teak_pct=None):
+    """
+    Plan figures for every grid combination (asr: species -> t CO2e per tree per year).
+    pct_pioneer makes up the rest of the mix; combinations with a negative share or
+    parameter, or whose teak+acacia share exceeds 1 (or the teak cap, when given), are
+    dropped. With land_limit, plans that would need more land are scaled down to fit
+    it, so they offset less than targeted.
+    Returns a dict of aligned arrays over the feasible combinations.
+    """
+    pct_pioneer = 1.0 - grid['pct_teak'] - grid['pct_acacia']
+    feasible = pct_pioneer >= -1e-9
+    for p in SCENARIO_PARAMETERS:
+        feasible &= grid[p] >= 0
+    if max_teak_pct is not None:
+        feasible &= grid['pct_teak'] <= max_teak_pct + 1e-9
+    result = {p: values[feasible] for p, values in grid.items()}
+    # Only float round-off (teak+acacia == 1 within 1e-9) can be below zero here
+    result['pct_pioneer'] = np.maximum(pct_pioneer[feasible], 0.0)
+
+    mix_asr = (result['pct_teak'] * asr['teak'] + result['pct_acacia'] * asr['acacia']
+               + result['pct_pioneer'] * asr['pioneer'])
+    mix_asr = np.where(mix_asr == 0, 0.001, mix_asr) # Prevent div by zero
+    cost_per_tree = (result['pct_teak'] * result['cost_teak'] + result['pct_acacia'] * result['cost_acacia']
+                     + result['pct_pioneer'] * result['cost_pioneer'])
+
+    trees = annual_target * result['target_share'] / mix_asr
+    if land_limit is not None:
+        trees = np.minimum(trees, land_limit * TREES_PER_HA)
+    offset = trees * mix_asr
+    total_cost = trees * cost_per_tree
+    carbon_revenue = offset * result['credit_price_inr']
+
+    result['total_trees'] = trees
+    result['land_required_ha'] = trees / TREES_PER_HA
+    result['offset_tonnes'] = offset
+    result['total_cost_inr'] = total_cost
+    result['carbon_revenue_inr'] = carbon_revenue
+    result['net_cost_inr'] = total_cost - carbon_revenue
+    result['cost_per_tonne_inr'] = total_cost / np.where(offset > 0, offset, 1)
+    return result
+
+def pareto_frontier(cost, offset):
+    """
+    Indices of the non-dominated scenarios (lower cost, higher offset), ordered by
+    cost. One sort plus a running maximum: a scenario is on the frontier when it
+    offsets more than every cheaper one (beyond float round-off, so equal offsets
+    reached through different mixes count as ties).
+    """
+    order = np.lexsort((-offset, cost))
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], offset[order][:-1])))
+    return order[offset[order] - best_before > 1e-9 * np.abs(offset[order])]
+
+def scenario_record(scenarios, i):
+    return {
+        "cost_teak": round(float(scenarios['cost_teak'][i]), 4),
+        "cost_acacia": round(float(scenarios['cost_acacia'][i]), 4),
+        "cost_pioneer": round(float(scenarios['cost_pioneer'][i]), 4),
+        "pct_teak": round(float(scenarios['pct_teak'][i]), 4),
+        "pct_acacia": round(float(scenarios['pct_acacia'][i]), 4),
+        "pct_pioneer": round(float(scenarios['pct_pioneer'][i]), 4),
+        "credit_price_inr": round(float(scenarios['credit_price_inr'][i]), 2),
+        "target_share": round(float(scenarios['target_share'][i]), 4),
+        "total_trees": int(round(scenarios['total_trees'][i])),
+        "land_required_ha": round(float(scenarios['land_required_ha'][i]), 1),
+        "offset_tonnes": round(float(scenarios['offset_tonnes'][i]), 2),
+        "total_cost_inr": round(float(scenarios['total_cost_inr'][i]), 2),
+        "carbon_revenue_inr": round(float(scenarios['carbon_revenue_inr'][i]), 2),
+        "net_cost_inr": round(float(scenarios['net_cost_inr'][i]), 2),
+        "cost_per_tonne_inr": round(float(scenarios['cost_per_tonne_inr'][i]), 2),
+    }
+
+# ---------------------------------------------------------
+# SPECIES MIX OPTIMIZER
+# ---------------------------------------------------------
+# Minimum-cost teak/acacia/pioneer counts per mine that meet the annual target
+# within the registry's teak cap (Max_Teak_Pct) and land (Available_Land_Ha).
+# All mines go into one block-diagonal LP (three variables and three rows per
+# mine) solved with a single HiGHS call. Where the land cannot hold enough trees
+# the target is lowered to the most the land can offset, so every mine gets a
+# plan that fits instead of a CRITICAL land status.
+
+def max_land_offset(asr, land_limits, max_teak_pcts):
+    """Most CO2e the land can offset per year: full planting, teak up to its cap if it is the best sequesterer."""
+    capacity = land_limits * TREES_PER_HA
+    best_other = np.maximum(asr['acacia'], asr['pioneer'])
+    per_tree = np.where(asr['teak'] > best_other,
+                        max_teak_pcts * asr['teak'] + (1 - max_teak_pcts) * best_other,
+                        best_other)
+    return capacity * per_tree
+
+def optimize_species_mix(plan_table):
+    """
+    Solves the mix LP for every row of a plan table (see compute_plan_table).
+    Returns a DataFrame on the same index with the optimal per-species counts,
+    costs and offsets, the achieved offset and whether the full target was met.
+    """
+    n = len(plan_table)
+    species = list(SPECIES_ASR_FACTOR)
+    k = len(species)
+    asr = {sp: plan_table[f'ASR_{sp}'].to_numpy(dtype=np.float64) for sp in species}
+    costs = np.column_stack([plan_table[SPECIES_COST_COLUMN[sp]].to_numpy(dtype=np.float64) for sp in species])
+    land = plan_table['Available_Land_Ha'].to_numpy(dtype=np.float64)
+    teak_cap = np.clip(plan_table['Max_Teak_Pct'].to_numpy(dtype=np.float64), 0.0, 1.0)
+    target = plan_table['Annual_Target'].to_numpy(dtype=np.float64)
+
+    # Slightly under the land's maximum so round-off never makes a land-limited LP infeasible
+    achievable = np.minimum(target, max_land_offset(asr, land, teak_cap) * (1 - 1e-9))
+    achievable = np.maximum(achievable, 0.0)
+
+    # Variables: [teak_0, acacia_0, pioneer_0, teak_1, ...]; rows per mine: offset, teak cap, land
+    cols = np.arange(n * k).reshape(n, k)
+    asr_matrix = np.column_stack([asr[sp] for sp in species])
+    teak_row = np.column_stack([1 - teak_cap] + [-teak_cap] * (k - 1))
+    values = np.concatenate([-asr_matrix, teak_row, np.ones((n, k))], axis=1).ravel()
+    rows = np.repeat(np.arange(3 * n).reshape(n, 3), k, axis=1).ravel()
+    columns = np.tile(cols, (1, 3)).ravel()
+    a_ub = sparse.csr_matrix((values, (rows, columns)), shape=(3 * n, n * k))
+    b_ub = np.column_stack([-achievable, np.zeros(n), land * TREES_PER_HA]).ravel()
+
+    solution = linprog(costs.ravel(), A_ub=a_ub, b_ub=b_ub, bounds=(0, None), method='highs')
+    if not solution.success:
+        raise RuntimeError(f"Species mix optimization failed: {solution.message}")
+
+    counts = solution.x.reshape(n, k)
+    result = pd.DataFrame(index=plan_table.index)
+    for j, sp in enumerate(species):
+        result[f'Opt_Count_{sp}'] = counts[:, j]
+        result[f'Opt_Cost_{sp}_Total'] = counts[:, j] * costs[:, j]
+        result[f'Opt_Offset_{sp}'] = counts[:, j] * asr[sp]
+    result['Opt_Total_Trees'] = counts.sum(axis=1)
+    result['Opt_Total_Cost'] = (counts * costs).sum(axis=1)
+    result['Opt_Offset'] = (counts * asr_matrix).sum(axis=1)
+    result['Opt_Land_Required'] = result['Opt_Total_Trees'] / TREES_PER_HA
+    result['Opt_Target_Met'] = achievable >= target * (1 - 1e-6)
+    return result
+
+def optimized_plan_record(row):
+    """Dashboard-style response for one plan-table row joined with its optimize_species_mix() result."""
+    total_trees = row['Opt_Total_Trees']
+    return {
+        "mine_metadata": {
+            "mine_name": row['Mine_Name'],
+            "district": row['District'],
+            "state": row['State'],
+            "status": "success"
+        },
+        "kpis": {
+            "annual_offset_target_tonnes": round(row['Annual_Target'], 0),
+            "total_trees_required": int(round(total_trees)),
+            "estimated_budget_inr": round(row['Opt_Total_Cost'], 2),
+            "land_required_ha": round(row['Opt_Land_Required'], 1),
+            "land_available_ha": row['Available_Land_Ha'],
+            "land_status": "AVAILABLE" if row['Opt_Target_Met'] else "LAND_LIMITED",
+            "total_offset_achieved": round(row['Opt_Offset'], 0),
+            "target_met": bool(row['Opt_Target_Met']),
+        },
+        "constraints": {
+            "max_teak_pct": row['Max_Teak_Pct'],
+            "land_available_ha": row['Available_Land_Ha'],
+        },
+        "tree_plan": {
+            species: {
+                "count": int(round(row[f'Opt_Count_{species}'])),
+                "share": round(row[f'Opt_Count_{species}'] / total_trees, 4) if total_trees > 0 else 0.0,
+                "total_cost": round(row[f'Opt_Cost_{species}_Total'], 2),
+                "asr_per_tree": round(row[f'ASR_{species}'] * 1000, 2),
+                "offset_contribution_tonnes": round(row[f'Opt_Offset_{species}'], 2)
+            }
+            for species in SPECIES_MIX
+        },
+        "comparison": {
+            "standard_mix_budget_inr": round(row['Total_Cost'], 2),
+            "standard_mix_land_required_ha": round(row['Land_Required'], 1),
+            "savings_inr": round(row['Total_Cost'] - row['Opt_Total_Cost'], 2) if row['Opt_Target_Met'] else None,
+        },
+    }
+
+# ---------------------------------------------------------
+# MAIN PREDICTION FUNCTION (Called by API)
+# ---------------------------------------------------------
+# Renamed from get_dashboard_data to match predictor.py expectation
+def generate_offset_plan(user_input_name):
+    return generate_offset_plans([user_input_name])[0]
+
+def resolve_mine_key(state, user_input_name):
+    """Plan-table key for a user-typed mine name, or (None, error dict with suggestions)."""
+    mine, status, candidates = state.mine_search_index.resolve(user_input_name)
+    if mine is None:
+        reason = "is ambiguous" if status == "ambiguous" else "not found"
+        return None, {
+            "error": f"Mine '{user_input_name.strip()}' {reason}.",
+            "available_mines": [c["mine_name"] for c in candidates] or state.available_mines[:10]
+        }
+    return mine["mine_name"].lower(), None
+
+def generate_offset_plans(user_input_names):
+    """
+    Offset plans for a portfolio of mines, one plan (or error dict) per input name.
+    Each name is resolved to a single mine through the search index and its plan is
+    sliced from the precomputed plan table. Unknown or ambiguous names get an error
+    with ranked suggestions instead of silently merging several mines.
+    """
+    state = engine_state # One snapshot for the whole call, even if a reload swaps it meanwhile
+    if state.main_emissions_df.empty:
+        return [{"error": "ML Datasets not loaded correctly."} for _ in user_input_names]
+
+    results = []
+    for name in user_input_names:
+        key, error = resolve_mine_key(state, name)
+        if error:
+            results.append(error)
+            continue
+        results.append(plan_record(state.mine_plan_table.loc[key], state.mine_monthly_trends[key]))
+    return results
+
+def generate_offset_scenarios(user_input_name, parameter_specs=None, objective='total_cost',
+                              enforce_registry_limits=True, max_points=50):
+    """
+    Scenario sweep for one mine. parameter_specs maps SCENARIO_PARAMETERS to a value
+    list or a {"min", "max", "steps"} range; omitted parameters stay at the mine's
+    current plan values. With enforce_registry_limits the registry's land and teak
+    caps apply. Returns the Pareto frontier of objective vs offset, thinned to at
+    most max_points evenly spaced points.
+    """
+    if objective not in SCENARIO_OBJECTIVES:
+        raise ValueError(f"objective must be one of {SCENARIO_OBJECTIVES}.")
+    state = engine_state
+    if state.main_emissions_df.empty:
+        return {"error": "ML Datasets not loaded correctly."}
+    key, error = resolve_mine_key(state, user_input_name)
+    if error:
+        return error
+    row = state.mine_plan_table.loc[key]
+
+    current = {
+        'cost_teak': row['Cost_Teak'],
+        'cost_acacia': row['Cost_Acacia'],
+        'cost_pioneer': row['Cost_Pioneer'],
+        'pct_teak': SPECIES_MIX['teak'],
+        'pct_acacia': SPECIES_MIX['acacia'],
+        'credit_price_inr': CREDIT_PRICE_INR,
+        'target_share': 1.0,
+    }
+    specs = parameter_specs or {}
+    values = {p: scenario_values(specs[p]) if p in specs else np.array([current[p]], dtype=np.float64)
+              for p in SCENARIO_PARAMETERS}
+    grid = scenario_grid(values)
+    scenarios = evaluate_scenarios(
+        grid,
+        row['Annual_Target'],
+        {species: row[f'ASR_{species}'] for species in SPECIES_ASR_FACTOR},
+        land_limit=row['Available_Land_Ha'] if enforce_registry_limits else None,
+        max_teak_pct=row['Max_Teak_Pct'] if enforce_registry_limits else None,
+    )
+
+    cost = scenarios['net_cost_inr' if objective == 'net_cost' else 'total_cost_inr']
+    frontier = pareto_frontier(cost, scenarios['offset_tonnes'])
+    if len(frontier) > max_points:
+        frontier = frontier[np.unique(np.linspace(0, len(frontier) - 1, max_points).round().astype(int))]
+
+    return {
+        "mine_metadata": {"mine_name": row['Mine_Name'], "district": row['District'], "state": row['State']},
+        "annual_offset_target_tonnes": round(float(row['Annual_Target']), 0),
+        "land_available_ha": float(row['Available_Land_Ha']),
+        "max_teak_pct": float(row['Max_Teak_Pct']),
+        "objective": objective,
+        "parameters": {p: [round(float(v), 4) for v in values[p]] for p in SCENARIO_PARAMETERS},
+        "combinations_evaluated": len(grid['pct_teak']),
+        "combinations_feasible": len(scenarios['pct_teak']),
+        "frontier": [scenario_record(scenarios, i) for i in frontier],
+    }
+
+def generate_optimized_plans(user_input_names=None):
+    """
+    Cost-optimal species mix plans, solved as one LP for all requested mines.
+    Without names, plans every operational-registry mine that has emissions data.
+    Returns {"plans": [...], "not_found": [error dicts with "query"]}.
+    """
+    state = engine_state
+    if state.main_emissions_df.empty:
+        return {"plans": [], "not_found": [{"query": name, "error": "ML Datasets not loaded correctly."}
+                                           for name in user_input_names or []]}
+
+    if user_input_names is None:
+        registry = state.operational_registry_df
+        user_input_names = registry['Mine_Name'].drop_duplicates().tolist() if 'Mine_Name' in registry.columns else []
+    keys, not_found = [], []
+    for name in user_input_names:
+        key, error = resolve_mine_key(state, name)
+        if error:
+            not_found.append({"query": name, **error})
+        elif key not in keys:
+            keys.append(key)
+    if not keys:
+        return {"plans": [], "not_found": not_found}
+
+    table = state.mine_plan_table.loc[keys]
+    optimized = table.join(optimize_species_mix(table))
+    return {"plans": [optimized_plan_record(row) for _, row in optimized.iterrows()], "not_found": not_found}
+
+def generate_forecast(user_input_name, horizon=12):
+    """Monthly Emission_Index forecast for one mine from the seasonal parameters fitted at load time."""
+    state = engine_state
+    if state.main_emissions_df.empty:
+        return {"error": "ML Datasets not loaded correctly."}
+    key, error = resolve_mine_key(state, user_input_name)
+    if error:
+        return error
+    result = state.mine_forecaster.forecast(key, horizon) if key in state.mine_forecaster else None
+    if result is None:
+        return {"error": f"Not enough monthly history to forecast '{user_input_name.strip()}'.", "available_mines": []}
+    row = state.mine_plan_table.loc[key]
+    return {
+        "mine_metadata": {"mine_name": row['Mine_Name'], "district": row['District'], "state": row['State']},
+        "horizon": horizon,
+        **result,
+    }
 
 # ---------------------------------------------------------
 # STANDALONE TEST BLOCK
 # ---------------------------------------------------------
 if __name__ == "__main__":
     # This block only runs if you execute this file directly (not when imported)
-    print(f"System Loaded. Available Mines: {available_mines[:5]}...")
+    parser = argparse.ArgumentParser(description="Carbon offset ML engine")
+    parser.add_argument("--build-models", action="store_true",
+                        help="Build the regional model artifacts (e.g. during deploy) and exit.")
+    parser.add_argument("--force", action="store_true",
+                        help="With --build-models: retrain even if an artifact for the current data exists.")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Compare the emissions dataset's memory footprint with a default read_csv and exit.")
+    args = parser.parse_args()
+
+    if args.memory_report:
+        before = dataset_io.memory_report(pd.read_csv(EMISSIONS_FILE))
+        after = dataset_io.memory_report(dataset_io.read_emissions_csv(EMISSIONS_FILE, columns=EMISSIONS_ENGINE_COLUMNS))
+        print(f"{'Column':<32}{'Default':>22}{'Compact':>22}")
+        for col, info in before["columns"].items():
+            compact = after["columns"].get(col)
+            compact_text = f"{compact['dtype']} {compact['bytes'] / 1024:.0f} KiB" if compact else "-"
+            print(f"{col:<32}{info['dtype'] + ' ' + format(info['bytes'] / 1024, '.0f') + ' KiB':>22}{compact_text:>22}")
+        print(f"Total: {before['total_bytes'] / 1e6:.2f} MB -> {after['total_bytes'] / 1e6:.2f} MB "
+              f"({before['total_bytes'] / max(after['total_bytes'], 1):.1f}x smaller)")
+        sys.exit(0)
+
+    if not initialize_engine(force_retrain=args.build_models and args.force):
+        sys.exit(1)
+
+    if args.build_models:
+        print(f"Model artifact {engine_state.model_artifact_key} ready at {model_store.artifact_path(engine_state.model_artifact_key)}")
+        report = engine_state.training_report
+        if report:
+            print(f"Trained with {report['workers']} worker(s) x {report['threads_per_model']} thread(s) in {report['wall_seconds']:.2f}s")
+            for region, info in sorted(report["regions"].items()):
+                print(f"  {region:<16} rows={info['rows']:<6} fit={info['fit_seconds']:.3f}s oob_r2={info['oob_score']}")
+        else:
+            print(f"Regions: {sorted(engine_state.region_models)}")
+        sys.exit(0)
+
+    print(f"System Loaded. Available Mines: {engine_state.available_mines[:5]}...")
     user_input = input("Enter Mine Name: ")
     api_response = generate_offset_plan(user_input)
     print(json.dumps(convert_safe(api_response), indent=4))
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# MODEL ARTIFACT STORE
+# ---------------------------------------------------------
+# Fitted regional models are saved under model_artifacts/<key>/, where the key
+# is a content hash of the training CSV plus the hyperparameters (and the
+# sklearn version, since pickled trees are not portable across releases).
+# Workers load an existing artifact memory-mapped instead of retraining.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.getenv("ML_ARTIFACTS_DIR", os.path.join(BASE_DIR, 'model_artifacts'))
+
+MODELS_FILENAME = 'regional_models.joblib'
+MANIFEST_FILENAME = 'manifest.json'
+
+def artifact_key(training_file, params):
+    """Content hash of the training data and hyperparameters that identifies one model set."""
+    digest = hashlib.sha256()
+    with open(training_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(sklearn.__version__.encode())
+    return digest.hexdigest()[:16]
+
+def artifact_path(key):
+    return os.path.join(ARTIFACTS_DIR, key)
+
+def load_models(key, mmap_mode='r'):
+    """Loads a saved model set, memory-mapping the tree arrays. Returns None if absent or unreadable."""
+    models_file = os.path.join(artifact_path(key), MODELS_FILENAME)
+    if not os.path.exists(models_file):
+        return None
+    try:
+        return joblib.load(models_file, mmap_mode=mmap_mode)
+    except Exception as e:
+        logger.warning(f"Discarding unreadable model artifact {key}: {e}")
+        return None
+
+def load_manifest(key):
+    """The manifest of a saved model set (params, regions, training report), or {} if absent."""
+    try:
+        with open(os.path.join(artifact_path(key), MANIFEST_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_models(key, models, params, training_report=None):
+    """
+    Writes a model set and its manifest. The artifact is assembled in a temporary
+    directory and renamed into place, so concurrent workers never see a partial write.
+    """
+    final_dir = artifact_path(key)
+    tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        joblib.dump(models, os.path.join(tmp_dir, MODELS_FILENAME))
+        manifest = {
+            "key": key,
+            "params": params,
+            "regions": sorted(models),
+            "sklearn_version": sklearn.__version__,
+            "created_at": datetime.utcnow().isoformat(),
+            "training": training_report,
+        }
+        with open(os.path.join(tmp_dir, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        if os.path.exists(final_dir):
+            # Another worker published the same key first; its artifact is identical
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            os.rename(tmp_dir, final_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return final_dir
+
+def load_or_train(training_file, params, train_fn, force=False):
+    """
+    Returns (models, key, trained). Models are loaded from the store when an artifact
+    for the current training data and params exists; otherwise train_fn() is called
+    and its result saved. train_fn returns (models, training_report).
+    """
+    key = artifact_key(training_file, params)
+    if not force:
+        models = load_models(key)
+        if models is not None:
+            logger.info(f"Loaded regional models from artifact {key}")
+            return models, key, False
+
+    models, training_report = train_fn()
+    try:
+        save_models(key, models, params, training_report)
+    except OSError as e:
+        # A read-only deploy still serves the freshly trained models
+        logger.warning(f"Could not persist model artifact {key}: {e}")
+    return models, key, True
@@ -1,8 +1,12 @@
 import pandas as pd
-from pymongo import MongoClient, UpdateOne
+from pymongo import MongoClient, UpdateMany
+from pymongo.errors import BulkWriteError
 import os
 import time
 
+import data_uploader
+from hotspot_clusters import CLUSTER_SOURCE_COLUMNS
+
 # --- CONFIGURATION ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "carbon_tracker_db"
@@ -11,6 +15,29 @@ COLLECTION_NAME = "emission_hotspots"
 # Path to your CSV
 CSV_FILE_PATH = os.path.join(os.path.dirname(__file__), '..', 'feature 2', 'emission_analysis_results.csv')
 
+def valid_mine_coordinates(df):
+    """
+    One (Mine_Name, Latitude, Longitude) row per mine, from its last row with usable
+    coordinates. Rows with missing/non-numeric values, lat outside [-90, 90] or lng
+    outside [-180, 180], or no mine name are skipped. Returns (coordinates, skipped rows).
+    """
+    if not {'Mine_Name', 'Latitude', 'Longitude'} <= set(df.columns):
+        return pd.DataFrame(columns=['Mine_Name', 'Latitude', 'Longitude']), len(df)
+    lat = pd.to_numeric(df['Latitude'], errors='coerce')
+    lng = pd.to_numeric(df['Longitude'], errors='coerce')
+    names = df['Mine_Name']
+    valid = lat.between(-90, 90) & lng.between(-180, 180) & names.notna() & (names.astype(str).str.strip() != '')
+    coords = pd.DataFrame({'Mine_Name': names[valid], 'Latitude': lat[valid], 'Longitude': lng[valid]})
+    return coords.drop_duplicates('Mine_Name', keep='last'), int((~valid).sum())
+
+def refresh_derived_data(db):
+    """Coordinates feed the map clusters, tiles and mine rollups: rebuild them from the patched rows."""
+    projection = {"_id": 0, **{col: 1 for col in CLUSTER_SOURCE_COLUMNS}}
+    rows = pd.DataFrame(list(db[COLLECTION_NAME].find({}, projection)))
+    data_uploader.rebuild_hotspot_clusters(db, rows)
+    data_uploader.invalidate_hotspot_tiles(db)
+    data_uploader.refresh_mine_rollups(db)
+
 def patch_coordinates_fast():
     print("🔌 Connecting to MongoDB...")
     client = MongoClient(MONGO_URI)
@@ -21,6 +48,8 @@ def patch_coordinates_fast():
     # This makes finding the specific mine instant, rather than scanning the whole DB
     print("⚡ Creating search index on 'Mine_Name'...")
     collection.create_index("Mine_Name")
+    # Geo queries (/hotspots/geo, /near, /within) run on the GeoJSON 'location' field
+    collection.create_index([("location", "2dsphere")])
 
     print(f"📖 Reading CSV from: {CSV_FILE_PATH}")
     try:
@@ -33,46 +62,45 @@ def patch_coordinates_fast():
     if 'Mine_Nam' in df.columns:
         df.rename(columns={'Mine_Nam': 'Mine_Name'}, inplace=True)
 
-    # Prepare Bulk Operations
+    # Prepare Bulk Operations: coordinates are per mine, so one update covers all of its rows
     print("🔄 Preparing data for bulk update...")
-    operations = []
-    
-    for index, row in df.iterrows():
-        mine_name = row.get('Mine_Name')
-        lat = row.get('Latitude')
-        lng = row.get('Longitude')
-
-        # Skip invalid rows
-        if pd.isna(lat) or pd.isna(lng) or not mine_name:
-            continue
-
-        # Create an update operation object
-        op = UpdateOne(
-            {"Mine_Name": mine_name},  # Filter
-            {"$set": {                 # Update
-                "Latitude": float(lat),
-                "Longitude": float(lng)
+    coords, skipped = valid_mine_coordinates(df)
+    if skipped:
+        print(f"⚠️ Skipped {skipped} rows with missing or out-of-range coordinates.")
+    operations = [
+        UpdateMany(
+            {"Mine_Name": row.Mine_Name},  # Filter
+            {"$set": {                     # Update
+                "Latitude": float(row.Latitude),
+                "Longitude": float(row.Longitude),
+                "location": data_uploader.geojson_point(row.Latitude, row.Longitude),
             }}
         )
-        operations.append(op)
+        for row in coords.itertuples(index=False)
+    ]
 
     # Execute Bulk Write
     if operations:
         print(f"🚀 Sending {len(operations)} updates to database...")
+        start_time = time.time()
         try:
-            start_time = time.time()
-            result = collection.bulk_write(operations)
-            end_time = time.time()
-            
-            print(f"\n✅ DONE in {end_time - start_time:.2f} seconds!")
+            # Unordered: one rejected update does not stop the others
+            result = collection.bulk_write(operations, ordered=False)
+            print(f"\n✅ DONE in {time.time() - start_time:.2f} seconds!")
             print(f"   - Matched: {result.matched_count}")
             print(f"   - Modified: {result.modified_count}")
+        except BulkWriteError as e:
+            print(f"❌ Bulk write error: {len(e.details.get('writeErrors', []))} updates failed, "
+                  f"{e.details.get('nModified', 0)} documents modified.")
         except Exception as e:
             print(f"❌ Bulk write error: {e}")
+            client.close()
+            return
+        refresh_derived_data(db)
     else:
         print("⚠️ No valid data found to update.")
 
     client.close()
 
 if __name__ == "__main__":
-    patch_coordinates_fast()
\ No newline at end of file
+    patch_coordinates_fast()
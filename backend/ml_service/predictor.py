@@ -1,7 +1,10 @@
 import sys
 import os
+import time
 import logging
+import threading
 import importlib.util
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -13,9 +16,11 @@ logger = logging.getLogger(__name__)
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 generate_offset_plan = None
+generate_offset_plans = None
+ml_engine_module = None
 
 def load_ml_engine():
-    global generate_offset_plan
+    global generate_offset_plan, generate_offset_plans, ml_engine_module
     target_filename = "ml_engine.py"
     engine_path = os.path.join(current_dir, target_filename)
     
@@ -29,6 +34,8 @@ def load_ml_engine():
             
             if hasattr(ml_module, "generate_offset_plan"):
                 generate_offset_plan = ml_module.generate_offset_plan
+                generate_offset_plans = getattr(ml_module, "generate_offset_plans", None)
+                ml_engine_module = ml_module
                 logger.info(f"Successfully loaded ML Engine from: {engine_path}")
             else:
                 logger.error(f"Error: 'generate_offset_plan' function missing in {target_filename}")
@@ -39,17 +46,124 @@ def load_ml_engine():
 
 load_ml_engine()
 
+# -------------------------------------------------------------------------
+# OFFSET PLAN CACHE
+# -------------------------------------------------------------------------
+# generate_offset_plan is a pure function of the mine name and the loaded
+# datasets/models, so results are memoized per (name, engine version). Only
+# successful plans are cached; "not found" errors are recomputed, so a mine that
+# appears in a reloaded dataset is picked up straight away.
+
+CACHE_MAX_ENTRIES = int(os.getenv("OFFSET_CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = float(os.getenv("OFFSET_CACHE_TTL_SECONDS", "3600"))
+
+class PlanCache:
+    """Thread-safe bounded LRU cache with a per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, count_miss=True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.evictions += 1
+            if count_miss:
+                self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+def current_engine_version():
+    """Reads the live dataset/model version stamp from the loaded ML engine."""
+    if ml_engine_module is None:
+        return None
+    return ml_engine_module.engine_state.version
+
 # -------------------------------------------------------------------------
 # PREDICTOR CLASS
 # -------------------------------------------------------------------------
 
 class OffsetPredictor:
+    def __init__(self):
+        self.cache = PlanCache()
+        self._cache_version = None
+        self._cache_version_lock = threading.Lock()
+
+    def warmup(self):
+        """Blocking engine initialization; run it off the event loop (see app startup)."""
+        if ml_engine_module is None:
+            logger.error("ML Engine module is not loaded; cannot warm up.")
+            return False
+        return ml_engine_module.initialize_engine()
+
+    def reload(self):
+        """Rebuilds the engine from the current files and swaps it in; the old state serves until then."""
+        if ml_engine_module is None:
+            return False
+        return ml_engine_module.initialize_engine()
+
+    def datasets_changed(self) -> bool:
+        return ml_engine_module is not None and ml_engine_module.datasets_changed()
+
+    def is_ready(self) -> bool:
+        return ml_engine_module is not None and ml_engine_module.is_ready()
+
+    def status(self):
+        if ml_engine_module is None:
+            return {"state": "failed", "stage": None, "progress": 0.0, "error": "ML Engine module failed to load."}
+        status = dict(ml_engine_module.engine_status)
+        status["version"] = ml_engine_module.engine_state.version
+        return status
+
     def predict(self, mine_name: str):
         # 1. Real Model
         if generate_offset_plan:
             try:
+                # Cached plans are shared between callers and must be treated as read-only
+                cache_key = self._cache_key(mine_name)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
                 logger.info(f"Running ML Prediction for: {mine_name}")
-                return generate_offset_plan(mine_name)
+                result = generate_offset_plan(mine_name)
+                if "error" not in result:
+                    self.cache.put(cache_key, result)
+                return result
             except Exception as e:
                 logger.error(f"ML Engine Runtime Error: {e}")
                 return self._run_simulation(mine_name)
@@ -59,6 +173,158 @@ class OffsetPredictor:
             logger.warning("ML Engine unavailable. Using simulation.")
             return self._run_simulation(mine_name)
 
+    def get_cached(self, mine_name: str):
+        """Cached plan for a mine, or None. Never computes, so it is safe to call on the event loop."""
+        if not generate_offset_plan:
+            return None
+        # A miss here is counted by the predict() call that follows
+        return self.cache.get(self._cache_key(mine_name), count_miss=False)
+
+    def predict_many(self, mine_names):
+        """
+        Plans for several mines: cached plans are reused, the rest are computed in one engine batch.
+        Unlike predict(), engine failures are not replaced with simulated plans: the affected
+        mines get {"error": ..., "engine_error": True} so callers never mix made-up figures in.
+        """
+        results = [None] * len(mine_names)
+        pending = {}
+        for i, name in enumerate(mine_names):
+            cache_key = self._cache_key(name)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(cache_key, []).append(i)
+
+        if pending:
+            # One engine call per distinct mine name, whatever its spelling/casing in the request
+            pending_names = [mine_names[positions[0]] for positions in pending.values()]
+            if generate_offset_plans:
+                try:
+                    logger.info(f"Running batch ML Prediction for {len(pending_names)} mines")
+                    plans = generate_offset_plans(pending_names)
+                    for cache_key, plan in zip(pending, plans):
+                        if "error" not in plan:
+                            self.cache.put(cache_key, plan)
+                except Exception as e:
+                    logger.error(f"ML Engine Runtime Error: {e}")
+                    plans = [{"error": f"ML Engine Runtime Error: {e}", "engine_error": True}] * len(pending_names)
+            else:
+                logger.warning("ML Engine unavailable; batch plans cannot be computed.")
+                plans = [{"error": "ML Engine unavailable.", "engine_error": True}] * len(pending_names)
+
+            for positions, plan in zip(pending.values(), plans):
+                for i in positions:
+                    results[i] = plan
+        return results
+
+    def predict_portfolio(self, mine_names):
+        """
+        Batch plans split into found / not found / failed (engine errors), plus
+        portfolio-wide totals over the found plans only.
+        """
+        # Repeated names (in any casing) count once towards the portfolio
+        unique = {}
+        for name in mine_names:
+            unique.setdefault((name or "").strip().lower(), name)
+        unique_names = list(unique.values())
+        plans, not_found, failed = [], [], []
+        for name, plan in zip(unique_names, self.predict_many(unique_names)):
+            if plan.get("engine_error"):
+                failed.append({"query": name, "error": plan["error"]})
+            elif "error" in plan:
+                not_found.append({"query": name, "error": plan["error"], "suggestions": plan.get("available_mines", [])})
+            else:
+                plans.append(plan)
+
+        portfolio = {
+            "mine_count": len(plans),
+            "annual_offset_target_tonnes": round(sum(p["kpis"]["annual_offset_target_tonnes"] for p in plans), 2),
+            "total_trees_required": sum(p["kpis"]["total_trees_required"] for p in plans),
+            "estimated_budget_inr": round(sum(p["kpis"]["estimated_budget_inr"] for p in plans), 2),
+            "land_required_ha": round(sum(p["kpis"]["land_required_ha"] for p in plans), 1),
+            "carbon_revenue_potential_inr": round(sum(p["carbon_credits"]["total_revenue_potential_inr"] for p in plans), 2),
+        }
+        return {"plans": plans, "portfolio": portfolio, "not_found": not_found, "failed": failed}
+
+    def optimize_plans(self, mine_names=None):
+        """
+        Minimum-cost species mix per mine under the registry's teak and land limits,
+        solved as one LP for the whole batch (all registry mines when no names are given).
+        """
+        result = ml_engine_module.generate_optimized_plans(mine_names)
+        not_found = [
+            {"query": item["query"], "error": item["error"], "suggestions": item.get("available_mines", [])}
+            for item in result["not_found"]
+        ]
+        return {"plans": result["plans"], "not_found": not_found}
+
+    def forecast(self, mine_name: str, horizon: int = 12):
+        """Monthly emission forecast for one mine, served from the parameters fitted at engine load."""
+        return ml_engine_module.generate_forecast(mine_name, horizon)
+
+    def sweep_scenarios(self, mine_name: str, request):
+        """
+        What-if sweep for one mine. request holds optional per-parameter ranges
+        ({"values": [...]} or {"min", "max", "steps"}) plus objective,
+        enforce_registry_limits and max_points. Not cached: every request is a new grid.
+        """
+        specs = {p: request[p] for p in ml_engine_module.SCENARIO_PARAMETERS if request.get(p) is not None}
+        return ml_engine_module.generate_offset_scenarios(
+            mine_name,
+            specs,
+            objective=request.get("objective", "total_cost"),
+            enforce_registry_limits=request.get("enforce_registry_limits", True),
+            max_points=request.get("max_points", 50),
+        )
+
+    def search_mines(self, query: str, limit: int = 10):
+        """Ranked mine/district/state autocomplete from the engine's in-memory search index."""
+        return ml_engine_module.engine_state.mine_search_index.search(query, limit=limit)
+
+    def score_trees(self, trees):
+        """Scores surveyed tree feature vectors (dicts with state/max_height/ndvi/age_years) in bulk."""
+        predictions, model_regions = ml_engine_module.score_tree_features(
+            [t["state"].strip().title() for t in trees],
+            [t["max_height"] for t in trees],
+            [t["ndvi"] for t in trees],
+            [t["age_years"] for t in trees],
+        )
+        return [
+            {"state": t["state"], "model_region": region, "co2e_stock_t_ha": round(float(stock), 4)}
+            for t, stock, region in zip(trees, predictions, model_regions)
+        ]
+
+    def sequestration_regions(self):
+        """Precomputed standard-tree prediction and per-species ASR (kg CO2e/tree/yr) per region."""
+        table = ml_engine_module.engine_state.sequestration_table
+        return {
+            region: {
+                "base_prediction_t_ha": round(float(row["Base_Prediction"]), 4),
+                **{f"asr_{species}_kg": round(float(row[f"ASR_{species}"]) * 1000, 4) for species in ml_engine_module.SPECIES_ASR_FACTOR},
+            }
+            for region, row in table.iterrows()
+        }
+
+    def training_report(self):
+        """Per-region rows, fit time and out-of-bag R^2 recorded when the loaded models were trained."""
+        state = ml_engine_module.engine_state
+        return {"model_artifact_key": state.model_artifact_key, "training": state.training_report}
+
+    def _cache_key(self, mine_name):
+        version = current_engine_version()
+        with self._cache_version_lock:
+            if version != self._cache_version:
+                # Datasets were reloaded or models retrained: drop every stale plan
+                self.cache.clear()
+                self._cache_version = version
+        return ((mine_name or "").strip().lower(), version)
+
+    def cache_stats(self):
+        stats = self.cache.stats()
+        stats["engine_version"] = current_engine_version()
+        return stats
+
     def _run_simulation(self, mine_name: str):
         """Fallback dummy data generator."""
         seed = len(mine_name) if mine_name else 5
@@ -0,0 +1,202 @@
+import os
+import time
+import tempfile
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from dataset_io import DATE_FORMAT, clean_names
+from hotspot_scoring import SCORE_COLUMNS, LEVELS, RunningStats, emission_scores, classify_scores
+
+# ---------------------------------------------------------
+# SINGLE-PASS REFRESH PIPELINE
+# ---------------------------------------------------------
+# Replaces the three-step refresh (feature 1/landing.py for overall/monthly
+# averages, feature 2/hotspot_analysis.py for scores and levels, then
+# data_uploader.py reading their CSVs back). The source CSV is scanned once in
+# chunks; each chunk feeds every output at the same time:
+#   - overall gas sums/counts        -> average_emissions
+#   - per-month-of-year sums/counts  -> monthly_emissions_summary
+#   - Emission_Score + running stats -> emission_analysis_results (levels)
+# Only the hotspot levels need the global thresholds, so the scored chunks are
+# spilled to a temporary CSV during the scan and classified in a second
+# streaming pass over that file (as hotspot_analysis.py --chunk-size does), so
+# at most one chunk is in memory. The outputs then go straight to MongoDB (same
+# collections/derived data as data_uploader) or to the usual CSVs as a staging
+# format. Names are cleaned with dataset_io's rules, like every other loader.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CSV_FILE = os.path.join(BASE_DIR, '..', 'feature 2', 'coal_dataset_10k_5years.csv')
+MONTHLY_CSV_FILE = os.path.join(BASE_DIR, '..', 'feature 1', 'monthly_emissions_summary.csv')
+AVERAGE_CSV_FILE = os.path.join(BASE_DIR, '..', 'feature 1', 'average_emissions.csv')
+HOTSPOT_CSV_FILE = os.path.join(BASE_DIR, '..', 'feature 2', 'emission_analysis_results.csv')
+
+DEFAULT_CHUNK_SIZE = 100_000
+GAS_COLUMNS = ['CO2_ppm', 'CH4_ppm', 'SO2_ppm', 'NOx_ppm', 'PM2_5', 'PM10']
+MONTHLY_COLUMNS = ['CO2_ppm', 'CH4_ppm', 'PM2_5', 'PM10']
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+@contextmanager
+def timed_stage(timings, name):
+    """Records the wall-clock of the enclosed block under timings[name]."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - start
+
+def scan_source(csv_path, scored_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    One chunked pass over the source CSV. Returns the accumulated sums; the scored
+    hotspot rows (not yet classified) are written to scored_path.
+    """
+    gas_sum, gas_count = np.zeros(len(GAS_COLUMNS)), 0
+    month_sum, month_count = np.zeros((12, len(MONTHLY_COLUMNS))), np.zeros(12)
+    stats = RunningStats()
+    rows = 0
+
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_size)):
+        chunk = clean_names(chunk)
+        rows += len(chunk)
+
+        # Averages: rows with every gas reading and a valid date (as landing.py)
+        dates = pd.to_datetime(chunk['Date'], format=DATE_FORMAT, errors='coerce')
+        valid = (chunk[GAS_COLUMNS].notna().all(axis=1) & dates.notna()).to_numpy()
+        gas_sum += chunk.loc[valid, GAS_COLUMNS].to_numpy(np.float64).sum(axis=0)
+        gas_count += int(valid.sum())
+        months = dates[valid].dt.month.to_numpy() - 1
+        month_count += np.bincount(months, minlength=12)
+        for j, col in enumerate(MONTHLY_COLUMNS):
+            month_sum[:, j] += np.bincount(months, weights=chunk.loc[valid, col].to_numpy(np.float64), minlength=12)
+
+        # Hotspots: rows with every score input (as hotspot_analysis.py)
+        scored = chunk.dropna(subset=SCORE_COLUMNS).copy()
+        scored['Emission_Score'] = emission_scores(scored)
+        stats.update(scored['Emission_Score'])
+        # Floats are written with full precision, so the second pass reads back the same values
+        scored.to_csv(scored_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+    return {
+        "rows": rows,
+        "gas_sum": gas_sum, "gas_count": gas_count,
+        "month_sum": month_sum, "month_count": month_count,
+        "stats": stats, "scored_path": scored_path,
+    }
+
+def build_aggregates(scan):
+    """(average_df, monthly_df) from the scan, rounded/ordered like the old CSVs."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        averages = scan["gas_sum"] / scan["gas_count"]
+        monthly = scan["month_sum"] / scan["month_count"][:, None]
+    average_df = pd.DataFrame([dict(zip(GAS_COLUMNS, averages))]).round(2)
+    monthly_df = pd.DataFrame(monthly, columns=MONTHLY_COLUMNS).round(2)
+    monthly_df.insert(0, 'Month', MONTH_NAMES)
+    return average_df, monthly_df
+
+def classified_chunks(scan, level_counts, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Second pass: streams the spilled scored rows back in chunks with their
+    Hotspot_Level under the final thresholds, tallying levels into level_counts.
+    """
+    if scan["stats"].count == 0:
+        return
+    low_thresh, high_thresh = scan["stats"].thresholds()
+    # round_trip: the default parser can be off by one ulp, which would change the values written out
+    for chunk in pd.read_csv(scan["scored_path"], chunksize=chunk_size, float_precision='round_trip'):
+        chunk['Hotspot_Level'] = classify_scores(chunk['Emission_Score'], low_thresh, high_thresh)
+        for level, count in chunk['Hotspot_Level'].value_counts().items():
+            level_counts[level] += int(count)
+        yield chunk
+
+def write_csv_outputs(average_df, monthly_df, hotspot_chunks, timings):
+    """Staging output: the same CSVs landing.py and hotspot_analysis.py produce."""
+    for name, df, path in (("write_average_csv", average_df, AVERAGE_CSV_FILE),
+                           ("write_monthly_csv", monthly_df, MONTHLY_CSV_FILE)):
+        with timed_stage(timings, name):
+            df.to_csv(path, index=False)
+        print(f"✅ Saved: {os.path.abspath(path)}")
+
+    tmp_path = f"{HOTSPOT_CSV_FILE}.tmp"
+    with timed_stage(timings, "classify_write_hotspot_csv"):
+        try:
+            written = False
+            for chunk in hotspot_chunks:
+                chunk.to_csv(tmp_path, index=False, mode='a' if written else 'w', header=not written)
+                written = True
+            if not written:
+                pd.DataFrame(columns=SCORE_COLUMNS + ['Emission_Score', 'Hotspot_Level']).to_csv(tmp_path, index=False)
+            # Readers never see a half-written results file
+            os.replace(tmp_path, HOTSPOT_CSV_FILE)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    print(f"✅ Saved: {os.path.abspath(HOTSPOT_CSV_FILE)}")
+
+def write_mongo_outputs(average_df, monthly_df, hotspot_chunks, stats, timings):
+    """
+    Writes the outputs straight to the collections data_uploader fills.
+    write_hotspots replaces the collection and rebuilds the clusters from one
+    frame, so here the classified chunks are gathered again; the documents it
+    inserts are of the same size anyway.
+    """
+    # Imported here: the CSV target does not need pymongo
+    from pymongo import MongoClient
+    import data_uploader
+
+    print(f"Connecting to MongoDB at {data_uploader.MONGO_URI}...")
+    client = MongoClient(data_uploader.MONGO_URI)
+    try:
+        db = client[data_uploader.DB_NAME]
+        with timed_stage(timings, "write_average_mongo"):
+            data_uploader.write_average(db, average_df)
+        with timed_stage(timings, "write_monthly_mongo"):
+            data_uploader.write_monthly(db, monthly_df)
+        with timed_stage(timings, "classify_hotspots"):
+            chunks = list(hotspot_chunks)
+            hotspot_df = (pd.concat(chunks, ignore_index=True) if chunks
+                          else pd.DataFrame(columns=SCORE_COLUMNS + ['Emission_Score', 'Hotspot_Level']))
+        with timed_stage(timings, "write_hotspots_mongo"):
+            data_uploader.write_hotspots(db, hotspot_df, stats)
+    finally:
+        client.close()
+
+def run_pipeline(csv_path=SOURCE_CSV_FILE, target="mongo", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Scans csv_path once and writes every derived output to target ('mongo' or 'csv'). Returns the stage timings."""
+    timings = {}
+    print(f"\n--- Refresh pipeline: {csv_path} -> {target} ---")
+    fd, scored_path = tempfile.mkstemp(prefix="refresh-scored-", suffix=".csv")
+    os.close(fd)
+    try:
+        with timed_stage(timings, "total"):
+            with timed_stage(timings, "scan"):
+                scan = scan_source(csv_path, scored_path, chunk_size)
+            with timed_stage(timings, "aggregate"):
+                average_df, monthly_df = build_aggregates(scan)
+
+            stats = scan["stats"]
+            print(f"   Rows scanned: {scan['rows']} (averaged: {scan['gas_count']}, scored: {stats.count})")
+            level_counts = dict.fromkeys(LEVELS, 0)
+            hotspot_chunks = classified_chunks(scan, level_counts, chunk_size)
+            if target == "csv":
+                write_csv_outputs(average_df, monthly_df, hotspot_chunks, timings)
+            else:
+                write_mongo_outputs(average_df, monthly_df, hotspot_chunks, stats, timings)
+            print(f"   Red: {level_counts['Red']}, Orange: {level_counts['Orange']}, Yellow: {level_counts['Yellow']}")
+    finally:
+        os.remove(scored_path)
+
+    print("\nStage timings:")
+    for name, seconds in timings.items():
+        print(f"   {name:<24}{seconds:>9.3f} s")
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-pass refresh of averages, monthly summary and hotspots")
+    parser.add_argument("--input", default=SOURCE_CSV_FILE, help="Source emissions CSV.")
+    parser.add_argument("--target", choices=["mongo", "csv"], default="mongo",
+                        help="Write to MongoDB directly, or to the staging CSVs data_uploader.py reads.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows read per chunk.")
+    args = parser.parse_args()
+    run_pipeline(args.input, args.target, args.chunk_size)
@@ -0,0 +1,130 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+
+# ---------------------------------------------------------
+# PARALLEL REGIONAL TRAINING
+# ---------------------------------------------------------
+# One forest per region. Regions are independent, so they are fitted in
+# parallel worker processes, and each forest gets a fixed share of the cores
+# (threads_per_model). Nesting n_jobs=-1 forests inside a parallel loop, or
+# fitting one n_jobs=-1 forest after another on small regions, would instead
+# oversubscribe or underuse the machine.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Overrides for the automatic worker/thread split (0 = automatic)
+TRAIN_WORKERS = int(os.getenv("ML_TRAIN_WORKERS", "0"))
+TRAIN_THREADS_PER_MODEL = int(os.getenv("ML_TRAIN_THREADS_PER_MODEL", "0"))
+
+def plan_parallelism(n_regions, workers=None, threads_per_model=None, cpu_count=None):
+    """
+    (worker processes, threads per forest) for n_regions fits on cpu_count cores.
+    Defaults: one worker per region up to the core count, and the cores left over
+    shared out as threads inside each forest.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    workers = workers or TRAIN_WORKERS or max(1, min(n_regions, cpu_count))
+    threads_per_model = threads_per_model or TRAIN_THREADS_PER_MODEL or max(1, cpu_count // workers)
+    return workers, threads_per_model
+
+def fit_region(region, X, y, params, threads_per_model):
+    """Fits one regional forest; returns (region, model, report)."""
+    start = time.perf_counter()
+    model = RandomForestRegressor(**{**params, "n_jobs": threads_per_model})
+    model.fit(X, y)
+    report = {
+        "rows": int(len(y)),
+        "fit_seconds": round(time.perf_counter() - start, 4),
+        "oob_score": round(float(model.oob_score_), 4) if getattr(model, "oob_score", False) else None,
+    }
+    return region, model, report
+
+def fit_regional_models(ml_df, features, target, params, region_column='State', workers=None, threads_per_model=None):
+    """
+    Fits one model per region of ml_df in parallel.
+    Returns (models, report): models maps region -> fitted forest; report holds the
+    per-region rows/fit time/OOB score plus the wall-clock of the whole run.
+    """
+    needed = [region_column] + features + [target]
+    if not all(col in ml_df.columns for col in needed):
+        return {}, {"regions": {}, "workers": 0, "threads_per_model": 0, "wall_seconds": 0.0}
+
+    groups = ml_df.groupby(region_column, sort=False).indices
+    workers, threads_per_model = plan_parallelism(len(groups), workers, threads_per_model)
+
+    start = time.perf_counter()
+    tasks = (
+        delayed(fit_region)(region, ml_df[features].iloc[rows], ml_df[target].iloc[rows], params, threads_per_model)
+        for region, rows in groups.items() if len(rows)
+    )
+    # A single worker runs in-process (no pickling of data or models)
+    results = Parallel(n_jobs=workers, backend='loky')(tasks)
+
+    models = {region: model for region, model, _ in results}
+    report = {
+        "regions": {region: region_report for region, _, region_report in results},
+        "workers": workers,
+        "threads_per_model": threads_per_model,
+        "wall_seconds": round(time.perf_counter() - start, 4),
+    }
+    return models, report
+
+# ---------------------------------------------------------
+# TRAINING BENCHMARK
+# ---------------------------------------------------------
+
+def synthetic_training_data(base_df, n_regions, rows_per_region, region_column='State', seed=0):
+    """
+    Benchmark data shaped like the training CSV: rows resampled from the real
+    library with small multiplicative noise, relabelled into n_regions regions.
+    """
+    rng = np.random.default_rng(seed)
+    numeric = base_df.select_dtypes(include='number')
+    picks = rng.integers(0, len(base_df), size=n_regions * rows_per_region)
+    frame = numeric.iloc[picks].reset_index(drop=True)
+    frame = frame * rng.normal(1.0, 0.05, size=frame.shape)
+    frame[region_column] = np.repeat([f"Region_{i:03d}" for i in range(n_regions)], rows_per_region)
+    return frame
+
+def run_benchmark(base_df, features, target, params, region_counts, row_counts, repeats=1):
+    """Wall-clock of sequential (one n_jobs=-1 forest at a time) vs parallel training over a grid of sizes."""
+    results = []
+    for n_regions in region_counts:
+        for rows in row_counts:
+            data = synthetic_training_data(base_df, n_regions, rows)
+            timings = {}
+            for label, workers, threads in (("sequential", 1, -1), ("parallel", None, None)):
+                best = float("inf")
+                for _ in range(repeats):
+                    _, report = fit_regional_models(data, features, target, params,
+                                                    workers=workers, threads_per_model=threads)
+                    best = min(best, report["wall_seconds"])
+                timings[label] = (best, report["workers"], report["threads_per_model"])
+            results.append((n_regions, rows, timings))
+    return results
+
+if __name__ == "__main__":
+    # Imported here: ml_engine pulls in the whole engine, the training helpers above do not need it
+    import ml_engine
+
+    parser = argparse.ArgumentParser(description="Regional model training benchmark")
+    parser.add_argument("--regions", default="4,16,64", help="Comma-separated region counts.")
+    parser.add_argument("--rows", default="50,500,2000", help="Comma-separated rows per region.")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per configuration (best time is kept).")
+    args = parser.parse_args()
+
+    base = pd.read_csv(ml_engine.ML_TRAINING_FILE)
+    print(f"CPU cores: {os.cpu_count()}")
+    print(f"{'Regions':>8}{'Rows/region':>13}{'Sequential s':>14}{'Parallel s':>12}{'Workers x threads':>19}{'Speedup':>9}")
+    for n_regions, rows, timings in run_benchmark(
+        base, ml_engine.MODEL_FEATURES, ml_engine.MODEL_TARGET, ml_engine.MODEL_PARAMS,
+        [int(v) for v in args.regions.split(',')], [int(v) for v in args.rows.split(',')], args.repeats,
+    ):
+        seq, par = timings["sequential"], timings["parallel"]
+        print(f"{n_regions:>8}{rows:>13}{seq[0]:>14.3f}{par[0]:>12.3f}{f'{par[1]} x {par[2]}':>19}{seq[0] / max(par[0], 1e-9):>8.2f}x")
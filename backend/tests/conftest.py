@@ -0,0 +1,15 @@
+import os
+import sys
+
+# The app reads its settings from the environment at import time; give it a
+# harmless configuration (the tests never start the app's Mongo/ML startup hooks).
+os.environ.setdefault("PROJECT_NAME", "carbon-tracker-tests")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:1/carbon_tracker_test?serverSelectionTimeoutMS=200")
+os.environ.setdefault("ALLOWED_HOSTS", "http://localhost")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_SERVICE_DIR = os.path.join(BACKEND_DIR, "ml_service")
+for path in (BACKEND_DIR, ML_SERVICE_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
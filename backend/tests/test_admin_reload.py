@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.api.endpoints import emissions
+
+ADMIN_TOKEN = "admin-token-" + "y" * 32
+
+class ReloadPredictor:
+    def __init__(self, state="ready"):
+        self.state = state
+        self.reloads = 0
+
+    def status(self):
+        return {"state": self.state}
+
+    def reload(self):
+        self.reloads += 1
+        return True
+
+class RunningTask:
+    def done(self):
+        return False
+
+@pytest.fixture
+def reload_client(monkeypatch):
+    fake = ReloadPredictor()
+    monkeypatch.setattr(emissions, "predictor", fake)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", ADMIN_TOKEN)
+    yield TestClient(app), fake
+    if hasattr(app.state, "ml_reload"):
+        del app.state.ml_reload
+
+def post_reload(client, token):
+    return client.post("/api/v1/emissions/admin/reload", headers={"X-Admin-Token": token} if token else {})
+
+def test_reload_requires_the_admin_token(reload_client):
+    client, fake = reload_client
+    assert post_reload(client, None).status_code == 403
+    assert post_reload(client, settings.SECRET_KEY).status_code == 403
+    assert fake.reloads == 0
+
+def test_reload_is_disabled_without_an_admin_token(reload_client, monkeypatch):
+    client, _ = reload_client
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert post_reload(client, ADMIN_TOKEN).status_code == 403
+
+def test_reload_starts_and_keeps_the_task(reload_client):
+    client, _ = reload_client
+    response = post_reload(client, ADMIN_TOKEN)
+    assert response.status_code == 202, response.text
+    assert isinstance(app.state.ml_reload, asyncio.Task)
+
+def test_reload_conflicts_while_one_is_running(reload_client):
+    client, fake = reload_client
+    app.state.ml_reload = RunningTask()
+    assert post_reload(client, ADMIN_TOKEN).status_code == 409
+    del app.state.ml_reload
+    fake.state = "reloading"
+    assert post_reload(client, ADMIN_TOKEN).status_code == 409
+
+def test_reload_outcome_is_logged(monkeypatch, capsys):
+    monkeypatch.setattr(emissions, "predictor", ReloadPredictor())
+
+    async def fail():
+        raise RuntimeError("bad csv")
+
+    async def run():
+        for coro in (asyncio.sleep(0, result=True), fail()):
+            task = asyncio.create_task(coro)
+            task.add_done_callback(emissions.log_reload_outcome)
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)
+
+    asyncio.run(run())
+    out = capsys.readouterr().out
+    assert "reload finished" in out
+    assert "reload failed: RuntimeError('bad csv')" in out
@@ -0,0 +1,123 @@
+import asyncio
+import math
+
+import pytest
+
+from app.core.anomaly import EWMAAnomalyDetector
+from app.api.crud import emission_data as crud
+from app.schemas import EmissionRecordCreate
+
+MISSING = object()
+
+def evaluate(expr, doc):
+    """Just enough of the aggregation expression language for the detector's update pipeline."""
+    if isinstance(expr, str) and expr.startswith("$"):
+        value = doc
+        for part in expr[1:].split("."):
+            value = value.get(part, MISSING) if isinstance(value, dict) else MISSING
+        return value
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    if op == "$literal":
+        return args
+    if op == "$cond":
+        return evaluate(args[1] if evaluate(args[0], doc) else args[2], doc)
+    values = [evaluate(arg, doc) for arg in (args if isinstance(args, list) else [args])]
+    if op == "$add":
+        return sum(values)
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$multiply":
+        return math.prod(values)
+    if op == "$ifNull":
+        return values[1] if values[0] in (None, MISSING) else values[0]
+    if op == "$type":
+        return "missing" if values[0] is MISSING else "double"
+    if op == "$ne":
+        return values[0] != values[1]
+    raise NotImplementedError(op)
+
+def apply_pipeline(doc, pipeline):
+    (stage,) = pipeline
+    updates = {path: evaluate(expr, doc) for path, expr in stage["$set"].items()}
+    new = {"count": doc.get("count"), "mean": dict(doc.get("mean", {})), "var": dict(doc.get("var", {}))}
+    for path, value in updates.items():
+        if "." in path:
+            outer, inner = path.split(".")
+            new[outer][inner] = value
+        else:
+            new[path] = value
+    return new
+
+def reference_ewma(xs, alpha):
+    mean, var = xs[0], 0.0
+    for x in xs[1:]:
+        diff = x - mean
+        mean += alpha * diff
+        var = (1 - alpha) * (var + alpha * diff * diff)
+    return mean, var
+
+def test_update_pipeline_matches_the_ewma_recurrence():
+    detector = EWMAAnomalyDetector(alpha=0.2, threshold=3.0, warmup=2, fields=("co2_tons", "ch4_tons"))
+    stream = [{"co2_tons": x, "ch4_tons": x / 10 if i > 1 else None} for i, x in enumerate([10.0, 12.0, 9.0, 11.5, 30.0])]
+    doc = {}
+    for values in stream:
+        doc = apply_pipeline(doc, detector.update_pipeline(values))
+    assert doc["count"] == 5
+    mean, var = reference_ewma([v["co2_tons"] for v in stream], 0.2)
+    assert doc["mean"]["co2_tons"] == pytest.approx(mean)
+    assert doc["var"]["co2_tons"] == pytest.approx(var)
+    mean, var = reference_ewma([v["ch4_tons"] for v in stream[2:]], 0.2)
+    assert doc["mean"]["ch4_tons"] == pytest.approx(mean)
+    assert doc["var"]["ch4_tons"] == pytest.approx(var)
+
+def test_score_uses_the_state_before_the_record():
+    detector = EWMAAnomalyDetector(alpha=0.1, threshold=3.0, warmup=2, fields=("co2_tons",))
+    assert detector.score(None, {"co2_tons": 1e6}) == (0.0, False)
+    state = {"count": 5, "mean": {"co2_tons": 10.0}, "var": {"co2_tons": 4.0}}
+    assert detector.score(state, {"co2_tons": 12.0}) == (1.0, False)
+    assert detector.score(state, {"co2_tons": 18.0}) == (4.0, True)
+    assert detector.score({**state, "count": 1}, {"co2_tons": 18.0}) == (4.0, False)
+    assert detector.score(state, {"co2_tons": float("nan")}) == (0.0, False)
+
+class Collection:
+    def __init__(self, log, name, fail_insert=False):
+        self.log, self.name, self.fail_insert = log, name, fail_insert
+
+    async def find_one(self, query):
+        self.log.append(("find_one", self.name))
+        return {"_id": "x", "count": 0} if self.name == crud.CORE_COLLECTION_NAME else None
+
+    async def insert_one(self, doc):
+        self.log.append(("insert_one", self.name))
+        if self.fail_insert:
+            raise RuntimeError("write failed")
+        doc["_id"] = "x"
+        return type("Result", (), {"inserted_id": "x"})()
+
+    async def update_one(self, query, update, upsert=False):
+        self.log.append(("update_one", self.name))
+
+class DB:
+    def __init__(self, fail_insert=False):
+        self.log = []
+        self.fail_insert = fail_insert
+
+    def __getitem__(self, name):
+        return Collection(self.log, name, self.fail_insert)
+
+RECORD = EmissionRecordCreate(mine_id="M1", mine_name="Gevra", co2_tons=1.0, ch4_tons=2.0, total_carbon_eq=3.0)
+
+def test_state_advances_only_after_the_insert():
+    db = DB()
+    asyncio.run(crud.create_emission_record(db, RECORD))
+    assert db.log[:3] == [("find_one", crud.ANOMALY_STATE_COLLECTION_NAME),
+                          ("insert_one", crud.CORE_COLLECTION_NAME),
+                          ("update_one", crud.ANOMALY_STATE_COLLECTION_NAME)]
+
+def test_failed_insert_leaves_the_state_alone():
+    db = DB(fail_insert=True)
+    with pytest.raises(RuntimeError):
+        asyncio.run(crud.create_emission_record(db, RECORD))
+    assert ("update_one", crud.ANOMALY_STATE_COLLECTION_NAME) not in db.log
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.api.endpoints import emissions
+
+# Engine payloads as the ML engine really returns them: NumPy scalars, arrays and NaN
+NUMPY_PLAN = {
+    "mine_metadata": {"mine_name": "Gevra", "district": "Korba", "state": "Chhattisgarh", "status": "success"},
+    "kpis": {"annual_offset_target_tonnes": np.float64(5638.0), "total_trees_required": np.int64(3),
+             "land_required_ha": np.float64(np.nan)},
+    "series": np.arange(3),
+}
+
+class NumpyPredictor:
+    def is_ready(self):
+        return True
+
+    def status(self):
+        return {"state": "ready"}
+
+    def get_cached(self, name):
+        return None
+
+    def predict(self, name):
+        if name == "missing":
+            return {"query": name, "error": "not found", "suggestions": [{"name": "Gevra", "score": np.float32(0.5)}]}
+        return NUMPY_PLAN
+
+    def predict_portfolio(self, names):
+        return {"plans": [NUMPY_PLAN for _ in names], "totals": {"budget": np.float64(1.5)}}
+
+    def optimize_plans(self, names=None):
+        return {"plans": [NUMPY_PLAN], "count": np.int64(1)}
+
+    def sweep_scenarios(self, name, request):
+        return {"mine": name, "frontier": np.arange(4), "evaluated": np.int64(4)}
+
+    def forecast(self, name, horizon=12):
+        return {"mine": name, "forecast": [{"emission_index": np.float64(1.25)}] * horizon}
+
+    def search_mines(self, query, limit=10):
+        return [{"name": "Gevra", "score": np.float64(1.0)}]
+
+    def sequestration_regions(self):
+        return {"Odisha": {"asr_teak": np.float32(0.02)}}
+
+    def training_report(self):
+        return {"workers": np.int64(1)}
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def skip(self, n):
+        return self
+
+    def limit(self, n):
+        return self
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, *args, **kwargs):
+        return FakeCursor(self.docs)
+
+    def aggregate(self, pipeline):
+        return FakeCursor(self.docs)
+
+    async def count_documents(self, query):
+        return len(self.docs)
+
+class FakeDB:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __getattr__(self, name):
+        return FakeCollection(self.docs)
+
+    def __getitem__(self, name):
+        return FakeCollection(self.docs)
+
+HOTSPOT_DOCS = [{"Mine_Name": "Gevra", "Emission_Score": np.float64(207.1), "count": np.int64(2),
+                 "lat_sum": np.float64(44.6), "lng_sum": np.float64(165.2), "score_sum": np.float64(400.0),
+                 "_id": "5/93/55", "levels": {"Red": np.int64(2)}}]
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(emissions, "predictor", NumpyPredictor())
+
+    async def fake_db():
+        yield FakeDB(HOTSPOT_DOCS)
+
+    app.dependency_overrides[get_db] = fake_db
+    # No context manager: the Mongo/ML startup hooks are not run
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("method,path,body", [
+    ("get", "/api/v1/emissions/mine-offsets?name=Gevra", None),
+    ("post", "/api/v1/emissions/mine-offsets/batch", {"mine_names": ["Gevra", "Dipka"]}),
+    ("post", "/api/v1/emissions/mine-offsets/optimize", {"mine_names": ["Gevra"]}),
+    ("post", "/api/v1/emissions/mine-offsets/Gevra/scenarios", {}),
+    ("get", "/api/v1/emissions/forecast/Gevra?horizon=2", None),
+    ("get", "/api/v1/emissions/mines/search?q=gev", None),
+    ("get", "/api/v1/emissions/sequestration/regions", None),
+    ("get", "/api/v1/emissions/sequestration/training", None),
+    ("get", "/api/v1/hotspots/top", None),
+    ("get", "/api/v1/hotspots", None),
+    ("get", "/api/v1/hotspots/by-state", None),
+    ("get", "/api/v1/hotspots/geo", None),
+    ("get", "/api/v1/hotspots/geo?zoom=5", None),
+    ("get", "/api/v1/hotspots/near?lat=22.3&lng=82.6", None),
+    ("post", "/api/v1/hotspots/within", {"polygon": {"coordinates": [[[82, 22], [83, 22], [83, 23]]]}}),
+])
+def test_numpy_payloads_serialize(client, method, path, body):
+    response = getattr(client, method)(path, json=body) if body is not None else getattr(client, method)(path)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("application/json")
+    response.json()
+
+def test_plan_values_are_encoded(client):
+    body = client.get("/api/v1/emissions/mine-offsets?name=Gevra").json()
+    assert body["kpis"]["total_trees_required"] == 3
+    assert body["kpis"]["land_required_ha"] is None # NaN -> null
+    assert body["series"] == [0, 1, 2]
+
+def test_not_found_keeps_detail_shape(client):
+    response = client.get("/api/v1/emissions/mine-offsets?name=missing")
+    assert response.status_code == 404
+    assert response.json()["detail"]["suggestions"][0]["score"] == 0.5
+
+def test_rollup_and_cluster_views(client):
+    clusters = client.get("/api/v1/hotspots/geo?zoom=5").json()
+    assert clusters["data"][0]["centroid"] == {"lat": 22.3, "lng": 82.6}
+    assert client.get("/api/v1/hotspots/mines").status_code == 200
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+import dataset_io
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "emissions.csv"
+    pd.DataFrame({"Date": ["2022-01-01", "2022-02-01"], "Mine_Name": [" gevra", "Dipka"],
+                  "CO2_ppm": [410.5, 420.25]}).to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    calls = []
+    original = dataset_io.source_hash
+
+    def counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(dataset_io, "source_hash", counting)
+    return calls
+
+def test_unchanged_file_is_not_hashed_again(csv_path, hash_calls):
+    first = dataset_io.load_emissions(csv_path)
+    assert len(hash_calls) == 1
+    second = dataset_io.load_emissions(csv_path)
+    assert len(hash_calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert second['Mine_Name'].tolist() == ['Gevra', 'Dipka']
+
+def test_touched_file_is_hashed_once_then_recognized(csv_path, hash_calls):
+    dataset_io.load_emissions(csv_path)
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    dataset_io.load_emissions(csv_path)
+    dataset_io.load_emissions(csv_path)
+    assert len(hash_calls) == 2
+
+def test_changed_file_gets_a_new_entry(csv_path, hash_calls):
+    dataset_io.load_emissions(csv_path)
+    pd.DataFrame({"Date": ["2022-03-01"], "Mine_Name": ["Kusmunda"], "CO2_ppm": [399.0]}).to_csv(csv_path, index=False)
+    df = dataset_io.load_emissions(csv_path)
+    assert df['Mine_Name'].tolist() == ['Kusmunda']
+    assert len(hash_calls) == 2
+    entries = os.listdir(os.path.join(os.path.dirname(csv_path), dataset_io.CACHE_DIRNAME))
+    assert entries == [os.path.basename(dataset_io.cache_path(csv_path, dataset_io.source_fingerprint(csv_path)[0]))]
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import (
+    SeasonalForecaster, fit_seasonal, seasonal_basis, SEASONAL_MIN_OBSERVATIONS,
+)
+
+def seasonal_series(months, noise=0.0, seed=3):
+    t = np.arange(months)
+    signal = 10 + 0.05 * t + 2 * np.cos(2 * np.pi * t / 12) - 1.5 * np.sin(2 * np.pi * t / 12) \
+        + 0.5 * np.sin(4 * np.pi * t / 12)
+    return signal + np.random.default_rng(seed).normal(0, noise, months)
+
+def frame(series_by_mine):
+    rows = []
+    for mine, values in series_by_mine.items():
+        dates = pd.date_range("2020-01-01", periods=len(values), freq="MS")
+        rows += [{"Mine_Name": mine, "Date": d, "Emission_Index": v} for d, v in zip(dates, values)]
+    return pd.DataFrame(rows)
+
+# ---------------------------------------------------------
+# fit_seasonal
+# ---------------------------------------------------------
+
+def test_recovers_a_known_seasonal_signal():
+    values = seasonal_series(48, noise=0.1)[:, None]
+    coefficients, sigma, n_obs, last, harmonics = fit_seasonal(values)
+    np.testing.assert_allclose(coefficients[0], [10, 0.05, 2, -1.5, 0, 0.5], atol=0.1)
+    assert abs(sigma[0] - 0.1) < 0.05
+    assert (n_obs[0], last[0], harmonics[0]) == (48, 47, 2)
+
+def test_missing_months_are_weighted_out():
+    values = seasonal_series(36)
+    values[[4, 5, 17, 30]] = np.nan
+    coefficients, sigma, n_obs, _, _ = fit_seasonal(values[:, None])
+    np.testing.assert_allclose(coefficients[0], [10, 0.05, 2, -1.5, 0, 0.5], atol=1e-4)
+    assert n_obs[0] == 32
+
+def test_short_series_fit_the_trend_only():
+    values = np.full((SEASONAL_MIN_OBSERVATIONS, 2), np.nan)
+    values[:, 0] = seasonal_series(SEASONAL_MIN_OBSERVATIONS)
+    values[-3:, 1] = [4.0, 5.0, 6.5]
+    coefficients, sigma, n_obs, last, harmonics = fit_seasonal(values)
+    assert harmonics.tolist() == [2, 0]
+    assert np.all(coefficients[1, 2:] == 0)
+    assert 0 < sigma[1] < 1 # three points, two parameters: the spread is estimated, not interpolated away
+
+def test_no_residual_degrees_of_freedom_means_no_sigma():
+    values = np.full((12, 1), np.nan)
+    values[[3, 7], 0] = [1.0, 2.0]
+    _, sigma, _, _, _ = fit_seasonal(values)
+    assert np.isnan(sigma[0])
+
+# ---------------------------------------------------------
+# SeasonalForecaster
+# ---------------------------------------------------------
+
+def test_forecast_continues_the_seasonal_signal():
+    forecaster = SeasonalForecaster.from_frame(frame({"Gevra": seasonal_series(48, noise=0.05)}))
+    result = forecaster.forecast("gevra", 12)
+    assert result["model"]["type"] == "trend_plus_harmonics"
+    expected = seasonal_series(60)[48:]
+    predicted = np.array([month["emission_index"] for month in result["forecast"]])
+    np.testing.assert_allclose(predicted, expected, atol=0.2)
+    assert result["forecast"][0]["month_year"] == "2024-01"
+    assert all(m["lower"] < m["emission_index"] < m["upper"] for m in result["forecast"])
+
+def test_short_history_gets_a_trend_forecast_with_a_real_interval():
+    forecaster = SeasonalForecaster.from_frame(frame({"Dipka": [4.0, 5.0, 6.5], "Kusmunda": [3.0, 3.2]}))
+    result = forecaster.forecast("dipka", 2)
+    assert result["model"]["type"] == "linear_trend"
+    assert result["model"]["harmonics"] == 0
+    assert all(m["upper"] - m["lower"] > 0.5 for m in result["forecast"])
+    assert forecaster.forecast("kusmunda", 2) is None # fewer than MIN_OBSERVATIONS months
+
+def test_basis_evaluates_a_fitted_trend_only_model():
+    coefficients, *_ = fit_seasonal(np.array([[1.0], [2.0], [3.0]]))
+    np.testing.assert_allclose(seasonal_basis([3, 4]) @ coefficients[0], [4.0, 5.0], atol=1e-4)
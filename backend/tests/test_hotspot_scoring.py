@@ -0,0 +1,109 @@
+import importlib.util
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hotspot_scoring import (
+    SCORE_COLUMNS, RunningStats, relabel_ranges, classify_scores, hotspot_thresholds, emission_scores,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_hotspot_analysis():
+    path = os.path.join(BACKEND_DIR, 'feature 2', 'hotspot_analysis.py')
+    spec = importlib.util.spec_from_file_location('hotspot_analysis', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# ---------------------------------------------------------
+# RunningStats
+# ---------------------------------------------------------
+
+def test_chunked_updates_match_pandas():
+    values = np.random.default_rng(5).normal(200, 15, 1003)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean())
+    assert stats.std == pytest.approx(pd.Series(values).std())
+
+def test_merge_equals_a_single_pass():
+    values = np.random.default_rng(6).uniform(150, 250, 500)
+    left, right = RunningStats().update(values[:120]), RunningStats().update(values[120:])
+    merged = left.merge(right)
+    whole = RunningStats().update(values)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.m2 == pytest.approx(whole.m2)
+
+def test_merge_with_empty_stats():
+    stats = RunningStats().update([1.0, 2.0, 3.0])
+    assert RunningStats().merge(stats).to_document() == stats.to_document()
+    assert stats.merge(RunningStats()).to_document() == {"count": 3, "mean": 2.0, "m2": 2.0}
+
+def test_document_round_trip_and_small_counts():
+    stats = RunningStats().update([4.0, 8.0])
+    assert RunningStats.from_document(stats.to_document()).std == stats.std
+    assert math.isnan(RunningStats().update([1.0]).std)
+
+# ---------------------------------------------------------
+# relabel_ranges
+# ---------------------------------------------------------
+
+def relabel_by_ranges(scores, old, new):
+    levels = classify_scores(scores, *old).astype(object)
+    for level, lo, hi in relabel_ranges(old, new):
+        levels[(scores > lo) & (scores <= hi)] = level
+    return levels
+
+@pytest.mark.parametrize("old,new", [
+    ((190.0, 200.0), (192.0, 205.0)),   # both thresholds move up
+    ((190.0, 200.0), (185.0, 198.0)),   # both move down
+    ((190.0, 200.0), (188.0, 203.0)),   # bands widen
+    ((190.0, 200.0), (202.0, 210.0)),   # new low above old high
+    ((190.0, 200.0), (190.0, 200.0)),   # unchanged
+])
+def test_relabel_ranges_reproduce_a_full_reclassification(old, new):
+    scores = np.concatenate([np.linspace(170, 220, 2001), [190.0, 200.0, 202.0, 205.0, 185.0]])
+    assert relabel_by_ranges(scores, old, new).tolist() == classify_scores(scores, *new).tolist()
+
+def test_unchanged_thresholds_relabel_nothing():
+    assert relabel_ranges((190.0, 200.0), (190.0, 200.0)) == []
+
+def test_ranges_only_cover_the_moved_bands():
+    assert sorted(relabel_ranges((190.0, 200.0), (192.0, 205.0))) == [
+        ('Orange', 200.0, 205.0), ('Yellow', 190.0, 192.0),
+    ]
+
+def test_thresholds_are_symmetric_about_the_mean():
+    assert hotspot_thresholds(200.0, 10.0) == (195.0, 205.0)
+
+# ---------------------------------------------------------
+# Chunked hotspot analysis
+# ---------------------------------------------------------
+
+def test_chunked_analysis_cleans_headers_and_names(tmp_path):
+    rng = np.random.default_rng(9)
+    n = 60
+    raw = pd.DataFrame({col: rng.uniform(10, 80, n) for col in SCORE_COLUMNS})
+    raw.loc[[4, 31], SCORE_COLUMNS[0]] = np.nan
+    raw.insert(0, 'Mine_Name', [' gevra', 'Gevra '] * (n // 2))
+    source = tmp_path / 'source.csv'
+    raw.rename(columns=lambda col: f' {col} ').to_csv(source, index=False)
+
+    output = tmp_path / 'results.csv'
+    load_hotspot_analysis()._analyze_chunked(str(source), str(output), chunk_size=7)
+
+    result = pd.read_csv(output)
+    expected = raw.dropna(subset=SCORE_COLUMNS)
+    scores = emission_scores(expected)
+    assert list(result.columns) == ['Mine_Name'] + SCORE_COLUMNS + ['Emission_Score', 'Hotspot_Level']
+    assert set(result['Mine_Name']) == {'Gevra'}
+    np.testing.assert_allclose(result['Emission_Score'], scores)
+    levels = classify_scores(scores, *hotspot_thresholds(scores.mean(), scores.std()))
+    assert result['Hotspot_Level'].tolist() == list(levels)
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from ml_service.hotspot_clusters import mercator_xy
+from ml_service.hotspot_tiles import (
+    HEADER, TILE_EXTENT, LEVEL_CODES, UNKNOWN_LEVEL, tile_bounds, encode_tile, decode_tile,
+)
+
+def test_decode_inverts_encode():
+    zoom, x, y = 5, 22, 13
+    south, north, west, east = tile_bounds(zoom, x, y)
+    rng = np.random.default_rng(11)
+    lat = rng.uniform(south, north, 40)
+    lng = rng.uniform(west, east, 40)
+    score = rng.uniform(150, 250, 40)
+    levels = rng.choice(['Red', 'Orange', 'Yellow', None], 40).tolist()
+
+    data = encode_tile(zoom, x, y, lat, lng, score, levels)
+    header, px, py, decoded_score, codes = decode_tile(data)
+
+    assert header == {"version": 1, "zoom": zoom, "x": x, "y": y, "count": 40}
+    assert len(data) == HEADER.size + 9 * 40
+    np.testing.assert_allclose(decoded_score, score.astype(np.float32))
+    assert codes.tolist() == [LEVEL_CODES.get(level, UNKNOWN_LEVEL) for level in levels]
+    # Pixel positions are the points' Mercator offsets inside the tile
+    mx, my = mercator_xy(lat, lng)
+    assert np.all(np.abs(px - (mx * 2 ** zoom - x) * TILE_EXTENT) < 1)
+    assert np.all(np.abs(py - (my * 2 ** zoom - y) * TILE_EXTENT) < 1)
+
+def test_empty_tile_round_trips():
+    header, px, py, score, codes = decode_tile(encode_tile(0, 0, 0, [], [], [], []))
+    assert header["count"] == 0
+    assert len(px) == len(py) == len(score) == len(codes) == 0
+
+def test_tile_bounds_cover_the_world_at_zoom_zero():
+    south, north, west, east = tile_bounds(0, 0, 0)
+    assert (west, east) == (-180.0, 180.0)
+    assert north == pytest.approx(85.0511, abs=1e-4) and south == pytest.approx(-85.0511, abs=1e-4)
+
+def test_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode_tile(b"JUNK" + bytes(HEADER.size))
+
+# ---------------------------------------------------------
+# Tile endpoint
+# ---------------------------------------------------------
+
+OPERATORS = {"$gte": lambda a, b: a >= b, "$gt": lambda a, b: a > b,
+             "$lte": lambda a, b: a <= b, "$lt": lambda a, b: a < b}
+
+def matches(doc, query):
+    return all(OPERATORS[op](doc[field], bound) for field, cond in query.items() for op, bound in cond.items())
+
+class TileCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+class TileDB:
+    """Tile cache plus a hotspot collection that evaluates the endpoint's range query."""
+    def __init__(self, points):
+        self.points = points
+        self.queries = []
+        self.stored = {}
+
+    def __getitem__(self, name):
+        return self
+
+    @property
+    def emission_hotspots(self):
+        return self
+
+    async def find_one(self, query):
+        return self.stored.get(query["_id"])
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.stored[query["_id"]] = doc
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        return TileCursor([doc for doc in self.points if matches(doc, query)])
+
+@pytest.fixture
+def tile_client():
+    def make(points):
+        db = TileDB(points)
+
+        async def fake_db():
+            yield db
+
+        app.dependency_overrides[get_db] = fake_db
+        return TestClient(app), db
+
+    yield make
+    app.dependency_overrides.clear()
+
+def point(lat, lng):
+    return {"Latitude": lat, "Longitude": lng, "Emission_Score": 207.1, "Hotspot_Level": "Red"}
+
+def tile_counts(client, zoom, tiles):
+    counts = {}
+    for x, y in tiles:
+        response = client.get(f"/api/v1/hotspots/tiles/{zoom}/{x}/{y}.bin")
+        assert response.status_code == 200, response.text
+        counts[(x, y)] = int(response.headers["X-Hotspot-Count"])
+        assert decode_tile(response.content)[0]["count"] == counts[(x, y)]
+    return counts
+
+def test_point_on_a_tile_corner_lands_in_exactly_one_tile(tile_client):
+    # North-west corner of tile 5/23/13 is shared with 22/12, 23/12 and 22/13
+    south, north, west, east = tile_bounds(5, 23, 13)
+    client, _ = tile_client([point(north, west)])
+    counts = tile_counts(client, 5, [(22, 12), (23, 12), (22, 13), (23, 13)])
+    assert counts == {(22, 12): 0, (23, 12): 0, (22, 13): 0, (23, 13): 1}
+
+def test_points_on_shared_edges_are_counted_once(tile_client):
+    south, north, west, east = tile_bounds(5, 23, 13)
+    points = [point((south + north) / 2, east), point(south, (west + east) / 2), point(22.3, 82.6)]
+    client, _ = tile_client(points)
+    tiles = [(x, y) for x in (22, 23, 24) for y in (12, 13, 14)]
+    counts = tile_counts(client, 5, tiles)
+    assert sum(counts.values()) == len(points)
+    # On the east edge -> the eastern neighbour; on the south edge -> the southern one
+    assert counts[(24, 13)] == 1 and counts[(23, 14)] == 1
+
+def test_tile_endpoint_caches_encoded_tiles(tile_client):
+    client, db = tile_client([point(22.3, 82.6)])
+    first = client.get("/api/v1/hotspots/tiles/5/23/13.bin")
+    header, _, _, score, codes = decode_tile(first.content)
+    assert header["count"] == 1 and codes.tolist() == [LEVEL_CODES['Red']]
+    assert client.get("/api/v1/hotspots/tiles/5/23/13.bin").content == first.content
+    assert len(db.queries) == 1 # second request served from the tile cache
+    assert client.get("/api/v1/hotspots/tiles/1/2/0.bin").status_code == 400
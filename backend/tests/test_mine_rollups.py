@@ -0,0 +1,54 @@
+import data_uploader
+
+class RecordingCollection:
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def create_index(self, keys):
+        pass
+
+    def aggregate(self, pipeline):
+        self.log.append(("aggregate", self.name, pipeline))
+        return iter(())
+
+    def delete_many(self, query):
+        self.log.append(("delete_many", self.name, query))
+
+class RecordingDB:
+    def __init__(self):
+        self.log = []
+
+    def __getitem__(self, name):
+        return RecordingCollection(name, self.log)
+
+def merge_stamp(pipeline):
+    merge = pipeline[-1]["$merge"]
+    assert merge["into"] == data_uploader.HOTSPOT_ROLLUP_COLLECTION
+    return pipeline[-2]["$project"]["updated_at"]["$literal"]
+
+def test_full_refresh_merges_before_dropping_stale_rollups():
+    db = RecordingDB()
+    data_uploader.refresh_mine_rollups(db)
+    (op1, coll1, pipeline), (op2, coll2, query) = db.log
+    assert (op1, coll1) == ("aggregate", data_uploader.HOTSPOT_COLLECTION)
+    assert (op2, coll2) == ("delete_many", data_uploader.HOTSPOT_ROLLUP_COLLECTION)
+    run_at = merge_stamp(pipeline)
+    assert run_at.microsecond % 1000 == 0 # representable as a BSON date
+    assert query == {"updated_at": {"$not": {"$gte": run_at}}}
+
+def test_incremental_refresh_never_deletes():
+    db = RecordingDB()
+    data_uploader.refresh_mine_rollups(db, ["Gevra"])
+    assert [entry[0] for entry in db.log] == ["aggregate"]
+    assert db.log[0][2][0] == {"$match": {"Mine_Name": {"$in": ["Gevra"]}}}
+    data_uploader.refresh_mine_rollups(db, [])
+    assert len(db.log) == 1
+
+def test_ingested_csvs_spell_each_mine_one_way(tmp_path):
+    source = tmp_path / 'new_rows.csv'
+    source.write_text(" Mine_Nam ,State,Latitude\n gevra ,chhattisgarh ,22.3\nGevra, Chhattisgarh,22.4\n")
+    df = data_uploader.read_clean_csv(str(source))
+    assert list(df.columns) == ['Mine_Name', 'State', 'Latitude']
+    assert df['Mine_Name'].tolist() == ['Gevra', 'Gevra']
+    assert df['State'].tolist() == ['Chhattisgarh', 'Chhattisgarh']
@@ -0,0 +1,54 @@
+import pytest
+
+from mine_search import MineSearchIndex, MAX_PREFIX_CANDIDATES
+
+MINES = [
+    {"mine_name": "Gevra", "district": "Korba", "state": "Chhattisgarh"},
+    {"mine_name": "Dipka", "district": "Korba", "state": "Chhattisgarh"},
+    {"mine_name": "Kusmunda", "district": "Korba", "state": "Chhattisgarh"},
+    {"mine_name": "Jharia Colliery", "district": "Dhanbad", "state": "Jharkhand"},
+    {"mine_name": "Jayant", "district": "Singrauli", "state": "Madhya Pradesh"},
+]
+
+@pytest.fixture
+def index():
+    return MineSearchIndex(MINES)
+
+def test_exact_name_matches_case_and_space_insensitively(index):
+    entry, status, candidates = index.resolve("  GEVRA ")
+    assert (entry["mine_name"], status, candidates) == ("Gevra", "matched", [])
+
+def test_unique_prefix_matches(index):
+    entry, status, _ = index.resolve("kusm")
+    assert (entry["mine_name"], status) == ("Kusmunda", "matched")
+
+def test_shared_prefix_is_ambiguous(index):
+    entry, status, candidates = index.resolve("j")
+    assert entry is None and status == "ambiguous"
+    assert {c["mine_name"] for c in candidates} >= {"Jharia Colliery", "Jayant"}
+
+def test_district_prefix_does_not_resolve_a_mine(index):
+    entry, status, _ = index.resolve("korb")
+    assert entry is None and status == "not_found"
+
+def test_unique_substring_matches(index):
+    entry, status, _ = index.resolve("colliery")
+    assert (entry["mine_name"], status) == ("Jharia Colliery", "matched")
+
+def test_unknown_name_gets_suggestions(index):
+    entry, status, candidates = index.resolve("gevar")
+    assert entry is None and status == "not_found"
+    assert candidates[0]["mine_name"] == "Gevra"
+
+def test_uniqueness_is_checked_beyond_the_candidate_cap():
+    # More district names than the candidate cap share the prefix "kab" and sort
+    # between the two mines: a capped scan would see only the first mine.
+    mines = [{"mine_name": "Kab0010 Alpha", "district": "D", "state": "S"},
+             {"mine_name": f"Kab{MAX_PREFIX_CANDIDATES + 20:04d} Beta", "district": "D", "state": "S"}]
+    mines += [{"mine_name": f"Other {i}", "district": f"Kab{i:04d}", "state": "S"} for i in range(MAX_PREFIX_CANDIDATES + 50)]
+    index = MineSearchIndex(mines)
+    entry, status, candidates = index.resolve("kab")
+    assert entry is None and status == "ambiguous"
+    assert len(index.resolve("kab", suggestions=5)[2]) == 5
+    entry, status, _ = index.resolve("kab0010 a")
+    assert (entry["mine_name"], status) == ("Kab0010 Alpha", "matched")
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from patch_coordinates import valid_mine_coordinates
+
+def test_out_of_range_and_missing_coordinates_are_skipped():
+    df = pd.DataFrame({
+        'Mine_Name': ['Gevra', 'Gevra', 'Dipka', 'Kusmunda', 'Jharia', None, 'Rajmahal', ' '],
+        'Latitude': [22.3, 22.3, 95.0, 22.0, 'n/a', 23.0, -90.0, 10.0],
+        'Longitude': [82.6, 82.6, 82.5, -181.0, 86.4, 86.0, 180.0, 10.0],
+    })
+    coords, skipped = valid_mine_coordinates(df)
+    assert coords['Mine_Name'].tolist() == ['Gevra', 'Rajmahal']
+    assert coords['Latitude'].tolist() == [22.3, -90.0]
+    assert coords['Longitude'].tolist() == [82.6, 180.0]
+    assert skipped == 5
+
+def test_last_valid_row_wins_per_mine():
+    df = pd.DataFrame({'Mine_Name': ['Gevra', 'Gevra', 'Gevra'],
+                       'Latitude': [22.0, 22.5, np.nan], 'Longitude': [82.0, 82.5, 82.9]})
+    coords, skipped = valid_mine_coordinates(df)
+    assert coords[['Latitude', 'Longitude']].values.tolist() == [[22.5, 82.5]]
+    assert skipped == 1
+
+def test_missing_columns_skip_everything():
+    coords, skipped = valid_mine_coordinates(pd.DataFrame({'Mine_Name': ['Gevra']}))
+    assert coords.empty and skipped == 1
@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+import predictor as predictor_module
+from predictor import PlanCache, OffsetPredictor
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(predictor_module.time, "monotonic", clock)
+    return clock
+
+# ---------------------------------------------------------
+# PlanCache
+# ---------------------------------------------------------
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = PlanCache(max_entries=4, ttl_seconds=10)
+    cache.put("gevra", {"plan": 1})
+    clock.now += 9.9
+    assert cache.get("gevra") == {"plan": 1}
+    clock.now += 0.2
+    assert cache.get("gevra") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 0
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = PlanCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1 # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_hit_and_miss_counters(clock):
+    cache = PlanCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.get("missing", count_miss=False)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+# ---------------------------------------------------------
+# OffsetPredictor caching
+# ---------------------------------------------------------
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, name):
+        self.calls.append(name)
+        if name == "missing":
+            return {"query": name, "error": "not found"}
+        return {"mine_metadata": {"mine_name": name}}
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    version = {"value": "v1"}
+    monkeypatch.setattr(predictor_module, "generate_offset_plan", engine)
+    monkeypatch.setattr(predictor_module, "current_engine_version", lambda: version["value"])
+    engine.version = version
+    return engine
+
+def test_plans_are_cached_per_engine_version(engine):
+    p = OffsetPredictor()
+    first = p.predict("Gevra")
+    assert p.predict(" gevra ") is first
+    assert engine.calls == ["Gevra"]
+
+    engine.version["value"] = "v2"
+    assert p.get_cached("Gevra") is None
+    p.predict("Gevra")
+    assert engine.calls == ["Gevra", "Gevra"]
+    assert p.cache_stats()["engine_version"] == "v2"
+
+def test_errors_are_not_cached(engine):
+    p = OffsetPredictor()
+    assert "error" in p.predict("missing")
+    assert "error" in p.predict("missing")
+    assert engine.calls == ["missing", "missing"]
+    assert p.cache.stats()["size"] == 0
+
+def test_version_switch_is_serialized(engine):
+    p = OffsetPredictor()
+    p.predict("Gevra")
+    engine.version["value"] = "v2"
+    clears = []
+    original_clear = p.cache.clear
+    p.cache.clear = lambda: (clears.append(1), original_clear())
+
+    threads = [threading.Thread(target=p._cache_key, args=("Gevra",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(clears) == 1
+
+# ---------------------------------------------------------
+# Engine version stamp
+# ---------------------------------------------------------
+
+def test_retrained_models_change_the_engine_version():
+    ml_engine = predictor_module.ml_engine_module
+    sources = ml_engine.compute_engine_version()
+    assert ml_engine.compute_engine_version() == sources
+    loaded = ml_engine.compute_engine_version("abc123:2026-01-01T00:00:00")
+    retrained = ml_engine.compute_engine_version("abc123:2026-02-01T00:00:00")
+    assert len({sources, loaded, retrained}) == 3
@@ -0,0 +1,51 @@
+import pytest
+
+import predictor as predictor_module
+from predictor import OffsetPredictor
+
+def plan(name, target):
+    return {
+        "mine_metadata": {"mine_name": name},
+        "kpis": {"annual_offset_target_tonnes": target, "total_trees_required": 10, "estimated_budget_inr": 100.0,
+                 "land_required_ha": 1.0},
+        "carbon_credits": {"total_revenue_potential_inr": 50.0},
+    }
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(predictor_module, "current_engine_version", lambda: "v1")
+
+    def generate(names):
+        if "Broken" in names:
+            raise RuntimeError("solver exploded")
+        return [plan(n, 100.0) if n != "missing" else {"error": "not found", "available_mines": ["Gevra"]}
+                for n in names]
+
+    monkeypatch.setattr(predictor_module, "generate_offset_plans", generate)
+
+def test_portfolio_totals_cover_found_plans(engine):
+    result = OffsetPredictor().predict_portfolio(["Gevra", "gevra", "Dipka", "missing"])
+    assert [p["mine_metadata"]["mine_name"] for p in result["plans"]] == ["Gevra", "Dipka"]
+    assert result["portfolio"]["mine_count"] == 2
+    assert result["portfolio"]["annual_offset_target_tonnes"] == 200.0
+    assert result["not_found"] == [{"query": "missing", "error": "not found", "suggestions": ["Gevra"]}]
+    assert result["failed"] == []
+
+def test_engine_errors_are_reported_not_simulated(engine):
+    p = OffsetPredictor()
+    p.predict_portfolio(["Gevra"]) # cached, so it survives the failing batch below
+    result = p.predict_portfolio(["Gevra", "Broken", "Dipka"])
+    assert [plan["mine_metadata"]["mine_name"] for plan in result["plans"]] == ["Gevra"]
+    assert result["portfolio"]["mine_count"] == 1
+    assert result["portfolio"]["annual_offset_target_tonnes"] == 100.0
+    assert [f["query"] for f in result["failed"]] == ["Broken", "Dipka"]
+    assert "solver exploded" in result["failed"][0]["error"]
+    assert result["not_found"] == []
+
+def test_unavailable_engine_fails_every_uncached_mine(monkeypatch):
+    monkeypatch.setattr(predictor_module, "current_engine_version", lambda: "v1")
+    monkeypatch.setattr(predictor_module, "generate_offset_plans", None)
+    result = OffsetPredictor().predict_portfolio(["Gevra"])
+    assert result["plans"] == []
+    assert result["portfolio"]["estimated_budget_inr"] == 0
+    assert result["failed"] == [{"query": "Gevra", "error": "ML Engine unavailable."}]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import refresh_pipeline
+from hotspot_scoring import SCORE_COLUMNS, emission_scores, hotspot_thresholds, classify_scores
+
+@pytest.fixture
+def source_csv(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 50
+    df = pd.DataFrame({
+        'Date': pd.date_range('2022-01-01', periods=n, freq='7D').strftime('%Y-%m-%d'),
+        'State': ['Chhattisgarh'] * n,
+        'District': ['korba ', ' Korba'] * (n // 2),
+        'Mine_Name': [' gevra', 'GEVRA ', 'Dipka', 'dipka'] * (n // 4) + ['Gevra'] * (n % 4),
+        'Latitude': 22.3, 'Longitude': 82.6,
+        **{col: rng.uniform(1, 100, n) for col in refresh_pipeline.GAS_COLUMNS},
+    })
+    for col in SCORE_COLUMNS:
+        if col not in df.columns:
+            df[col] = rng.uniform(1, 100, n)
+    df.loc[3, 'CO2_ppm'] = np.nan
+    path = tmp_path / "source.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    paths = {name: tmp_path / f"{name}.csv" for name in ("average", "monthly", "hotspot")}
+    monkeypatch.setattr(refresh_pipeline, "AVERAGE_CSV_FILE", str(paths["average"]))
+    monkeypatch.setattr(refresh_pipeline, "MONTHLY_CSV_FILE", str(paths["monthly"]))
+    monkeypatch.setattr(refresh_pipeline, "HOTSPOT_CSV_FILE", str(paths["hotspot"]))
+    return paths
+
+def test_chunked_run_matches_a_whole_frame_classification(source_csv, outputs):
+    path, df = source_csv
+    refresh_pipeline.run_pipeline(str(path), target="csv", chunk_size=7)
+    hotspots = pd.read_csv(outputs["hotspot"], float_precision='round_trip')
+
+    expected = df.dropna(subset=SCORE_COLUMNS)
+    scores = emission_scores(expected)
+    low, high = hotspot_thresholds(scores.mean(), scores.std())
+    assert len(hotspots) == len(expected)
+    np.testing.assert_allclose(hotspots['Emission_Score'], scores.to_numpy())
+    assert hotspots['Hotspot_Level'].tolist() == list(classify_scores(scores, low, high))
+
+def test_names_are_cleaned_like_dataset_io(source_csv, outputs):
+    path, _ = source_csv
+    refresh_pipeline.run_pipeline(str(path), target="csv", chunk_size=7)
+    hotspots = pd.read_csv(outputs["hotspot"])
+    assert set(hotspots['Mine_Name']) == {'Gevra', 'Dipka'}
+    assert set(hotspots['District']) == {'Korba'}
+
+def test_averages_skip_incomplete_rows(source_csv, outputs):
+    path, df = source_csv
+    refresh_pipeline.run_pipeline(str(path), target="csv", chunk_size=7)
+    averages = pd.read_csv(outputs["average"])
+    expected = df.dropna(subset=refresh_pipeline.GAS_COLUMNS)[refresh_pipeline.GAS_COLUMNS].mean().round(2)
+    assert averages.iloc[0].tolist() == pytest.approx(expected.tolist())
+    assert len(pd.read_csv(outputs["monthly"])) == 12
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+import ml_engine
+from app.schemas import ScenarioSweepRequest
+
+ASR = {'teak': 0.03, 'acacia': 0.02, 'pioneer': 0.01}
+
+def make_grid(**overrides):
+    values = {'cost_teak': [100.0], 'cost_acacia': [60.0], 'cost_pioneer': [30.0], 'pct_teak': [0.3],
+              'pct_acacia': [0.3], 'credit_price_inr': [500.0], 'target_share': [1.0]}
+    values.update(overrides)
+    return ml_engine.scenario_grid({p: np.asarray(v, dtype=np.float64) for p, v in values.items()})
+
+# ---------------------------------------------------------
+# pareto_frontier
+# ---------------------------------------------------------
+
+def brute_force_frontier(cost, offset):
+    return {i for i in range(len(cost))
+            if not any((cost[j] <= cost[i] and offset[j] >= offset[i]) and (cost[j] < cost[i] or offset[j] > offset[i])
+                       for j in range(len(cost)))}
+
+def test_pareto_frontier_keeps_only_non_dominated_points():
+    cost = np.array([10.0, 5.0, 7.0, 12.0, 5.0, 20.0])
+    offset = np.array([4.0, 2.0, 1.0, 6.0, 3.0, 6.0])
+    frontier = ml_engine.pareto_frontier(cost, offset)
+    assert frontier.tolist() == [4, 0, 3]
+
+def test_pareto_frontier_matches_brute_force():
+    rng = np.random.default_rng(7)
+    cost = rng.integers(0, 50, 300).astype(np.float64)
+    offset = rng.integers(0, 50, 300).astype(np.float64)
+    frontier = ml_engine.pareto_frontier(cost, offset)
+    assert set(frontier.tolist()) == brute_force_frontier(cost, offset)
+    assert np.all(np.diff(cost[frontier]) >= 0)
+    assert np.all(np.diff(offset[frontier]) > 0)
+
+# ---------------------------------------------------------
+# evaluate_scenarios feasibility
+# ---------------------------------------------------------
+
+def test_negative_shares_are_infeasible():
+    scenarios = ml_engine.evaluate_scenarios(make_grid(pct_teak=[-1.0, 0.2]), 1000.0, ASR)
+    assert scenarios['pct_teak'].tolist() == [0.2]
+    assert np.all(scenarios['total_trees'] >= 0)
+    assert np.all(scenarios['land_required_ha'] >= 0)
+
+def test_shares_over_one_are_infeasible_not_clipped():
+    scenarios = ml_engine.evaluate_scenarios(make_grid(pct_teak=[0.5, 0.8], pct_acacia=[0.5]), 1000.0, ASR)
+    assert scenarios['pct_teak'].tolist() == [0.5]
+    assert scenarios['pct_pioneer'].tolist() == [0.0]
+
+def test_negative_costs_are_infeasible():
+    scenarios = ml_engine.evaluate_scenarios(make_grid(cost_acacia=[-5.0, 5.0], target_share=[-1.0, 1.0]), 1000.0, ASR)
+    assert scenarios['cost_acacia'].tolist() == [5.0]
+    assert scenarios['target_share'].tolist() == [1.0]
+
+def test_teak_cap_and_land_limit():
+    scenarios = ml_engine.evaluate_scenarios(make_grid(pct_teak=[0.1, 0.3]), 1000.0, ASR,
+                                             land_limit=1.0, max_teak_pct=0.2)
+    assert scenarios['pct_teak'].tolist() == [0.1]
+    assert scenarios['land_required_ha'][0] <= 1.0
+
+# ---------------------------------------------------------
+# Request bounds
+# ---------------------------------------------------------
+
+@pytest.mark.parametrize("body", [
+    {"pct_teak": {"values": [-1.0]}},
+    {"pct_acacia": {"min": 0.0, "max": 1.5}},
+    {"target_share": {"values": [1.2]}},
+    {"cost_teak": {"min": -10.0, "max": 10.0}},
+    {"credit_price_inr": {"values": [-1.0]}},
+])
+def test_sweep_request_rejects_out_of_range_values(body):
+    with pytest.raises(ValidationError):
+        ScenarioSweepRequest(**body)
+
+def test_sweep_request_accepts_bounded_values():
+    request = ScenarioSweepRequest(pct_teak={"min": 0.0, "max": 1.0, "steps": 3}, cost_teak={"values": [0.0, 250.0]})
+    assert request.pct_teak.max == 1.0
+    assert request.cost_teak.values == [0.0, 250.0]
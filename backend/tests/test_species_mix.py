@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ml_engine
+
+SPECIES = list(ml_engine.SPECIES_ASR_FACTOR)
+
+def plan_table():
+    rng = np.random.default_rng(17)
+    n = 12
+    table = pd.DataFrame({
+        'ASR_teak': rng.uniform(0.015, 0.03, n),
+        'ASR_acacia': rng.uniform(0.01, 0.025, n),
+        'ASR_pioneer': rng.uniform(0.005, 0.02, n),
+        'Cost_Teak': rng.uniform(150, 400, n),
+        'Cost_Acacia': rng.uniform(60, 200, n),
+        'Cost_Pioneer': rng.uniform(30, 120, n),
+        'Max_Teak_Pct': rng.choice([0.0, 0.2, 0.4, 1.0], n),
+        'Available_Land_Ha': rng.uniform(50, 500, n),
+        'Annual_Target': rng.uniform(500, 6000, n),
+    }, index=[f"mine {i}" for i in range(n)])
+    # One mine whose land cannot reach its target
+    table.loc['mine 0', ['Available_Land_Ha', 'Annual_Target']] = [1.0, 10_000.0]
+    return table
+
+@pytest.fixture(scope="module")
+def solved():
+    table = plan_table()
+    return table, ml_engine.optimize_species_mix(table)
+
+def test_counts_are_non_negative(solved):
+    _, result = solved
+    for sp in SPECIES:
+        assert (result[f'Opt_Count_{sp}'] >= -1e-6).all()
+
+def test_teak_share_respects_the_registry_cap(solved):
+    table, result = solved
+    teak_share = result['Opt_Count_teak'] / result['Opt_Total_Trees'].where(result['Opt_Total_Trees'] > 0)
+    assert (teak_share.fillna(0) <= table['Max_Teak_Pct'] + 1e-6).all()
+
+def test_land_limit_is_respected(solved):
+    table, result = solved
+    assert (result['Opt_Land_Required'] <= table['Available_Land_Ha'] * (1 + 1e-6)).all()
+
+def test_targets_are_met_where_the_land_allows(solved):
+    table, result = solved
+    asr = {sp: table[f'ASR_{sp}'].to_numpy() for sp in SPECIES}
+    capacity = pd.Series(ml_engine.max_land_offset(asr, table['Available_Land_Ha'].to_numpy(),
+                                                   table['Max_Teak_Pct'].to_numpy()), index=table.index)
+    met = result['Opt_Target_Met']
+    assert met.tolist() == (table['Annual_Target'] <= capacity).tolist()
+    assert not met['mine 0'] and met.any()
+    assert (result.loc[met, 'Opt_Offset'] >= table.loc[met, 'Annual_Target'] * (1 - 1e-6)).all()
+    # Land-limited mines plant for the best offset their land can reach
+    np.testing.assert_allclose(result.loc[~met, 'Opt_Offset'], capacity[~met], rtol=1e-6)
+
+def test_no_grid_mix_is_cheaper(solved):
+    table, result = solved
+    shares = np.linspace(0, 1, 21)
+    for mine, row in table[result['Opt_Target_Met']].iterrows():
+        best = np.inf
+        for teak, acacia in itertools.product(shares, shares):
+            pioneer = 1 - teak - acacia
+            if pioneer < -1e-9 or teak > row['Max_Teak_Pct'] + 1e-9:
+                continue
+            mix = {'teak': teak, 'acacia': acacia, 'pioneer': max(pioneer, 0.0)}
+            per_tree_offset = sum(mix[sp] * row[f'ASR_{sp}'] for sp in SPECIES)
+            trees = row['Annual_Target'] / per_tree_offset
+            if trees / ml_engine.TREES_PER_HA > row['Available_Land_Ha']:
+                continue
+            best = min(best, trees * sum(mix[sp] * row[ml_engine.SPECIES_COST_COLUMN[sp]] for sp in SPECIES))
+        assert result.loc[mine, 'Opt_Total_Cost'] <= best * (1 + 1e-6), mine